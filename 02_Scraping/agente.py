@@ -1,6 +1,12 @@
-import re
-from tools import get_weather, generate_fun_fact, compare_countries, get_current_time
+import asyncio
+import threading
+from tools import (get_weather, get_weather_async, generate_fun_fact, compare_countries, compare_many_countries,
+                   get_current_time)
 from rag import RAG
+from router import IntentRouter
+
+# Año por defecto de las comparaciones explícitas ("compara", "vs") que no indican edición
+DEFAULT_COMPARE_YEAR = 2024
 
 class OlympicAgent:
     """
@@ -14,53 +20,61 @@ class OlympicAgent:
             "weather": get_weather,
             "fun_fact": generate_fun_fact,
             "compare": compare_countries,
+            "compare_many": compare_many_countries,
             "time": get_current_time
         }
+        # Router de intenciones con los países del dataset además de los alias
+        self.router = IntentRouter(country_matcher=self.rag.country_matcher)
 
     # ============================
     # 🔍 Selección de herramienta
     # ============================
     def decide_and_call_tool(self, query: str):
-        q = query.lower().strip()
+        return self._call_tool(self.router.route(query))
 
+    def _call_tool(self, route):
         # Hora / fecha
-        if any(tok in q for tok in ["hora", "qué hora", "dime la hora", "fecha", "hoy"]):
+        if route.intent == "time":
             return self.tools["time"](), "🕒 Tool: get_current_time()"
 
         # Dato curioso
-        if any(tok in q for tok in ["dato curioso", "curiosidad", "hecho interesante", "sabías que"]):
+        if route.intent == "fun_fact":
             return self.tools["fun_fact"](), "🧠 Tool: generate_fun_fact()"
 
         # Clima
-        if any(tok in q for tok in ["clima", "tiempo", "temperatura", "hace calor", "hace frío"]):
-            match = re.search(r"en ([a-záéíóúñ \-]+)", q)
-            city = match.group(1).strip() if match else "Madrid"
+        if route.intent == "weather":
+            city = route.slots["city"]
             return self.tools["weather"](city), f"🌤️ Tool: get_weather('{city}')"
 
-        # Comparación entre países
-        if "compara" in q or " vs " in q or " v " in q or " o " in q:
-            # Extraer año
-            year_match = re.search(r"(20\d{2})", q)
-            year = int(year_match.group()) if year_match else 2024
-
-            # Buscar dos países después de palabras clave
-            pattern = r"(?:compara|entre|qué país obtuvo mejor resultado en|qué país ganó más medallas en)?\s*([a-záéíóúñ\s]+?)\s+(?:vs|v|o|y)\s+([a-záéíóúñ\s]+)"
-            m = re.search(pattern, q)
-            if m:
-                c1 = m.group(1).strip()
-                c2 = m.group(2).strip()
-                # Limpiar basura como "qué país obtuvo mejor resultado en 2020"
-                c1 = re.sub(r"(qué país|obtuvo|mejor|resultado|en|los|juegos|olímpicos|olimpicos|de|el|la|del|los)", "", c1, flags=re.I).strip()
-                c2 = re.sub(r"(qué país|obtuvo|mejor|resultado|en|los|juegos|olímpicos|olimpicos|de|el|la|del|los)", "", c2, flags=re.I).strip()
-
-                resp = self.tools["compare"](c1, c2, year)
-                return resp, f"📊 Tool: compare_countries({c1}, {c2}, {year})"
+        # Comparación entre países: dos países en un año, o tabla para 3+ países, varios años
+        # o todos los años (si la pregunta no pide comparar explícitamente ni da año)
+        if route.intent == "compare":
+            countries = route.slots["countries"]
+            years = route.slots.get("years") or []
+            if not years and route.slots.get("explicit", True):
+                years = [DEFAULT_COMPARE_YEAR]
+            if len(countries) > 2 or len(years) != 1:
+                resp = self.tools["compare_many"](countries, years or None)
+                label = ", ".join(map(str, years)) or "todos los años"
+                return resp, f"📊 Tool: compare_many_countries({', '.join(countries)}; {label})"
+            c1, c2 = countries
+            resp = self.tools["compare"](c1, c2, years[0])
+            return resp, f"📊 Tool: compare_countries({c1}, {c2}, {years[0]})"
 
         return None, None
 
     # ============================
     # 💬 Respuesta final
     # ============================
+    @staticmethod
+    def _answer_source(answer):
+        """Determina la fuente de una respuesta del RAG."""
+        if isinstance(answer, str) and any(x in answer for x in ["En ", "ocupó", "medallas", "fue el país"]):
+            return "📊 Datos estructurados (CSV - medallero)"
+        if isinstance(answer, str) and answer.startswith("⚠️"):
+            return "⚠️ Error (modelo o datos faltantes)"
+        return "💬 Gemini + RAG semántico"
+
     def answer(self, query: str):
         # 1️⃣ Intentar con Tools
         tool_resp, tool_src = self.decide_and_call_tool(query)
@@ -71,19 +85,102 @@ class OlympicAgent:
         answer, docs = self.rag.answer_question(query)
 
         # 3️⃣ Determinar fuente
-        if isinstance(answer, str) and any(x in answer for x in ["En ", "ocupó", "medallas", "fue el país"]):
-            source = "📊 Datos estructurados (CSV - medallero)"
-        elif isinstance(answer, str) and answer.startswith("⚠️"):
-            source = "⚠️ Error (modelo o datos faltantes)"
-        else:
-            source = "💬 Gemini + RAG semántico"
+        return answer, self._answer_source(answer)
+
+    async def answer_async(self, query: str):
+        """
+        Versión asíncrona de `answer`: el clima usa el cliente asíncrono (caché y peticiones
+        compartidas entre corrutinas), el resto de Tools corre en un hilo y el RAG en el bucle de eventos.
+        """
+        tool_resp, tool_src = await self._tool_answer_async(query)
+        if tool_resp:
+            return tool_resp, tool_src
+
+        answer, docs = await self.rag.answer_question_async(query)
+        return answer, self._answer_source(answer)
+
+    async def _tool_answer_async(self, query: str):
+        """Tools de `answer_async`: el clima con el cliente asíncrono y el resto en un hilo."""
+        route = self.router.route(query)
+        if route.intent == "weather":
+            city = route.slots["city"]
+            return await get_weather_async(city), f"🌤️ Tool: get_weather('{city}')"
+        return await asyncio.to_thread(self._call_tool, route)
+
+    async def answer_stream_async(self, query: str):
+        """Versión asíncrona de `answer_stream` para el chat de Gradio (mismo formato de salida)."""
+        tool_resp, tool_src = await self._tool_answer_async(query)
+        if tool_resp:
+            yield tool_resp, tool_src
+            return
+
+        answer = ""
+        async for answer, docs in self.rag.answer_question_stream_async(query):
+            yield answer, None
+        yield answer, self._answer_source(answer)
+
+    def answer_stream(self, query: str):
+        """
+        Versión en streaming de `answer`: genera (respuesta parcial, fuente).
+        La fuente es None hasta el último elemento, que lleva la respuesta completa.
+        """
+        tool_resp, tool_src = self.decide_and_call_tool(query)
+        if tool_resp:
+            yield tool_resp, tool_src
+            return
+
+        answer = ""
+        for answer, docs in self.rag.answer_question_stream(query):
+            yield answer, None
+        yield answer, self._answer_source(answer)
+
+
+    def reload(self):
+        """Recarga los datos compartidos (dataset, colección e índices) sin recrear el agente."""
+        self.rag.reload()
+        self.router = IntentRouter(country_matcher=self.rag.country_matcher)
+
+
+# ============================
+# 🗂️ Registro del agente (uno por proceso)
+# ============================
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def _warm_up(agent: OlympicAgent):
+    try:
+        agent.rag.warm_up()
+    except Exception as e:
+        print(f"⚠️ No se pudo precalentar el agente: {e}")
+
+
+def get_agent(warm_up: bool = True) -> OlympicAgent:
+    """
+    Agente compartido por todo el proceso. Se crea en la primera llamada (carga el dataset y,
+    con `warm_up`, inicializa Chroma, embeddings y Gemini en segundo plano para no retrasar
+    el arranque); después solo se reutiliza.
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                agent = OlympicAgent()
+                if warm_up:
+                    threading.Thread(target=_warm_up, args=(agent,), daemon=True).start()
+                _agent = agent
+    return _agent
+
 
-        return answer, source
+def reload_agent():
+    """Recarga el agente compartido tras reconstruir los datos (no hace nada si aún no existe)."""
+    with _agent_lock:
+        if _agent is not None:
+            _agent.reload()
 
 
 # ============================
 # ⚡ Interfaz para otros módulos
 # ============================
 def handle_agent_query(query: str):
-    agent = OlympicAgent()
-    return agent.answer(query)
+    return get_agent().answer(query)
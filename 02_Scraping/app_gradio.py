@@ -1,31 +1,36 @@
 import gradio as gr
-from agente import OlympicAgent
+from agente import get_agent
 
 # ==============================
 # 🚀 Inicialización del agente
 # ==============================
-agent = OlympicAgent()
+agent = get_agent()
 
 # ==============================
 # 💬 Función principal del chatbot
 # ==============================
-def chat_with_agent(message, history):
+async def chat_with_agent(message, history):
     """
-    Procesa la consulta del usuario y devuelve respuesta + fuente de información.
+    Procesa la consulta del usuario y va mostrando la respuesta según se genera;
+    al final añade la fuente de información. Es asíncrona: las sesiones que esperan
+    a Gemini o al clima no ocupan un hilo del servidor.
     """
-    try:
-        answer, source = agent.answer(message)
+    # Estructura del mensaje tipo "messages" (nuevo formato Gradio)
+    history = history or []
+    history.append({"role": "user", "content": message})
+    history.append({"role": "assistant", "content": ""})
 
-        # Estructura del mensaje tipo "messages" (nuevo formato Gradio)
-        history = history or []
-        history.append({"role": "user", "content": message})
-        history.append({"role": "assistant", "content": f"{answer}\n\n📊 **Fuente:** {source}"})
-        return history, history
+    try:
+        async for answer, source in agent.answer_stream_async(message):
+            if source is None:
+                history[-1]["content"] = answer
+            else:
+                history[-1]["content"] = f"{answer}\n\n📊 **Fuente:** {source}"
+            yield history, history
 
     except Exception as e:
-        history = history or []
-        history.append({"role": "assistant", "content": f"⚠️ Error: {e}"})
-        return history, history
+        history[-1]["content"] = f"⚠️ Error: {e}"
+        yield history, history
 
 
 # ==============================
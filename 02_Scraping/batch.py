@@ -0,0 +1,112 @@
+import asyncio
+import json
+import statistics
+import sys
+import time
+from llm_cache import normalize_query
+
+DEFAULT_OUTPUT = "batch_results.jsonl"
+
+
+def read_questions(path: str):
+    """
+    Lee las preguntas de un JSONL: cada línea es un objeto con `query` (o `question`)
+    y opcionalmente `id`, o directamente una cadena JSON. Las líneas vacías se ignoran; las que no son JSON
+    válido o no traen pregunta se avisan por stderr (con su número de línea) y se saltan.
+    """
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Línea {line_no} no es JSON válido ({e.msg}), se ignora", file=sys.stderr)
+                continue
+            if isinstance(record, str):
+                record = {"query": record}
+            query = record.get("query") or record.get("question") if isinstance(record, dict) else None
+            if not query:
+                print(f"⚠️ Línea {line_no} sin pregunta, se ignora", file=sys.stderr)
+                continue
+            items.append({"id": record.get("id", line_no), "query": query})
+    return items
+
+
+async def _timed_answer(agent, group, semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            answer, source = await agent.answer_async(group[0]["query"])
+            error = None
+        except Exception as e:
+            answer, source, error = None, None, str(e)
+        return group, answer, source, error, (time.perf_counter() - start) * 1000
+
+
+async def _answer_groups(agent, groups, out, concurrency: int):
+    """Responde un representante por grupo en el bucle asyncio y escribe cada grupo al terminar."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies = []
+    errors = 0
+    tasks = [_timed_answer(agent, group, semaphore) for group in groups.values()]
+    for next_done in asyncio.as_completed(tasks):
+        group, answer, source, error, latency_ms = await next_done
+        latencies.append(latency_ms)
+        errors += error is not None
+        for n, item in enumerate(group):
+            record = {
+                "id": item["id"],
+                "query": item["query"],
+                "answer": answer,
+                "source": source,
+                "latency_ms": round(latency_ms, 1),
+                "deduplicated": n > 0,
+            }
+            if error is not None:
+                record["error"] = error
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+    return latencies, errors
+
+
+def run_batch(agent, input_path: str, output_path: str = DEFAULT_OUTPUT, concurrency: int = 4):
+    """
+    Responde todas las preguntas de `input_path` con `agent.answer_async` en un bucle asyncio,
+    con como mucho `concurrency` preguntas en curso. Las preguntas idénticas (tras normalizar)
+    se responden una sola vez. Cada resultado se escribe en `output_path` (JSONL, "-" = stdout)
+    en cuanto está listo, con su latencia en milisegundos. El límite de peticiones a Gemini lo aplica el RAG.
+    """
+    items = read_questions(input_path)
+    groups = {}
+    for item in items:
+        groups.setdefault(normalize_query(item["query"]), []).append(item)
+    print(f"📋 {len(items)} preguntas ({len(groups)} distintas), {concurrency} en paralelo", file=sys.stderr)
+
+    out = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        latencies, errors = asyncio.run(_answer_groups(agent, groups, out, concurrency))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "questions": len(items),
+        "unique": len(groups),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        summary["p50_ms"] = round(statistics.median(ordered), 1)
+        summary["p95_ms"] = round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1)
+    print(
+        f"✅ {summary['questions']} respuestas ({summary['unique']} consultas, {errors} errores) "
+        f"en {summary['elapsed_s']} s — p50 {summary.get('p50_ms', 0)} ms, p95 {summary.get('p95_ms', 0)} ms",
+        file=sys.stderr,
+    )
+    return summary
@@ -0,0 +1,127 @@
+# bench_embeddings.py
+# Compara los proveedores de embeddings (default de Chroma, onnx float32 y onnx-int8) sobre el medallero,
+# sin la caché de embeddings:
+#   - carga del modelo (hasta el primer vector), documentos por segundo al indexar el corpus
+#     y latencia de una pregunta suelta (p50/p95), que es lo que paga cada consulta del chat
+#   - calidad: coseno de cada vector con el del modelo por defecto, coincidencia del top-k con el
+#     del modelo por defecto y hit@k contra la verdad del dataset (la pregunta "país año" debe
+#     recuperar el documento `año|país`)
+#
+#   python bench_embeddings.py                               -> los tres proveedores, k=5
+#   python bench_embeddings.py --providers default onnx-int8 --batch-size 64 --threads 2
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROVIDERS = ["default", "onnx", "onnx-int8"]
+QUESTIONS_PATH = os.path.join(SCRIPT_DIR, "routing_corpus.jsonl")
+
+
+def base_function(provider: str, batch_size: int, threads: int):
+    """Función de embeddings del proveedor sin caché (se mide el modelo, no SQLite)."""
+    if provider == "default":
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        return DefaultEmbeddingFunction()
+    from onnx_embeddings import QuantizedONNXEmbeddingFunction
+    return QuantizedONNXEmbeddingFunction(quantized=provider == "onnx-int8", batch_size=batch_size, threads=threads)
+
+
+def load_questions(path: str = QUESTIONS_PATH):
+    """Preguntas reales del corpus de enrutado (las del RAG y también las de herramientas)."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["query"] for line in f if line.strip()]
+
+
+def ground_truth_queries(ids, metadatas, n: int, seed: int = 0):
+    """Preguntas "país año" cuyo documento correcto se conoce: (texto, id esperado)."""
+    rng = random.Random(seed)
+    picks = [rng.randrange(len(ids)) for _ in range(min(n, len(ids)))]
+    return [(f"Medallas de {metadatas[i]['country']} en {metadatas[i]['year']}", ids[i]) for i in picks]
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def _top_k(query_vectors, doc_vectors, k: int):
+    scores = query_vectors @ doc_vectors.T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def measure(provider: str, docs, questions, batch_size: int, threads: int):
+    start = time.perf_counter()
+    function = base_function(provider, batch_size, threads)
+    function(["medallero olímpico"])
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doc_vectors = np.asarray(function(docs), dtype=np.float32)
+    docs_per_s = len(docs) / (time.perf_counter() - start)
+
+    latencies, query_vectors = [], []
+    for question in questions:
+        t = time.perf_counter()
+        query_vectors.append(function([question])[0])
+        latencies.append((time.perf_counter() - t) * 1000)
+
+    # onnx-int8 sin el paquete onnx cae a float32: que se vea en la tabla
+    name = f"{provider} (float32)" if provider == "onnx-int8" and not function.quantized else provider
+    return {
+        "name": name, "load_s": load_s, "docs_per_s": docs_per_s, "latencies_ms": latencies,
+        "doc_vectors": doc_vectors, "query_vectors": np.asarray(query_vectors, dtype=np.float32),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y calidad de los proveedores de embeddings")
+    parser.add_argument("--providers", nargs="+", default=PROVIDERS, choices=PROVIDERS)
+    parser.add_argument("--k", type=int, default=5, help="Documentos recuperados por pregunta")
+    parser.add_argument("--truth-queries", type=int, default=200, help="Preguntas país/año con respuesta conocida")
+    parser.add_argument("--batch-size", type=int, default=32, help="Lote de onnxruntime (proveedores onnx)")
+    parser.add_argument("--threads", type=int, default=0, help="Hilos por operador (0 = automático)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from medal_data import load_medals
+    from vector_db import build_documents
+
+    docs, ids, metadatas = build_documents(load_medals())
+    truth = ground_truth_queries(ids, metadatas, args.truth_queries, args.seed)
+    questions = load_questions() + [text for text, _ in truth]
+    position = {doc_id: i for i, doc_id in enumerate(ids)}
+    expected = np.array([position[doc_id] for _, doc_id in truth])
+
+    reports = [measure(p, docs, questions, args.batch_size, args.threads) for p in args.providers]
+    reference = reports[0] if args.providers[0] == "default" else None
+
+    print(f"\n📋 {len(docs)} documentos, {len(questions)} preguntas sueltas, "
+          f"{len(truth)} con respuesta conocida (k={args.k})\n")
+    print(f"{'proveedor':<20} {'carga':>7} {'docs/s':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'coseno':>7} {'top-k':>6} {'hit@k':>6}")
+    for report in reports:
+        lat = report["latencies_ms"]
+        top = _top_k(report["query_vectors"], report["doc_vectors"], args.k)
+        truth_top = top[len(questions) - len(truth):]
+        hit = float(np.mean([doc in row for doc, row in zip(expected, truth_top)])) if len(truth) else 0.0
+        if reference is not None:
+            cosine = float(np.mean(np.sum(report["doc_vectors"] * reference["doc_vectors"], axis=1)))
+            ref_top = _top_k(reference["query_vectors"], reference["doc_vectors"], args.k)
+            overlap = statistics.fmean(len(set(a) & set(b)) / args.k for a, b in zip(top, ref_top))
+            cosine, overlap = f"{cosine:.4f}", f"{overlap:.3f}"
+        else:
+            cosine = overlap = "—"
+        print(f"{report['name']:<20} {report['load_s']:>6.2f}s {report['docs_per_s']:>8.0f} "
+              f"{_percentile(lat, 0.5):>7.2f} {_percentile(lat, 0.95):>7.2f} {cosine:>7} {overlap:>6} {hit:>6.3f}")
+    if reference is not None:
+        print("\ncoseno: similitud media de los vectores de documento con los del modelo por defecto; "
+              "top-k: fracción del top-k del modelo por defecto que se mantiene.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_router.py
+# Mide a la vez la precisión y la latencia del router de intenciones sobre el corpus etiquetado.
+#   python bench_router.py                      -> router compilado
+#   python bench_router.py --legacy             -> compara con las reglas anteriores del agente
+#   python bench_router.py --repeat 2000 -v     -> más repeticiones y detalle de los fallos
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from router import get_router
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_corpus.jsonl")
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def legacy_route(query: str):
+    """Reglas de `decide_and_call_tool` antes del router (solo la clasificación, sin llamar a las Tools)."""
+    q = query.lower().strip()
+    if any(tok in q for tok in ["hora", "qué hora", "dime la hora", "fecha", "hoy"]):
+        return "time", {}
+    if any(tok in q for tok in ["dato curioso", "curiosidad", "hecho interesante", "sabías que"]):
+        return "fun_fact", {}
+    if any(tok in q for tok in ["clima", "tiempo", "temperatura", "hace calor", "hace frío"]):
+        match = re.search(r"en ([a-záéíóúñ \-]+)", q)
+        return "weather", {"city": match.group(1).strip() if match else "Madrid"}
+    if "compara" in q or " vs " in q or " v " in q or " o " in q:
+        year_match = re.search(r"(20\d{2})", q)
+        pattern = r"(?:compara|entre|qué país obtuvo mejor resultado en|qué país ganó más medallas en)?\s*([a-záéíóúñ\s]+?)\s+(?:vs|v|o|y)\s+([a-záéíóúñ\s]+)"
+        if re.search(pattern, q):
+            return "compare", {"year": int(year_match.group()) if year_match else 2024}
+    return "rag", {}
+
+
+def compiled_route(query: str):
+    route = get_router().route(query)
+    return route.intent, route.slots
+
+
+def evaluate(route_fn, corpus, verbose=False):
+    """Aciertos de intención y de intención + slots etiquetados."""
+    intent_ok = slots_ok = 0
+    for item in corpus:
+        intent, slots = route_fn(item["query"])
+        if intent == item["intent"]:
+            intent_ok += 1
+            expected = item.get("slots", {})
+            if all(slots.get(k) == v for k, v in expected.items()):
+                slots_ok += 1
+                continue
+        if verbose:
+            print(f"   ✗ {item['query']!r}: {intent} {slots} (esperado {item['intent']} {item.get('slots', {})})")
+    return intent_ok / len(corpus), slots_ok / len(corpus)
+
+
+def measure(route_fn, corpus, repeat: int):
+    """Latencia por pregunta (µs) sobre `repeat` pasadas del corpus."""
+    for item in corpus:  # calentamiento
+        route_fn(item["query"])
+    samples = []
+    for _ in range(repeat):
+        for item in corpus:
+            start = time.perf_counter()
+            route_fn(item["query"])
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))]
+    return {"mean": statistics.fmean(samples), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def report(name, route_fn, corpus, repeat, verbose):
+    intent_acc, slot_acc = evaluate(route_fn, corpus, verbose)
+    lat = measure(route_fn, corpus, repeat)
+    print(
+        f"{name:<10} intención {intent_acc:6.1%} | intención+slots {slot_acc:6.1%} | "
+        f"media {lat['mean']:6.1f} µs  p50 {lat['p50']:6.1f}  p95 {lat['p95']:6.1f}  p99 {lat['p99']:6.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisión y latencia del router de intenciones")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Corpus JSONL etiquetado (query, intent, slots)")
+    parser.add_argument("--repeat", type=int, default=200, help="Pasadas del corpus para medir latencia")
+    parser.add_argument("--legacy", action="store_true", help="Incluir las reglas anteriores como referencia")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar las preguntas mal enrutadas")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"📋 {len(corpus)} preguntas etiquetadas, {args.repeat} repeticiones\n")
+    report("router", compiled_route, corpus, args.repeat, args.verbose)
+    if args.legacy:
+        report("legacy", legacy_route, corpus, args.repeat, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# bench_vector_backends.py
+# Compara los backends vectoriales (Chroma y el índice plano NumPy) con los mismos documentos,
+# los mismos embeddings y las mismas consultas. Cada backend se mide en un proceso nuevo:
+#   - tiempo de apertura y memoria residente (RSS) añadida al abrir y consultar
+#   - latencia por consulta (p50/p95/p99), sin contar el cálculo del embedding de la pregunta
+#   - tamaño en disco y coincidencia del top-k de cada backend con el exacto (NumPy)
+#
+#   python bench_vector_backends.py                    -> 200 consultas, k=10, 30% con filtro de año
+#   python bench_vector_backends.py --queries 1000 --k 5
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_NAMES = ["chroma", "numpy"]
+
+WORKER_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+from bench_vector_backends import rss_mb
+name, path, queries_path = sys.argv[2:5]
+with open(queries_path, encoding="utf-8") as f:
+    queries = json.load(f)
+
+base_rss = rss_mb()
+start = time.perf_counter()
+from embeddings import get_embedding_function
+from vector_backends import create_backend
+backend = create_backend(name, get_embedding_function(), create=False, path=path)
+backend.query(n_results=1, query_embedding=queries[0]["embedding"])
+open_s = time.perf_counter() - start
+
+latencies, results = [], []
+for q in queries:
+    t = time.perf_counter()
+    ids, _ = backend.query(n_results=q["k"], where=q["where"], query_embedding=q["embedding"])
+    latencies.append((time.perf_counter() - t) * 1000)
+    results.append(ids)
+print(json.dumps({
+    "open_s": open_s, "rss_mb": rss_mb() - base_rss, "disk_mb": backend.disk_size() / 1e6,
+    "latencies_ms": latencies, "results": results,
+}))
+"""
+
+
+def rss_mb() -> float:
+    """Memoria residente del proceso en MB (Linux: /proc; si no, el máximo de getrusage)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_indexes(workdir: str, backends):
+    """Construye cada backend en `workdir` con los documentos del medallero y los mismos embeddings."""
+    from embeddings import get_embedding_function
+    from medal_data import load_medals
+    from vector_backends import create_backend
+    from vector_db import build_documents
+
+    docs, ids, metadatas = build_documents(load_medals())
+    embedding_function = get_embedding_function()
+    start = time.perf_counter()
+    embeddings = [list(map(float, v)) for v in embedding_function(docs)]
+    print(f"🧮 {len(docs)} documentos embebidos en {time.perf_counter() - start:.2f} s")
+
+    paths = {}
+    for name in backends:
+        path = os.path.join(workdir, name)
+        backend = create_backend(name, embedding_function, create=True, path=path)
+        limit = backend.max_batch_size() or len(docs)
+        for i in range(0, len(docs), limit):
+            backend.upsert(ids[i:i + limit], docs[i:i + limit], metadatas[i:i + limit], embeddings=embeddings[i:i + limit])
+        backend.flush()
+        paths[name] = path
+    return paths, docs, metadatas
+
+
+def make_queries(docs, metadatas, n: int, k: int, filtered: float, seed: int = 0):
+    """Consultas reproducibles derivadas de los documentos (país + año), algunas con filtro `where` de año."""
+    from embeddings import get_embedding_function
+
+    rng = random.Random(seed)
+    picks = [rng.randrange(len(docs)) for _ in range(n)]
+    texts = [f"{metadatas[i].get('country', '')} {metadatas[i].get('year', '')} medallas" for i in picks]
+    embedding_function = get_embedding_function()
+    start = time.perf_counter()
+    vectors = embedding_function(texts)
+    embed_ms = (time.perf_counter() - start) * 1000 / max(n, 1)
+    queries = []
+    for i, vector in zip(picks, vectors):
+        where = {"year": metadatas[i]["year"]} if rng.random() < filtered and "year" in metadatas[i] else None
+        queries.append({"embedding": list(map(float, vector)), "k": k, "where": where})
+    return queries, embed_ms
+
+
+def run_worker(name: str, path: str, queries_path: str):
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER_SCRIPT, SCRIPT_DIR, name, path, queries_path],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name}: {result.stderr.strip()[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y memoria de los backends vectoriales")
+    parser.add_argument("--backends", nargs="+", default=BACKEND_NAMES, choices=BACKEND_NAMES)
+    parser.add_argument("--queries", type=int, default=200, help="Número de consultas")
+    parser.add_argument("--k", type=int, default=10, help="Documentos por consulta")
+    parser.add_argument("--filtered", type=float, default=0.3, help="Fracción de consultas con filtro de año")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_vectors_") as workdir:
+        paths, docs, metadatas = build_indexes(workdir, args.backends)
+        queries, embed_ms = make_queries(docs, metadatas, args.queries, args.k, args.filtered, args.seed)
+        queries_path = os.path.join(workdir, "queries.json")
+        with open(queries_path, "w", encoding="utf-8") as f:
+            json.dump(queries, f)
+
+        reports = {name: run_worker(name, paths[name], queries_path) for name in args.backends}
+
+    print(f"\n📋 {len(docs)} documentos, {len(queries)} consultas (k={args.k}), "
+          f"embedding de la pregunta {embed_ms:.2f} ms (no incluido)\n")
+    print(f"{'backend':<8} {'apertura':>9} {'RSS +MB':>8} {'disco MB':>9} {'media ms':>9} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'recall@k':>9}")
+    exact = reports.get("numpy", {}).get("results")
+    for name, report in reports.items():
+        lat = report["latencies_ms"]
+        if exact:
+            hits = [len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(report["results"], exact)]
+            recall = f"{statistics.fmean(hits):.3f}"
+        else:
+            recall = "—"
+        print(f"{name:<8} {report['open_s']:>8.3f}s {report['rss_mb']:>8.1f} {report['disk_mb']:>9.2f} "
+              f"{statistics.fmean(lat):>9.3f} {_percentile(lat, 0.5):>7.3f} {_percentile(lat, 0.95):>7.3f} "
+              f"{_percentile(lat, 0.99):>7.3f} {recall:>9}")
+    if exact:
+        print("\nrecall@k: fracción del top-k exacto (NumPy, coseno) que devuelve cada backend.")
+
+
+if __name__ == "__main__":
+    main()
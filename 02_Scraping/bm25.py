@@ -0,0 +1,108 @@
+import re
+from collections import Counter
+import numpy as np
+from country_aliases import fold
+
+K1 = 1.2
+B = 0.75
+RRF_K = 60  # constante de Reciprocal Rank Fusion (Cormack et al.)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    """Tokens sin tildes y en minúsculas (años, números y nombres se conservan tal cual)."""
+    return _TOKEN_PATTERN.findall(fold(text))
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 en memoria sobre los mismos documentos que la colección de Chroma.
+    Cada término guarda sus documentos y frecuencias como arrays de NumPy, así que una
+    búsqueda es una suma vectorizada por término de la pregunta, sin llamar al modelo de embeddings.
+    """
+
+    def __init__(self, documents, ids, metadatas=None, k1: float = K1, b: float = B):
+        self.documents = list(documents)
+        self.ids = list(ids)
+        self.k1 = k1
+        self.b = b
+        self._position = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+        metadatas = metadatas or [{} for _ in self.ids]
+        self.years = np.array([meta.get("year", -1) for meta in metadatas], dtype=np.int64)
+        self.countries = np.array([meta.get("country", "") for meta in metadatas], dtype=object)
+
+        postings = {}
+        lengths = np.zeros(len(self.documents), dtype=np.float64)
+        for i, doc in enumerate(self.documents):
+            counts = Counter(tokenize(doc))
+            lengths[i] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((i, tf))
+
+        n_docs = max(len(self.documents), 1)
+        avg_length = lengths.mean() if len(lengths) else 1.0
+        # Normalización por longitud precalculada por documento
+        self._norm = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+        self._postings = {}
+        for term, entries in postings.items():
+            docs = np.fromiter((i for i, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float64, count=len(entries))
+            idf = np.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = (docs, tfs, idf)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Índice con los documentos, IDs `año|país` y metadatos de `vector_db.build_documents`."""
+        from vector_db import build_documents
+        docs, ids, metadatas = build_documents(df)
+        return cls(docs, ids, metadatas)
+
+    def _mask(self, year_filter=None, country_filter=None):
+        mask = np.ones(len(self.documents), dtype=bool)
+        if year_filter:
+            mask &= self.years == int(year_filter)
+        if country_filter:
+            mask &= np.isin(self.countries, list(country_filter))
+        return mask
+
+    def document(self, doc_id):
+        """Texto del documento `doc_id`, o None si no está en el índice."""
+        position = self._position.get(doc_id)
+        return None if position is None else self.documents[position]
+
+    def get(self, ids):
+        """Documentos con esos IDs (los que existan), en el mismo orden."""
+        return [self.documents[self._position[doc_id]] for doc_id in ids if doc_id in self._position]
+
+    def filter(self, year_filter=None, country_filter=None):
+        """IDs que cumplen exactamente los filtros de año / país, en el orden del dataset."""
+        return [self.ids[i] for i in np.flatnonzero(self._mask(year_filter, country_filter))]
+
+    def search(self, query: str, n_results: int = 10, year_filter=None, country_filter=None):
+        """IDs de los `n_results` documentos con mayor puntuación BM25 (solo los que puntúan > 0)."""
+        scores = np.zeros(len(self.documents), dtype=np.float64)
+        for term in set(tokenize(query)):
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            docs, tfs, idf = entry
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+
+        if year_filter or country_filter:
+            scores[~self._mask(year_filter, country_filter)] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > n_results:
+            candidates = candidates[np.argpartition(-scores[candidates], n_results - 1)[:n_results]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self.ids[i] for i in order]
+
+
+def reciprocal_rank_fusion(*rankings, k: int = RRF_K, n_results: int = 10):
+    """Fusiona listas de IDs ordenadas: puntuación = suma de 1 / (k + posición)."""
+    scores = {}
+    for ranking in rankings:
+        for position, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + position)
+    return sorted(scores, key=scores.get, reverse=True)[:n_results]
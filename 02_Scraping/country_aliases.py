@@ -0,0 +1,161 @@
+import re
+import threading
+import unicodedata
+
+# ---------------------------
+# Alias de países (español / abreviaturas → nombre del medallero)
+# ---------------------------
+COUNTRY_ALIASES = {
+    # 🌍 América
+    "eeuu": "United States", "ee. uu.": "United States", "estados unidos": "United States", "usa": "United States",
+    "canadá": "Canada", "canada": "Canada",
+    "méxico": "Mexico", "mexico": "Mexico",
+    "cuba": "Cuba", "puerto rico": "Puerto Rico",
+    "república dominicana": "Dominican Republic", "dominicana": "Dominican Republic",
+    "guatemala": "Guatemala", "honduras": "Honduras", "el salvador": "El Salvador", "nicaragua": "Nicaragua",
+    "costa rica": "Costa Rica", "costarica": "Costa Rica", "panamá": "Panama", "panama": "Panama",
+    "colombia": "Colombia", "venezuela": "Venezuela", "ecuador": "Ecuador", "perú": "Peru", "peru": "Peru",
+    "bolivia": "Bolivia", "paraguay": "Paraguay", "uruguay": "Uruguay", "argentina": "Argentina", "chile": "Chile",
+    "brasil": "Brazil", "brasilia": "Brazil",
+
+    # 🌍 Europa Occidental
+    "españa": "Spain", "espana": "Spain",
+    "portugal": "Portugal", "francia": "France", "alemania": "Germany", "suiza": "Switzerland",
+    "bélgica": "Belgium", "belgica": "Belgium", "luxemburgo": "Luxembourg",
+    "reino unido": "Great Britain", "gran bretaña": "Great Britain", "inglaterra": "Great Britain", "uk": "Great Britain",
+    "países bajos": "Netherlands", "holanda": "Netherlands", "grecia": "Greece",
+    "irlanda": "Ireland", "italia": "Italy", "san marino": "San Marino", "mónaco": "Monaco", "monaco": "Monaco",
+
+    # 🌍 Europa del Este
+    "rusia": "ROC", "federación rusa": "ROC", "rusia olímpica": "ROC", "russian olympic committee": "ROC", "urss": "ROC", "roc": "ROC",
+    "ucrania": "Ukraine", "bielorrusia": "Belarus", "polonia": "Poland", "república checa": "Czech Republic",
+    "chequia": "Czech Republic", "eslovaquia": "Slovakia", "hungría": "Hungary", "hungria": "Hungary",
+    "rumanía": "Romania", "rumania": "Romania", "bulgaria": "Bulgaria", "serbia": "Serbia",
+    "croacia": "Croatia", "bosnia": "Bosnia and Herzegovina", "eslovenia": "Slovenia", "macedonia": "North Macedonia",
+    "kosovo": "Kosovo", "albania": "Albania", "moldavia": "Moldova", "georgia": "Georgia", "armenia": "Armenia",
+
+    # 🌍 Europa del Norte
+    "suecia": "Sweden", "noruega": "Norway", "dinamarca": "Denmark", "finlandia": "Finland", "islandia": "Iceland",
+    "letonia": "Latvia", "lituania": "Lithuania", "estonia": "Estonia",
+
+    # 🌍 África
+    "sudáfrica": "South Africa", "sudafrica": "South Africa",
+    "nigeria": "Nigeria", "kenia": "Kenya", "etiopía": "Ethiopia", "etiopia": "Ethiopia",
+    "egipto": "Egypt", "marruecos": "Morocco", "argelia": "Algeria", "túnez": "Tunisia", "tunez": "Tunisia",
+    "ghana": "Ghana", "camerún": "Cameroon", "camerun": "Cameroon", "senegal": "Senegal", "uganda": "Uganda",
+    "zimbabue": "Zimbabwe", "botsuana": "Botswana", "mozambique": "Mozambique",
+    "angola": "Angola", "zambia": "Zambia", "malí": "Mali", "mali": "Mali",
+
+    # 🌍 Asia Occidental y Central
+    "turquía": "Turkey", "turquia": "Turkey", "chipre": "Cyprus", "israel": "Israel", "jordania": "Jordan",
+    "líbanon": "Lebanon", "libano": "Lebanon", "siria": "Syria", "irak": "Iraq", "iraq": "Iraq",
+    "irán": "Iran", "iran": "Iran", "arabia saudita": "Saudi Arabia", "qatar": "Qatar",
+    "emiratos árabes unidos": "United Arab Emirates", "emiratos arabes unidos": "United Arab Emirates",
+    "kuwait": "Kuwait", "bahrein": "Bahrain", "oman": "Oman", "yemen": "Yemen",
+    "kazajistán": "Kazakhstan", "kazajistan": "Kazakhstan", "uzbekistán": "Uzbekistan", "uzbekistan": "Uzbekistan",
+    "kirguistán": "Kyrgyzstan", "kirguistan": "Kyrgyzstan", "tayikistán": "Tajikistan", "tayikistan": "Tajikistan",
+
+    # 🌍 Asia Oriental
+    "china": "China", "hong kong": "Hong Kong", "macao": "Macau", "taiwán": "Chinese Taipei", "taiwan": "Chinese Taipei",
+    "corea del sur": "South Korea", "corea del norte": "North Korea", "japón": "Japan", "japon": "Japan",
+    "mongolia": "Mongolia",
+
+    # 🌍 Asia Meridional y Sudeste Asiático
+    "india": "India", "pakistán": "Pakistan", "pakistan": "Pakistan",
+    "bangladés": "Bangladesh", "bangladesh": "Bangladesh", "nepal": "Nepal", "bután": "Bhutan", "maldivas": "Maldives",
+    "sri lanka": "Sri Lanka", "myanmar": "Myanmar", "birmania": "Myanmar",
+    "tailandia": "Thailand", "vietnam": "Vietnam", "laos": "Laos", "camboya": "Cambodia", "malasia": "Malaysia",
+    "singapur": "Singapore", "indonesia": "Indonesia", "filipinas": "Philippines", "timor oriental": "Timor-Leste",
+
+    # 🌍 Oceanía
+    "australia": "Australia", "nueva zelanda": "New Zealand", "nueva zelandia": "New Zealand",
+    "fiyi": "Fiji", "samoa": "Samoa", "tonga": "Tonga", "papúa nueva guinea": "Papua New Guinea",
+    "papua nueva guinea": "Papua New Guinea", "islas cook": "Cook Islands",
+    "islas salomón": "Solomon Islands", "micronesia": "Micronesia", "palau": "Palau",
+    "kiribati": "Kiribati", "vanuatu": "Vanuatu", "nauru": "Nauru", "tuvalu": "Tuvalu",
+
+    # 🌍 Otros / Territorios especiales
+    "palestina": "Palestine", "hong-kong": "Hong Kong", "china taipei": "Chinese Taipei",
+    "corea": "South Korea", "macedonia del norte": "North Macedonia",
+}
+
+
+def _fold_char(ch: str) -> str:
+    base = "".join(c for c in unicodedata.normalize("NFD", ch.lower()) if not unicodedata.combining(c))
+    return base[:1] or ch
+
+
+# Tabla precalculada para los alfabetos latinos (1 carácter → 1 carácter)
+_FOLD_TABLE = {cp: _fold_char(chr(cp)) for cp in range(0x250) if _fold_char(chr(cp)) != chr(cp)}
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin tildes, carácter a carácter (conserva las posiciones del texto original)."""
+    return text.translate(_FOLD_TABLE)
+
+
+class CountryMatcher:
+    """
+    Detector de países compilado una sola vez: una única expresión regular con todos los
+    alias (y los nombres oficiales) plegados sin tildes, del más largo al más corto y con
+    límites de palabra. Encuentra todas las menciones de un texto en una sola pasada.
+    """
+
+    def __init__(self, aliases=None, extra_names=()):
+        aliases = COUNTRY_ALIASES if aliases is None else aliases
+        self._lookup = {}
+        for name in set(aliases.values()) | set(extra_names):
+            self._lookup[self._key(name)] = name
+        for alias, name in aliases.items():
+            self._lookup[self._key(alias)] = name
+
+        keys = sorted(self._lookup, key=len, reverse=True)
+        alternation = "|".join(r"\s+".join(re.escape(part) for part in key.split()) for key in keys)
+        self._pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(fold(text).split())
+
+    def find(self, text: str):
+        """Menciones de países en `text` como (inicio, fin, texto, país), sin solapes."""
+        if not isinstance(text, str):
+            return []
+        return [
+            (m.start(), m.end(), text[m.start():m.end()], self._lookup[" ".join(m.group().split())])
+            for m in self._pattern.finditer(fold(text))
+        ]
+
+    def countries(self, text: str):
+        """Países mencionados en `text`, sin repetir y en orden de aparición."""
+        return list(dict.fromkeys(country for *_, country in self.find(text)))
+
+    def replace(self, text: str) -> str:
+        """Sustituye cada alias de `text` por el nombre del país en el medallero."""
+        parts = []
+        last = 0
+        for start, end, _, country in self.find(text):
+            parts.append(text[last:start])
+            parts.append(country)
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def canonicalize(self, name: str):
+        """Nombre del medallero si `name` es exactamente un alias o país conocido; si no, None."""
+        if not isinstance(name, str):
+            return None
+        return self._lookup.get(self._key(name))
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def get_country_matcher() -> CountryMatcher:
+    """Detector compartido por todo el proceso (tools, RAG y agente)."""
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = CountryMatcher()
+        return _default_matcher
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from chromadb.utils import embedding_functions
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite")
+DEFAULT_MODEL_ID = "chroma-default/all-MiniLM-L6-v2"
+# Modelo de embeddings: default (Chroma), onnx (float32 con lotes/hilos propios) u onnx-int8 (cuantizado)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "default")
+EMBEDDING_PROVIDERS = ["default", "onnx", "onnx-int8"]
+MEMORY_CACHE_SIZE = 2048
+SQLITE_MAX_PARAMS = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddingFunction(embedding_functions.EmbeddingFunction):
+    """
+    Envuelve una función de embeddings de Chroma con una caché persistente en SQLite
+    (clave: modelo + hash del texto) y una LRU en memoria para las consultas repetidas.
+    Solo se llama al modelo para los textos que no estaban en caché.
+    """
+
+    def __init__(self, base=None, model_id: str = DEFAULT_MODEL_ID, path: str = EMBEDDING_CACHE_PATH,
+                 memory_size: int = MEMORY_CACHE_SIZE, provider: str = "default"):
+        self.base = base or embedding_functions.DefaultEmbeddingFunction()
+        self.model_id = model_id
+        self.provider = provider
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    # Chroma guarda el nombre/config de la función en la colección: se delega en la función base
+    def name(self) -> str:
+        return self.base.name()
+
+    def get_config(self):
+        return {**self.base.get_config(), "provider": self.provider, "model_id": self.model_id}
+
+    @staticmethod
+    def build_from_config(config):
+        # Las colecciones anteriores a EMBEDDING_PROVIDER no guardan el proveedor: eran "default"
+        return create_embedding_function((config or {}).get("provider", "default"))
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys):
+        """Vectores ya calculados para `keys` (memoria primero, después SQLite)."""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+            for start in range(0, len(missing), SQLITE_MAX_PARAMS):
+                chunk = missing[start:start + SQLITE_MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [self.model_id, *chunk],
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+        return found
+
+    def _store(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_id, key, vector.tobytes()) for key, vector in items],
+            )
+            self._conn.commit()
+            for key, vector in items:
+                self._remember(key, vector)
+
+    def __call__(self, input):
+        keys = [text_hash(text) for text in input]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        pending = {}
+        for key, text in zip(keys, input):
+            if key not in found:
+                pending.setdefault(key, text)
+        self.hits += len(keys) - sum(1 for key in keys if key in pending)
+        self.misses += len(pending)
+
+        if pending:
+            vectors = self.base(list(pending.values()))
+            computed = [(key, np.asarray(v, dtype=np.float32)) for key, v in zip(pending, vectors)]
+            self._store(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def warm_up(self):
+        """Carga el modelo base sin pasar por la caché (un acierto de caché no lo inicializaría)."""
+        warm_up = getattr(self.base, "warm_up", None)
+        if warm_up is not None:
+            warm_up()
+        else:
+            self.base(["medallero olímpico"])
+
+
+def create_embedding_function(provider: str = None, path: str = EMBEDDING_CACHE_PATH) -> CachedEmbeddingFunction:
+    """Función de embeddings con caché del proveedor configurado (`EMBEDDING_PROVIDER` o `provider`)."""
+    provider = provider or EMBEDDING_PROVIDER
+    if provider == "default":
+        return CachedEmbeddingFunction(path=path)
+    if provider in ("onnx", "onnx-int8"):
+        from onnx_embeddings import QuantizedONNXEmbeddingFunction
+        base = QuantizedONNXEmbeddingFunction(quantized=provider == "onnx-int8")
+        return CachedEmbeddingFunction(base=base, model_id=base.model_id, path=path, provider=provider)
+    raise ValueError(f"Proveedor de embeddings desconocido: {provider} (opciones: {', '.join(EMBEDDING_PROVIDERS)})")
+
+
+_default_function = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_function():
+    """Función de embeddings (con caché) compartida por VectorDB y RAG dentro del proceso."""
+    global _default_function
+    with _default_lock:
+        if _default_function is None:
+            _default_function = create_embedding_function()
+        return _default_function
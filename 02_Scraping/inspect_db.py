@@ -1,30 +1,249 @@
 # inspect_db.py
-import chromadb
+# Diagnóstico del índice vectorial del medallero:
+#   - colecciones, número de documentos y primeros documentos
+#   - tamaño en disco y dimensión de los embeddings
+#   - latencia por consulta (p50/p95/p99 e histograma) sobre un conjunto de consultas reproducible
+#   - recall@k contra la verdad del medallero estructurado (medal_data)
+# Se miden dos recuperaciones: el índice vectorial solo y la de rag.py (filtros + BM25 + vectores).
+#
+#   python inspect_db.py                                           -> 100 consultas generadas, k=5
+#   python inspect_db.py --record-queries diagnostics_queries.jsonl  -> guarda las consultas para repetirlas
+#   python inspect_db.py --queries diagnostics_queries.jsonl --record-baseline
+#   python inspect_db.py --queries diagnostics_queries.jsonl        -> compara con inspect_baseline.json
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
 
-CHROMA_PATH = "./chroma_db"
+BASELINE_PATH = "inspect_baseline.json"
+RETRIEVERS = ["vector", "rag"]
+# Límites superiores (ms) de los intervalos del histograma de latencia
+HISTOGRAM_BOUNDS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, float("inf")]
+BAR_WIDTH = 40
 
-client = chromadb.PersistentClient(path=CHROMA_PATH)
 
-# Ver todas las colecciones existentes
-collections = client.list_collections()
-print("📦 Colecciones disponibles:")
-for c in collections:
-    print(f" - {c.name}")
+def show_summary(backend, limit: int = 5):
+    """Colecciones (Chroma), número de documentos y los primeros `limit` documentos."""
+    if backend.name == "chroma":
+        print("📦 Colecciones disponibles:")
+        for c in backend.client.list_collections():
+            print(f" - {c.name}")
+    print(f"\n📊 El índice '{backend.name}' contiene {backend.count()} documentos.")
+    dimension = backend.dimension()
+    print(f"💾 Tamaño en disco: {backend.disk_size() / 1e6:.2f} MB · dimensión de los embeddings: {dimension or '—'}")
 
-# Obtener la colección principal
-collection = client.get_collection("olympic_medals")
+    ids, documents = backend.query("medallero olímpico", n_results=limit)
+    print(f"\n🔍 Primeros {len(documents)} documentos para 'medallero olímpico':")
+    for doc_id, doc in zip(ids, documents):
+        print(f" - [{doc_id}] {doc}")
+    return dimension
 
-# Mostrar conteo
-print(f"\n📊 La colección 'olympic_medals' contiene {collection.count()} documentos.\n")
 
-# Obtener algunos documentos (primeros 5)
-data = collection.get(limit=5)
+# -------------------------
+# 🎯 Consultas con respuesta conocida
+# -------------------------
+def generate_queries(df, n: int, k: int, seed: int = 0):
+    """
+    Consultas reproducibles derivadas del medallero, cada una con los IDs `año|país` que debe recuperar:
+    - country_year: medallas de un país en un año (un documento)
+    - country_all: historial de un país (todos sus años, hasta k)
+    - year_top: países con más medallas de un año (los k primeros por total)
+    """
+    from vector_db import document_id
 
-# Mostrar estructura completa para depurar
-print("🔍 Estructura interna de los primeros documentos:\n")
-for i, doc in enumerate(data.get("documents", []), 1):
-    print(f"{i}. {doc}")
+    rng = random.Random(seed)
+    rows = list(zip(df["year"].astype(int), df["country"].astype(str), df["total"]))
+    by_country, by_year = {}, {}
+    for year, country, total in rows:
+        by_country.setdefault(country, []).append(document_id(year, country))
+        by_year.setdefault(year, []).append((total, document_id(year, country)))
 
-# Si quieres ver también los IDs:
-print("\n🆔 IDs de los documentos obtenidos:")
-print(data.get("ids", []))
+    queries = []
+    for i in range(n):
+        kind = ["country_year", "country_all", "year_top"][i % 3]
+        year, country, _ = rows[rng.randrange(len(rows))]
+        if kind == "country_year":
+            text = f"¿Cuántas medallas ganó {country} en {year}?"
+            expected = [document_id(year, country)]
+        elif kind == "country_all":
+            text = f"Historial de medallas de {country} en los Juegos Olímpicos"
+            expected = sorted(by_country[country])
+        else:
+            text = f"¿Qué países ganaron más medallas en {year}?"
+            expected = [doc_id for _, doc_id in sorted(by_year[year], key=lambda t: -t[0])[:k]]
+        queries.append({"query": text, "kind": kind, "expected": expected})
+    return queries
+
+
+def load_queries(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_queries(queries, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for query in queries:
+            f.write(json.dumps(query, ensure_ascii=False) + "\n")
+
+
+def recall_at_k(retrieved, expected, k: int) -> float:
+    """Fracción de lo esperado que aparece en el top-k (sobre min(k, esperados))."""
+    if not expected:
+        return 1.0
+    return len(set(retrieved[:k]) & set(expected)) / min(k, len(expected))
+
+
+# -------------------------
+# ⏱️ Medición
+# -------------------------
+def make_retriever(name: str, backend):
+    """Función pregunta -> IDs recuperados por `name` ("vector" o "rag"), con el top-k como segundo argumento."""
+    if name == "vector":
+        return lambda query, k: backend.query(query, n_results=k)[0]
+
+    from rag import RAG
+    from vector_db import build_documents
+
+    rag = RAG(backend=backend)
+    docs, ids, _ = build_documents(rag.df)
+    doc_ids = dict(zip(docs, ids))
+
+    def rag_retrieve(query, k):
+        query = rag.country_matcher.replace(query)
+        year_filter, country_filter = rag.query_filters(query)
+        documents = rag.retrieve_context(query, year_filter, country_filter, n_results=k)
+        return [doc_ids.get(doc, doc) for doc in documents]
+
+    return rag_retrieve
+
+
+def isolated_backend(backend, cache_path: str):
+    """
+    El mismo índice con una caché de embeddings nueva y vacía en `cache_path`: cada retriever
+    paga sus propios embeddings de consulta en lugar de aprovechar los que calculó el anterior.
+    """
+    from embeddings import create_embedding_function
+    from vector_backends import create_backend
+
+    function = create_embedding_function(getattr(backend.embedding_function, "provider", None), path=cache_path)
+    return create_backend(backend.name, embedding_function=function, create=False, path=backend.path)
+
+
+def measure(retrieve, queries, k: int):
+    retrieve(queries[0]["query"], k)  # carga del modelo de embeddings fuera de la medida
+    latencies, recalls = [], {}
+    for q in queries:
+        start = time.perf_counter()
+        ids = retrieve(q["query"], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.setdefault(q["kind"], []).append(recall_at_k(ids, q["expected"], k))
+    return latencies, recalls
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def print_histogram(latencies):
+    counts = [0] * len(HISTOGRAM_BOUNDS)
+    for value in latencies:
+        counts[next(i for i, bound in enumerate(HISTOGRAM_BOUNDS) if value <= bound)] += 1
+    peak = max(counts) or 1
+    low = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS, counts):
+        if count:
+            label = f"> {low:g} ms" if bound == float("inf") else f"≤ {bound:g} ms"
+            print(f"      {label:>10} {'█' * max(1, round(BAR_WIDTH * count / peak))} {count}")
+        low = bound
+
+
+def _delta(value, base, unit: str, digits: int = 3):
+    if base is None:
+        return ""
+    return f"  (referencia {base:.{digits}f}{unit}, {value - base:+.{digits}f}{unit})"
+
+
+def report_retriever(name, latencies, recalls, baseline):
+    base = baseline.get("retrievers", {}).get(name, {})
+    stats = {
+        "p50_ms": _percentile(latencies, 0.5),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "recall": statistics.fmean(r for values in recalls.values() for r in values),
+        "recall_by_kind": {kind: statistics.fmean(values) for kind, values in recalls.items()},
+    }
+    print(f"\n⏱️ {name}: {len(latencies)} consultas")
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        print(f"   {key[:3]:<4} {stats[key]:8.2f} ms{_delta(stats[key], base.get(key), ' ms', 2)}")
+    print_histogram(latencies)
+    print(f"   recall@k {stats['recall']:.3f}{_delta(stats['recall'], base.get('recall'), '')}")
+    for kind, value in stats["recall_by_kind"].items():
+        print(f"      {kind:<13} {value:.3f}{_delta(value, base.get('recall_by_kind', {}).get(kind), '')}")
+    return stats
+
+
+def main():
+    from medal_data import load_medals
+    from vector_backends import BACKENDS, create_backend
+
+    parser = argparse.ArgumentParser(description="Diagnóstico del índice vectorial del medallero")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help="Índice a inspeccionar (por defecto VECTOR_BACKEND)")
+    parser.add_argument("--retrievers", nargs="+", choices=RETRIEVERS, default=RETRIEVERS)
+    parser.add_argument("--k", type=int, default=5, help="Documentos recuperados por consulta")
+    parser.add_argument("--n", type=int, default=100, help="Consultas generadas (si no se pasa --queries)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", help="Fichero JSONL de consultas a repetir")
+    parser.add_argument("--record-queries", help="Guarda las consultas generadas en este JSONL")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Fichero JSON de referencia")
+    parser.add_argument("--record-baseline", action="store_true", help="Guarda estas medidas como referencia")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    backend = create_backend(args.backend, create=False)
+    open_s = time.perf_counter() - start
+    dimension = show_summary(backend)
+    print(f"⏱️ Apertura del índice: {open_s:.3f} s")
+
+    if args.queries:
+        queries = load_queries(args.queries)
+    else:
+        queries = generate_queries(load_medals(), args.n, args.k, args.seed)
+    if args.record_queries:
+        save_queries(queries, args.record_queries)
+        print(f"💾 {len(queries)} consultas guardadas en {args.record_queries}")
+    if not queries:
+        print("⚠️ No hay consultas que medir.")
+        return
+
+    baseline = {}
+    if not args.record_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("backend") != backend.name or baseline.get("k") != args.k:
+            print(f"⚠️ La referencia se midió con el índice {baseline.get('backend')} y k={baseline.get('k')}")
+
+    report = {
+        "backend": backend.name, "count": backend.count(), "disk_mb": backend.disk_size() / 1e6,
+        "dimension": dimension, "k": args.k, "queries": len(queries), "retrievers": {},
+    }
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in args.retrievers:
+            measured = isolated_backend(backend, os.path.join(cache_dir, f"{name}.sqlite"))
+            latencies, recalls = measure(make_retriever(name, measured), queries, args.k)
+            report["retrievers"][name] = report_retriever(name, latencies, recalls, baseline)
+            function = measured.embedding_function
+            print(f"   embeddings de las consultas: {function.hits} desde la caché, {function.misses} calculados "
+                  f"(caché propia de este retriever, vacía al empezar)")
+
+    if args.record_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Referencia guardada en {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
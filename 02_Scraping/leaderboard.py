@@ -0,0 +1,70 @@
+import numpy as np
+
+METRICS = ["gold", "silver", "bronze", "total"]
+
+
+class LeaderboardIndex:
+    """
+    Índice del medallero construido una sola vez: para cada año guarda las filas y
+    su orden precalculado por oro, plata, bronce, total (descendente) y ranking (ascendente).
+    Las preguntas de "más medallas" o "puesto N" pasan a ser búsquedas directas.
+    """
+
+    def __init__(self, df):
+        self._rows = {}
+        self._orders = {}
+        self._sorted_values = {}
+
+        for year, group in df.groupby("year", sort=True):
+            year = int(year)
+            self._rows[year] = group.to_dict("records")
+            orders = {}
+            values = {}
+            for metric in METRICS:
+                col = group[metric].to_numpy(dtype=float, na_value=np.nan)
+                col = np.where(np.isnan(col), -np.inf, col)
+                # Orden estable: ante empate se respeta el orden de la tabla original
+                order = np.argsort(-col, kind="stable")
+                orders[metric] = order
+                values[metric] = col[order]
+            rank = group["rank"].to_numpy(dtype=float, na_value=np.nan)
+            orders["rank"] = np.argsort(np.where(np.isnan(rank), np.inf, rank), kind="stable")
+            self._orders[year] = orders
+            self._sorted_values[year] = values
+
+        self.years = sorted(self._rows)
+        self.latest_year = self.years[-1] if self.years else None
+
+    def has_year(self, year) -> bool:
+        return year is not None and int(year) in self._rows
+
+    def size(self, year) -> int:
+        """Número de países registrados en `year`."""
+        return len(self._rows.get(int(year), []))
+
+    def top(self, year, metric: str = "total", n: int = 1):
+        """Los `n` primeros países de `year` por `metric` ("gold", ..., "total" o "rank")."""
+        year = int(year)
+        if year not in self._rows:
+            return []
+        rows = self._rows[year]
+        return [rows[i] for i in self._orders[year][metric][:n]]
+
+    def at_position(self, year, position: int):
+        """País en la posición `position` (1 = primero) del ranking de `year`, o None."""
+        year = int(year)
+        if year not in self._rows or not 1 <= position <= self.size(year):
+            return None
+        return self._rows[year][self._orders[year]["rank"][position - 1]]
+
+    def between(self, year, metric: str, low, high):
+        """Países de `year` con `low <= metric <= high`, de mayor a menor."""
+        year = int(year)
+        if year not in self._rows:
+            return []
+        # Los valores están ordenados de mayor a menor: se busca sobre su negación (ascendente)
+        negated = -self._sorted_values[year][metric]
+        start = np.searchsorted(negated, -high, side="left")
+        end = np.searchsorted(negated, -low, side="right")
+        rows = self._rows[year]
+        return [rows[i] for i in self._orders[year][metric][start:end]]
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from country_aliases import fold
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.sqlite")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_SEMANTIC = os.getenv("LLM_CACHE_SEMANTIC", "0") == "1"
+MEMORY_CACHE_SIZE = 1024
+SIMILARITY_THRESHOLD = 0.95
+
+
+def normalize_query(query: str) -> str:
+    """Pregunta normalizada: sin tildes, mayúsculas, signos ni espacios repetidos."""
+    return " ".join(re.sub(r"[¿?¡!.,;:\"'()]", " ", fold(query)).split())
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Caché de respuestas del LLM con clave modelo + pregunta normalizada + hash del contexto.
+    LRU en memoria con TTL, respaldada en SQLite (compartida entre reinicios y procesos).
+    Opcionalmente reutiliza respuestas de preguntas casi idénticas (similitud del embedding
+    de la pregunta) siempre que el contexto recuperado sea el mismo.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL, max_entries: int = MEMORY_CACHE_SIZE,
+                 embedding_function=None, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedding_function = embedding_function
+        self.similarity_threshold = similarity_threshold
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, context_hash TEXT NOT NULL,"
+            " query TEXT NOT NULL, answer TEXT NOT NULL, created_at REAL NOT NULL, embedding BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_ctx ON responses (model, context_hash)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, query: str, context: str) -> str:
+        payload = f"{model}\n{normalize_query(query)}\n{context_hash(context)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, answer: str, created_at: float):
+        self._memory[key] = (answer, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _embed(self, query: str):
+        vector = np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, model: str, query: str, context: str):
+        """Respuesta guardada (exacta o semánticamente equivalente) o None."""
+        key = self.make_key(model, query, context)
+        oldest = time.time() - self.ttl
+
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit and hit[1] >= oldest:
+                self._memory.move_to_end(key)
+                return hit[0]
+
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM responses WHERE key = ? AND created_at >= ?", (key, oldest)
+            ).fetchone()
+            if row:
+                self._remember(key, row[0], row[1])
+                return row[0]
+
+        if self.embedding_function is None:
+            return None
+
+        # Búsqueda semántica entre las respuestas con el mismo modelo y el mismo contexto
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT answer, embedding FROM responses"
+                " WHERE model = ? AND context_hash = ? AND created_at >= ? AND embedding IS NOT NULL",
+                (model, context_hash(context), oldest),
+            ).fetchall()
+        if not rows:
+            return None
+        query_vector = self._embed(query)
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+        scores = matrix @ query_vector
+        best = int(np.argmax(scores))
+        return rows[best][0] if scores[best] >= self.similarity_threshold else None
+
+    def put(self, model: str, query: str, context: str, answer: str):
+        key = self.make_key(model, query, context)
+        created_at = time.time()
+        embedding = self._embed(query).tobytes() if self.embedding_function is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, context_hash, query, answer, created_at, embedding)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, context_hash(context), normalize_query(query), answer, created_at, embedding),
+            )
+            self._conn.commit()
+            self._remember(key, answer, created_at)
+
+    def purge_expired(self) -> int:
+        """Borra de SQLite las respuestas caducadas; devuelve cuántas."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+            return cursor.rowcount
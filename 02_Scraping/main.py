@@ -1,31 +1,43 @@
 import argparse
-import pandas as pd
-from vector_db import VectorDB
-from rag import RAG
-from scraping import scrape_all 
-
-def build_database():
-    """Reconstruye la base de datos desde el CSV."""
-    csv_path = "olympic_medals_2000_2024.csv"
-    print(f"📂 Cargando datos desde {csv_path}...")
-
-    df = pd.read_csv(csv_path)
-    print(f"✅ CSV cargado correctamente: {len(df)} registros")
-
-    vdb = VectorDB()
-    vdb.clear()
-    vdb.upsert_from_dataframe(df)
-    print("🎯 Base de datos Chroma reconstruida con éxito.")
-
-def run_scraping():
-    """Ejecuta scraping completo (2000–2024) y guarda el CSV."""
+from medal_data import DATA_DIR, load_medals, write_partitions
+from vector_db import DEFAULT_BATCH_SIZE, VectorDB
+from batch import DEFAULT_OUTPUT, run_batch
+from vector_backends import BACKENDS
+
+# Cada modo importa solo lo que usa: --scrape no carga Chroma ni Gemini y --run no carga el scraper
+
+def build_database(full_rebuild=False, batch_size=DEFAULT_BATCH_SIZE, embed_workers=1, backend=None):
+    """Sincroniza la base de datos con el dataset del medallero (o la reconstruye entera)."""
+    print(f"📂 Cargando datos desde {DATA_DIR}...")
+
+    df = load_medals()
+    print(f"✅ Datos cargados correctamente: {len(df)} registros")
+
+    vdb = VectorDB(batch_size=batch_size, embed_workers=embed_workers, backend=backend)
+    if full_rebuild:
+        vdb.clear()
+        vdb.upsert_from_dataframe(df)
+        print(f"🎯 Índice vectorial ({vdb.backend.name}) reconstruido con éxito.")
+    else:
+        vdb.sync_from_dataframe(df)
+        print(f"🎯 Índice vectorial ({vdb.backend.name}) sincronizado con éxito.")
+
+def run_scraping(concurrency=1, offline=False):
+    """Ejecuta scraping completo (2000–2024) y guarda solo las particiones por año que cambiaron."""
+    from scraping import scrape_all
+
     print("🏗️ Iniciando scraping (2000–2024)...")
-    df = scrape_all()
-    df.to_csv("olympic_medals_2000_2024.csv", index=False)
-    print("✅ Archivo guardado: olympic_medals_2000_2024.csv")
+    df = scrape_all(concurrency=concurrency, offline=offline)
+    changed = write_partitions(df)
+    if changed:
+        print(f"✅ Particiones actualizadas en {DATA_DIR}: {', '.join(map(str, changed))}")
+    else:
+        print(f"✅ Sin cambios: las particiones de {DATA_DIR} ya estaban al día")
 
 def interactive_rag():
     """Ejecuta el modo de preguntas RAG."""
+    from rag import RAG
+
     rag = RAG()
     print("✅ RAG listo. Escribe una pregunta o 'salir' para terminar.\n")
 
@@ -43,24 +55,55 @@ def interactive_rag():
         except Exception as e:
             print(f"⚠️ Error procesando la consulta: {e}")
 
+def batch_questions(input_path, output_path=DEFAULT_OUTPUT, concurrency=4):
+    """Responde un fichero JSONL de preguntas con el agente (regresión nocturna / precalentar cachés)."""
+    from agente import get_agent
+
+    run_batch(get_agent(), input_path, output_path, concurrency=concurrency)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="🏅 Olympic RAG + Tools + Scraping")
     parser.add_argument("--scrape", action="store_true", help="Ejecuta el scraping (2000–2024)")
-    parser.add_argument("--build-db", action="store_true", help="Reconstruye la base de datos desde el CSV")
+    parser.add_argument("--build-db", action="store_true",
+                        help="Sincroniza la base de datos con el dataset (solo re-embebe las filas que cambiaron)")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Con --build-db, borra la colección y la reconstruye entera")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Documentos por lote enviados a Chroma (por defecto {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--embed-workers", type=int, default=1, metavar="N",
+                        help="Hilos que calculan embeddings en paralelo durante --build-db (por defecto 1)")
+    parser.add_argument("--vector-backend", choices=BACKENDS, default=None,
+                        help="Con --build-db, índice a construir (por defecto VECTOR_BACKEND o chroma)")
     parser.add_argument("--run", action="store_true", help="Ejecuta el chat RAG")
+    parser.add_argument("--batch", metavar="QUESTIONS_JSONL",
+                        help="Responde las preguntas del fichero JSONL y escribe los resultados en JSONL")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help=f"Con --batch, fichero de resultados ('-' = salida estándar; por defecto {DEFAULT_OUTPUT})")
+    parser.add_argument("--concurrency", type=int, default=None, metavar="N",
+                        help="Páginas de Playwright en paralelo durante --scrape (por defecto 1) "
+                             "o preguntas en paralelo durante --batch (por defecto 4)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Con --scrape, parsea solo los snapshots HTML guardados (sin red ni navegador)")
 
     args = parser.parse_args()
 
     if args.scrape:
-        run_scraping()
+        run_scraping(concurrency=args.concurrency or 1, offline=args.offline)
     elif args.build_db:
-        build_database()
+        build_database(full_rebuild=args.full_rebuild, batch_size=args.batch_size, embed_workers=args.embed_workers,
+                       backend=args.vector_backend)
+    elif args.batch:
+        batch_questions(args.batch, args.output, concurrency=args.concurrency or 4)
     elif args.run:
         interactive_rag()
     else:
         print("⚙️ Usa uno de los modos:\n")
         print("   python main.py --scrape     → descarga y procesa los datos")
-        print("   python main.py --build-db   → reconstruye la base de datos")
+        print("   python main.py --scrape --concurrency 4 → scraping con 4 páginas en paralelo")
+        print("   python main.py --scrape --offline → re-parsea los snapshots guardados")
+        print("   python main.py --build-db   → sincroniza la base de datos (incremental)")
+        print("   python main.py --build-db --full-rebuild → reconstruye la base de datos desde cero")
         print("   python main.py --run        → inicia el chat interactivo")
+        print("   python main.py --batch preguntas.jsonl --concurrency 8 → responde un lote de preguntas (JSONL)")
 
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+import pandas as pd
+
+DATA_DIR = "./data/medals"
+MANIFEST_NAME = "manifest.json"
+COLUMNAR_NAME = "medals.arrow"
+LEGACY_CSV = "./olympic_medals_2000_2024.csv"
+# Columnas enteras que admiten huecos (p. ej. un país sin puesto): Int16 con nulos para que un valor
+# vacío no convierta toda la columna en float ("1" pasaría a escribirse "1.0")
+INT_COLUMNS = ["rank", "gold", "silver", "bronze", "total"]
+
+
+def normalize_medals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipos fijos y compactos del medallero, los mismos que el esquema Arrow: año int16,
+    país categórico y medallas/puesto Int16 (con nulos).
+    """
+    df = df.copy()
+    if "year" in df.columns:
+        df["year"] = df["year"].astype("int16")
+    if "country" in df.columns:
+        if isinstance(df["country"].dtype, pd.CategoricalDtype):
+            # Un subconjunto de años leído del fichero Arrow trae el diccionario completo de países
+            df["country"] = df["country"].cat.remove_unused_categories()
+        else:
+            df["country"] = df["country"].astype(str).astype("category")
+    for column in INT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int16")
+    return df
+
+
+# ---------------------------
+# Manifest y particiones por año
+# ---------------------------
+def _manifest_path(data_dir) -> Path:
+    return Path(data_dir) / MANIFEST_NAME
+
+
+def _partition_name(year: int) -> str:
+    return f"year={int(year)}.csv"
+
+
+def partition_hash(df: pd.DataFrame) -> str:
+    """Hash del contenido de una partición (independiente del índice y de los tipos de los demás años)."""
+    return hashlib.sha256(normalize_medals(df).to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+def read_manifest(data_dir=DATA_DIR) -> dict:
+    """Manifest del dataset: {"partitions": {"2000": {"file", "sha256", "rows", "updated_at"}, ...}}."""
+    path = _manifest_path(data_dir)
+    if not path.exists():
+        return {"partitions": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest: dict, data_dir=DATA_DIR):
+    path = _manifest_path(data_dir)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _dataset_hash(partitions: dict) -> str:
+    """Hash del dataset completo a partir de los hashes de sus particiones."""
+    joined = "|".join(f"{k}:{partitions[k]['sha256']}" for k in sorted(partitions, key=int))
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def available_years(data_dir=DATA_DIR):
+    """Años con partición en el dataset."""
+    return sorted(int(y) for y in read_manifest(data_dir)["partitions"])
+
+
+def write_partitions(df: pd.DataFrame, data_dir=DATA_DIR):
+    """
+    Guarda el medallero como una partición CSV por año.
+    Solo reescribe los años cuyo contenido cambió; devuelve la lista de años escritos.
+    Los años que no aparecen en `df` (p. ej. un scraping fallido) se conservan tal cual.
+    """
+    Path(data_dir).mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(data_dir)
+    partitions = manifest.setdefault("partitions", {})
+    changed = []
+
+    for year, part in df.groupby("year", sort=True):
+        # Cada año con sus propios tipos fijos: un hueco en otro año no cambia este CSV
+        part = normalize_medals(part.reset_index(drop=True))
+        digest = partition_hash(part)
+        key = str(int(year))
+        entry = partitions.get(key)
+        file_path = Path(data_dir) / _partition_name(year)
+        if entry and entry["sha256"] == digest and file_path.exists():
+            continue
+
+        tmp_path = file_path.with_suffix(".csv.tmp")
+        part.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+        partitions[key] = {
+            "file": file_path.name,
+            "sha256": digest,
+            "rows": len(part),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        changed.append(int(year))
+
+    if changed or not _columnar_is_fresh(manifest, data_dir):
+        write_columnar(manifest, data_dir)
+        _write_manifest(manifest, data_dir)
+    return changed
+
+
+# ---------------------------
+# Formato columnar (Arrow IPC, memory-mapped)
+# ---------------------------
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("rank", pa.int16()),
+        ("country", pa.dictionary(pa.int16(), pa.string())),
+        ("gold", pa.int16()),
+        ("silver", pa.int16()),
+        ("bronze", pa.int16()),
+        ("total", pa.int16()),
+        ("year", pa.int16()),
+    ])
+
+
+def _columnar_is_fresh(manifest: dict, data_dir=DATA_DIR) -> bool:
+    columnar = manifest.get("columnar")
+    return bool(
+        columnar
+        and columnar.get("source") == _dataset_hash(manifest.get("partitions", {}))
+        and (Path(data_dir) / columnar["file"]).exists()
+    )
+
+
+def write_columnar(manifest: dict = None, data_dir=DATA_DIR) -> bool:
+    """
+    Escribe todas las particiones en un único fichero Arrow IPC sin comprimir (mapeable en memoria),
+    con esquema fijo: medallas int16, país categórico y año. Un record batch por año.
+    Actualiza la entrada "columnar" de `manifest`. Devuelve False si pyarrow no está instalado.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("ℹ️ pyarrow no está instalado: se omite el formato columnar.")
+        return False
+
+    manifest = manifest or read_manifest(data_dir)
+    partitions = manifest["partitions"]
+    if not partitions:
+        return False
+
+    keys = sorted(partitions, key=int)
+    df = pd.concat([pd.read_csv(Path(data_dir) / partitions[k]["file"]) for k in keys], ignore_index=True)
+    schema = _arrow_schema()
+    countries = pa.array(df["country"].astype(str), type=pa.string()).dictionary_encode()
+    columns = []
+    for field in schema:
+        if field.name == "country":
+            columns.append(countries.cast(field.type))
+        else:
+            columns.append(pa.array(df[field.name], type=field.type, from_pandas=True))
+    table = pa.Table.from_arrays(columns, schema=schema)
+
+    path = Path(data_dir) / COLUMNAR_NAME
+    tmp_path = path.with_suffix(".arrow.tmp")
+    batches = {}
+    offset = 0
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for i, k in enumerate(keys):
+            rows = partitions[k]["rows"]
+            writer.write_batch(table.slice(offset, rows).combine_chunks().to_batches()[0])
+            batches[k] = i
+            offset += rows
+    os.replace(tmp_path, path)
+
+    manifest["columnar"] = {"file": COLUMNAR_NAME, "source": _dataset_hash(partitions), "batches": batches}
+    return True
+
+
+def load_medal_table(years=None, data_dir=DATA_DIR):
+    """
+    Tabla Arrow del medallero leída sin copias desde el fichero mapeado en memoria
+    (los procesos que la abren comparten las páginas). None si no está disponible o al día.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    manifest = read_manifest(data_dir)
+    if not _columnar_is_fresh(manifest, data_dir):
+        return None
+
+    columnar = manifest["columnar"]
+    source = pa.memory_map(str(Path(data_dir) / columnar["file"]), "r")
+    reader = pa.ipc.open_file(source)
+    if years is None:
+        return reader.read_all()
+
+    wanted = {str(int(y)) for y in years}
+    indices = [i for k, i in sorted(columnar["batches"].items(), key=lambda kv: kv[1]) if k in wanted]
+    return pa.Table.from_batches([reader.get_batch(i) for i in indices], schema=reader.schema)
+
+
+def _arrow_to_pandas(table) -> pd.DataFrame:
+    """
+    DataFrame con los tipos compactos del fichero Arrow (int16 con nulos, país categórico), los mismos
+    que normalize_medals da a las particiones CSV. Es una copia privada del proceso: solo la tabla de
+    load_medal_table() lee sin copiar y comparte las páginas entre procesos.
+    """
+    import pyarrow as pa
+
+    return normalize_medals(table.to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get))
+
+
+# ---------------------------
+# Lectura
+# ---------------------------
+def load_medals(years=None, data_dir=DATA_DIR) -> pd.DataFrame:
+    """
+    Carga el medallero en pandas. Con `years` solo lee las particiones de esos años.
+    Usa el fichero columnar si está al día (sin parsear CSV); si no, las particiones CSV.
+    Si todavía no hay particiones, recurre al CSV histórico (olympic_medals_2000_2024.csv).
+    Cualquiera que sea el origen, las columnas tienen los tipos compactos de normalize_medals.
+    """
+    table = load_medal_table(years, data_dir)
+    if table is not None:
+        return _arrow_to_pandas(table)
+
+    partitions = read_manifest(data_dir)["partitions"]
+    wanted = None if years is None else {int(y) for y in years}
+
+    if not partitions:
+        if not os.path.exists(LEGACY_CSV):
+            raise FileNotFoundError(f"No hay datos en {data_dir} ni en {LEGACY_CSV}. Ejecuta: python main.py --scrape")
+        df = pd.read_csv(LEGACY_CSV)
+        if wanted is not None:
+            df = df[df["year"].isin(wanted)].reset_index(drop=True)
+        return normalize_medals(df)
+
+    keys = sorted(partitions, key=int)
+    if wanted is not None:
+        keys = [k for k in keys if int(k) in wanted]
+    if not keys:
+        return normalize_medals(pd.read_csv(Path(data_dir) / partitions[sorted(partitions)[0]]["file"], nrows=0))
+
+    frames = [pd.read_csv(Path(data_dir) / partitions[k]["file"]) for k in keys]
+    return normalize_medals(pd.concat(frames, ignore_index=True))
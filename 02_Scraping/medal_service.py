@@ -0,0 +1,70 @@
+import threading
+import pandas as pd
+from medal_data import load_medals
+
+VALUE_COLUMNS = ["rank", "gold", "silver", "bronze", "total"]
+
+
+class MedalDataService:
+    """
+    Medallero en memoria compartido por el proceso, indexado por (año, país).
+    Las comparaciones entre N países y varios años se resuelven con una sola
+    reindexación vectorizada, sin releer ficheros ni recorrer filas.
+    """
+
+    def __init__(self, df: pd.DataFrame = None):
+        self.df = load_medals() if df is None else df
+        indexed = self.df.assign(
+            year=self.df["year"].astype("int64"),
+            country=self.df["country"].astype(str),
+        )
+        indexed = indexed.drop_duplicates(subset=["year", "country"])
+        self._indexed = indexed.set_index(["year", "country"])[VALUE_COLUMNS].astype("float64").sort_index()
+        self.years = sorted(self._indexed.index.get_level_values("year").unique())
+
+    def lookup(self, year, country):
+        """Fila de `country` en `year` como Series, o None si no existe."""
+        try:
+            return self._indexed.loc[(int(year), country)]
+        except KeyError:
+            return None
+
+    def compare(self, countries, years=None) -> pd.DataFrame:
+        """
+        Matriz de comparación indexada por (año, país) con medallas y ranking olímpico, más:
+        - `delta_gold` / `delta_total`: variación respecto a la edición anterior de la comparación.
+        - `position`: puesto entre los países comparados ese año (según el ranking olímpico).
+        Los países sin datos en un año aparecen con valores vacíos (NaN).
+        """
+        years = self.years if years is None else [int(y) for y in years]
+        index = pd.MultiIndex.from_product([years, list(countries)], names=["year", "country"])
+        matrix = self._indexed.reindex(index)
+
+        by_country = matrix.groupby(level="country", sort=False)
+        matrix["delta_gold"] = by_country["gold"].diff()
+        matrix["delta_total"] = by_country["total"].diff()
+        matrix["position"] = matrix.groupby(level="year")["rank"].rank(method="min")
+        return matrix
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_medal_service() -> MedalDataService:
+    """Servicio de datos compartido por tools, RAG y agente (se carga en el primer uso)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = MedalDataService()
+    return _service
+
+
+def reload_medal_service() -> MedalDataService:
+    """Vuelve a cargar el dataset (p. ej. tras un nuevo scraping)."""
+    global _service
+    service = MedalDataService()
+    with _service_lock:
+        _service = service
+    return service
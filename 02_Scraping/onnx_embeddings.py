@@ -0,0 +1,116 @@
+import importlib.util
+import os
+import threading
+import numpy as np
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+# Textos por llamada a onnxruntime y hilos por operador (0 = los que decida onnxruntime)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+MAX_TOKENS = 256
+INT8_MODEL_FILE = "model.int8.onnx"
+
+
+class QuantizedONNXEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    all-MiniLM-L6-v2 sobre onnxruntime (el mismo modelo que la función por defecto de Chroma)
+    con los pesos cuantizados a int8, lotes de tamaño fijo, número de hilos explícito y
+    padding al texto más largo de cada lote en lugar de a 256 tokens.
+    El modelo int8 se genera una vez junto al original (necesita el paquete `onnx`);
+    si falta ese paquete se usa el modelo float32 con un aviso.
+    """
+
+    def __init__(self, quantized: bool = True, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 threads: int = EMBEDDING_THREADS, preferred_providers=None):
+        super().__init__(preferred_providers=preferred_providers or ["CPUExecutionProvider"])
+        # Se decide aquí (y no al cargar el modelo) porque `model_id` separa las entradas de la caché
+        if quantized and not os.path.exists(self._int8_path()) and importlib.util.find_spec("onnx") is None:
+            print("⚠️ Falta el paquete onnx para cuantizar el modelo de embeddings; se usa float32")
+            quantized = False
+        self.quantized = quantized
+        self.batch_size = max(1, batch_size)
+        self.threads = max(0, threads)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Clave de la caché de embeddings: los vectores int8 no son intercambiables con los float32."""
+        return "onnx-int8/all-MiniLM-L6-v2" if self.quantized else "onnx/all-MiniLM-L6-v2"
+
+    def _model_dir(self) -> str:
+        return os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+
+    def _int8_path(self) -> str:
+        return os.path.join(self._model_dir(), INT8_MODEL_FILE)
+
+    def _quantized_model_path(self) -> str:
+        """Ruta del modelo int8, cuantizándolo (pesos int8, activaciones dinámicas) la primera vez."""
+        path = self._int8_path()
+        if os.path.exists(path):
+            return path
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = path + ".tmp.onnx"
+        print("⚙️ Cuantizando el modelo de embeddings a int8 (solo la primera vez)...")
+        quantize_dynamic(os.path.join(self._model_dir(), "model.onnx"), tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, path)
+        return path
+
+    @property
+    def session(self):
+        """Sesión de onnxruntime, creada al primer uso (descarga y cuantización incluidas)."""
+        with self._session_lock:
+            if self._session is None:
+                self._download_model_if_not_exists()
+                if self.quantized:
+                    path = self._quantized_model_path()
+                else:
+                    path = os.path.join(self._model_dir(), "model.onnx")
+
+                options = self.ort.SessionOptions()
+                options.log_severity_level = 3
+                options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.intra_op_num_threads = self.threads
+                options.inter_op_num_threads = 1
+                self._session = self.ort.InferenceSession(
+                    path, sess_options=options, providers=self._preferred_providers,
+                )
+            return self._session
+
+    def _tokenize(self, batch):
+        """IDs y máscara de atención del lote, truncados a 256 tokens y con padding al más largo."""
+        # El tokenizador de Chroma ya trunca y rellena a 256: se recorta al texto real más largo
+        encoded = [self.tokenizer.encode(text) for text in batch]
+        lengths = [min(sum(e.attention_mask), MAX_TOKENS) for e in encoded]
+        width = max(lengths)
+        input_ids = np.zeros((len(encoded), width), dtype=np.int64)
+        attention_mask = np.zeros((len(encoded), width), dtype=np.int64)
+        for i, (e, length) in enumerate(zip(encoded, lengths)):
+            input_ids[i, :length] = e.ids[:length]
+            attention_mask[i, :length] = 1
+        return input_ids, attention_mask
+
+    def _forward(self, documents, batch_size: int = None):
+        session = self.session
+        batch_size = batch_size or self.batch_size
+        outputs = []
+        for start in range(0, len(documents), batch_size):
+            input_ids, attention_mask = self._tokenize(documents[start:start + batch_size])
+            hidden = session.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+            # Media de los tokens reales (sin padding) y normalización L2, como la función de Chroma
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(self._normalize(pooled).astype(np.float32))
+        return np.concatenate(outputs) if outputs else np.zeros((0, 384), dtype=np.float32)
+
+    def __call__(self, input):
+        return [np.asarray(vector, dtype=np.float32) for vector in self._forward(list(input))]
+
+    def warm_up(self):
+        """Carga el modelo y ejecuta un lote completo para que la primera consulta real no pague el arranque."""
+        self(["medallero olímpico"] * self.batch_size)
@@ -0,0 +1,154 @@
+# profile_startup.py
+# Mide el arranque en frío del agente, cada medida en un proceso Python nuevo:
+#   - tiempo de importación de cada módulo de entrada y los paquetes que más pesan (python -X importtime)
+#   - tiempo hasta la primera respuesta: importar agente + crear el agente + responder una pregunta
+#
+#   python profile_startup.py                      -> mide y compara con startup_baseline.json si existe
+#   python profile_startup.py --record-baseline    -> guarda las medidas como nueva referencia
+#   python profile_startup.py --query "¿Qué hora es?" --repeat 5
+#
+# Se ejecuta desde el directorio de datos (chroma_db, data/medals), igual que main.py.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SCRIPT_DIR, "startup_baseline.json")
+ENTRY_MODULES = ["tools", "agente", "app_gradio"]
+# Pregunta estructurada: se responde con el medallero, sin llamar a Gemini ni a la red
+DEFAULT_QUERY = "¿Qué país ganó más medallas en 2024?"
+
+FIRST_ANSWER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import agente
+imported = time.perf_counter()
+agent = agente.get_agent(warm_up=False)
+built = time.perf_counter()
+answer, source = agent.answer(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start, "build_s": built - imported,
+    "answer_s": done - built, "total_s": done - start, "source": source,
+}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SCRIPT_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_profile(module: str):
+    """
+    Tiempo acumulado de `import module` y de cada paquete de primer nivel que arrastra (en segundos).
+    Un paquete importado dentro de otro cuenta en ambos, así que los tiempos se solapan.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} falló: {result.stderr.strip().splitlines()[-1]}")
+
+    total = None
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue
+        name = name.strip()
+        seconds = int(cumulative) / 1e6
+        if name == module:
+            total = seconds
+        elif "." not in name:
+            # Cada paquete se importa una vez: su acumulado ya incluye sus submódulos
+            packages[name] = packages.get(name, 0.0) + seconds
+    return total, packages
+
+
+def first_answer(query: str):
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_ANSWER_SCRIPT, query],
+        capture_output=True, text=True, env=_env(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"La primera respuesta falló:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(modules, query: str, repeat: int, top: int):
+    report = {"imports": {}, "heaviest": {}, "first_answer": {}}
+    for module in modules:
+        try:
+            runs = [import_profile(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"⚠️ {e} (se omite)", file=sys.stderr)
+            continue
+        report["imports"][module] = statistics.median(total for total, _ in runs)
+        packages = runs[-1][1]
+        report["heaviest"][module] = dict(sorted(packages.items(), key=lambda kv: -kv[1])[:top])
+
+    runs = [first_answer(query) for _ in range(repeat)]
+    for key in ("import_s", "build_s", "answer_s", "total_s"):
+        report["first_answer"][key] = statistics.median(run[key] for run in runs)
+    report["first_answer"]["source"] = runs[-1]["source"]
+    report["query"] = query
+    return report
+
+
+def _delta(value, base):
+    if base is None:
+        return ""
+    return f"  (referencia {base:.3f} s, {value - base:+.3f} s)"
+
+
+def print_report(report, baseline=None):
+    baseline = baseline or {}
+    print("⏱️ Importación (mediana, proceso nuevo):")
+    for module, seconds in report["imports"].items():
+        print(f"   {module:<12} {seconds:.3f} s{_delta(seconds, baseline.get('imports', {}).get(module))}")
+        heavy = ", ".join(f"{name} {s:.3f}" for name, s in report["heaviest"][module].items())
+        print(f"      más pesados: {heavy}")
+
+    fa = report["first_answer"]
+    base_fa = baseline.get("first_answer", {})
+    print(f"\n💬 Primera respuesta a {report['query']!r} ({fa['source']}):")
+    for key, label in [("import_s", "import agente"), ("build_s", "crear agente"),
+                       ("answer_s", "responder"), ("total_s", "total")]:
+        print(f"   {label:<14} {fa[key]:.3f} s{_delta(fa[key], base_fa.get(key))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de arranque en frío del agente")
+    parser.add_argument("--modules", nargs="+", default=ENTRY_MODULES, help="Módulos de entrada a importar")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Pregunta para medir la primera respuesta")
+    parser.add_argument("--repeat", type=int, default=3, help="Procesos por medida (se usa la mediana)")
+    parser.add_argument("--top", type=int, default=5, help="Paquetes más pesados a mostrar por módulo")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Fichero JSON de referencia")
+    parser.add_argument("--record-baseline", action="store_true", help="Guarda estas medidas como referencia")
+    args = parser.parse_args()
+
+    report = measure(args.modules, args.query, args.repeat, args.top)
+
+    baseline = None
+    if not args.record_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.record_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Referencia guardada en {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,186 +1,193 @@
+import asyncio
 import os
 import re
-import pandas as pd
-import chromadb
-from chromadb.utils import embedding_functions
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
+from bm25 import BM25Index, reciprocal_rank_fusion
+from country_aliases import CountryMatcher
+from leaderboard import LeaderboardIndex
+from llm_cache import LLM_CACHE_SEMANTIC, ResponseCache
+from rate_limit import get_llm_rate_limiter
+
+# El backend vectorial (chromadb), google.generativeai, el modelo de embeddings y pandas (medal_service) se importan
+# en su primer uso: las respuestas de Tools y del medallero no los necesitan y el arranque
+# (Gradio, CLI) no paga su coste.
 
 # =============================
 # 🔧 CONFIGURACIÓN INICIAL
 # =============================
 
 load_dotenv()  # Carga GOOGLE_API_KEY desde .env
+# Solo la necesita Gemini: se comprueba al crear el modelo, no al importar
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-if not GOOGLE_API_KEY:
-    raise ValueError("❌ Falta la variable de entorno GOOGLE_API_KEY.")
-
-# Configurar Gemini
-genai.configure(api_key=GOOGLE_API_KEY)
+# Máximo de documentos recuperados cuando la pregunta no acota año ni país
+MAX_RESULTS = 10
 
 # =============================
 # 📦 CLASE PRINCIPAL DEL RAG
 # =============================
 
 class RAG:
-    def __init__(self):
-        self.client = chromadb.PersistentClient(path="./chroma_db")
-        self.collection = self.client.get_collection("olympic_medals")
-        self.df = pd.read_csv("./olympic_medals_2000_2024.csv")
+    def __init__(self, backend=None):
         self.model = "models/gemini-2.5-flash"
+        self._genai_model = None
+        self._backend = backend  # índice vectorial ya abierto (si no, el de VECTOR_BACKEND en el primer uso)
+        self._lazy_lock = threading.Lock()
+        self._load_data()
+
+        # Caché de respuestas de Gemini (modelo + pregunta normalizada + contexto)
+        self.response_cache = ResponseCache(
+            embedding_function=self._embedding_function() if LLM_CACHE_SEMANTIC else None
+        )
+        # Solo las llamadas reales a Gemini cuentan para el límite (no las respuestas en caché)
+        self.rate_limiter = get_llm_rate_limiter()
+
+    @staticmethod
+    def _embedding_function():
+        from embeddings import get_embedding_function
+        return get_embedding_function()
+
+    @property
+    def backend(self):
+        """Índice vectorial (VECTOR_BACKEND: Chroma o NumPy), abierto en la primera búsqueda semántica."""
+        if self._backend is None:
+            with self._lazy_lock:
+                if self._backend is None:
+                    from vector_backends import create_backend
+                    self._backend = create_backend(embedding_function=self._embedding_function(), create=False)
+        return self._backend
+
+    def _load_data(self, service=None):
+        """Carga dataset e índices derivados (estado de solo lectura compartido entre hilos)."""
+        from medal_service import get_medal_service
+        # El dataset es el mismo que usan las herramientas (una sola copia en memoria por proceso)
+        df = (service or get_medal_service()).df
+        leaderboard = LeaderboardIndex(df)
+        # Índice léxico BM25 sobre los mismos documentos de la colección
+        lexical_index = BM25Index.from_dataframe(df)
+        # Nombres de país del dataset (para detectar filtros)
+        countries = sorted(df["country"].dropna().astype(str).unique())
+        # Detector de alias compartido + nombres del dataset (una sola pasada por mensaje)
+        country_matcher = CountryMatcher(extra_names=countries)
+
+        # Se construye todo antes de publicarlo para que las consultas en curso no vean un estado a medias
+        self.df = df
+        self.leaderboard = leaderboard
+        self.lexical_index = lexical_index
+        self.countries = countries
+        self.country_matcher = country_matcher
+
+    def reload(self):
+        """Vuelve a leer colección y dataset (p. ej. tras --scrape o --build-db)."""
+        from medal_service import reload_medal_service
+        self._load_data(reload_medal_service())
+        # La colección se vuelve a abrir en la próxima búsqueda
+        self._backend = None
 
-        # ==============================
-        # 🌍 Diccionario de alias de países
-        # ==============================
-        self.country_aliases = {
-            "eeuu": "United States",
-            "estados unidos": "United States",
-            "usa": "United States",
-            "canadá": "Canada",
-            "méxico": "Mexico",
-            "mexico": "Mexico",
-            "brasil": "Brazil",
-            "argentina": "Argentina",
-            "chile": "Chile",
-            "colombia": "Colombia",
-            "perú": "Peru",
-            "venezuela": "Venezuela",
-            "uruguay": "Uruguay",
-            "paraguay": "Paraguay",
-            "ecuador": "Ecuador",
-            "bolivia": "Bolivia",
-            "cuba": "Cuba",
-            "puerto rico": "Puerto Rico",
-            "república dominicana": "Dominican Republic",
-            "dominicana": "Dominican Republic",
-            "panamá": "Panama",
-            "panama": "Panama",
-            "costa rica": "Costa Rica",
-            "costarica": "Costa Rica",
-            "españa": "Spain",
-            "francia": "France",
-            "alemania": "Germany",
-            "reino unido": "Great Britain",
-            "gran bretaña": "Great Britain",
-            "inglaterra": "Great Britain",
-            "irlanda": "Ireland",
-            "portugal": "Portugal",
-            "italia": "Italy",
-            "suiza": "Switzerland",
-            "bélgica": "Belgium",
-            "belgica": "Belgium",
-            "países bajos": "Netherlands",
-            "holanda": "Netherlands",
-            "luxemburgo": "Luxembourg",
-            "mónaco": "Monaco",
-            "monaco": "Monaco",
-            "rusia": "ROC",
-            "federación rusa": "ROC",
-            "russian olympic committee": "ROC",
-            "ucrania": "Ukraine",
-            "polonia": "Poland",
-            "chequia": "Czech Republic",
-            "república checa": "Czech Republic",
-            "eslovaquia": "Slovakia",
-            "hungría": "Hungary",
-            "rumanía": "Romania",
-            "rumania": "Romania",
-            "bulgaria": "Bulgaria",
-            "serbia": "Serbia",
-            "croacia": "Croatia",
-            "eslovenia": "Slovenia",
-            "bosnia": "Bosnia and Herzegovina",
-            "albania": "Albania",
-            "grecia": "Greece",
-            "turquía": "Turkey",
-            "turquia": "Turkey",
-            "sudáfrica": "South Africa",
-            "sudafrica": "South Africa",
-            "nigeria": "Nigeria",
-            "kenia": "Kenya",
-            "etiopía": "Ethiopia",
-            "etiopia": "Ethiopia",
-            "egipto": "Egypt",
-            "marruecos": "Morocco",
-            "túnez": "Tunisia",
-            "argelia": "Algeria",
-            "ghana": "Ghana",
-            "camerún": "Cameroon",
-            "senegal": "Senegal",
-            "uganda": "Uganda",
-            "zimbabue": "Zimbabwe",
-            "china": "China",
-            "japón": "Japan",
-            "corea del sur": "South Korea",
-            "corea del norte": "North Korea",
-            "india": "India",
-            "indonesia": "Indonesia",
-            "malasia": "Malaysia",
-            "filipinas": "Philippines",
-            "singapur": "Singapore",
-            "vietnam": "Vietnam",
-            "tailandia": "Thailand",
-            "qatar": "Qatar",
-            "arabia saudita": "Saudi Arabia",
-            "emiratos árabes unidos": "United Arab Emirates",
-            "israel": "Israel",
-            "kazajistán": "Kazakhstan",
-            "uzbekistán": "Uzbekistan",
-            "irán": "Iran",
-            "iraq": "Iraq",
-            "siria": "Syria",
-            "taiwán": "Chinese Taipei",
-            "hong kong": "Hong Kong",
-            "mongolia": "Mongolia",
-            "pakistán": "Pakistan",
-            "australia": "Australia",
-            "nueva zelanda": "New Zealand",
-            "fiyi": "Fiji",
-            "samoa": "Samoa",
-            "papúa nueva guinea": "Papua New Guinea",
-            "roc": "ROC",
-            "urss": "ROC",
-            "china taipei": "Chinese Taipei",
-            "hong-kong": "Hong Kong",
-            "kosovo": "Kosovo",
-            "macedonia del norte": "North Macedonia",
-            "palestina": "Palestine",
-        }
+    def warm_up(self):
+        """Inicializa por adelantado el modelo de embeddings, el índice vectorial y el cliente de Gemini."""
+        self._embedding_function().warm_up()
+        self.backend.query("medallero olímpico", n_results=1)
+        self._get_model()
 
     # -------------------------
     # 🔍 Preguntas numéricas simples
     # -------------------------
+    @staticmethod
+    def _row_document(year, row) -> str:
+        return (
+            f"Year: {year} | Country: {row['country']} | Rank: {row['rank']} | Gold: {row['gold']}, "
+            f"Silver: {row['silver']}, Bronze: {row['bronze']}, Total: {row['total']}"
+        )
+
+    @staticmethod
+    def _metric(q: str) -> str:
+        """Medalla por la que se pregunta (total si no se especifica)."""
+        if "oro" in q:
+            return "gold"
+        if "plata" in q:
+            return "silver"
+        if "bronce" in q:
+            return "bronze"
+        return "total"
+
+    def _range_answer(self, q: str, year):
+        """Países con un número de medallas en un rango ("entre 10 y 20", "más de 30", "al menos 5", "menos de 3")."""
+        range_match = re.search(r"\bentre\s+(\d+)\s+y\s+(\d+)\s+medallas", q)
+        bound_match = None if range_match else re.search(r"\b(más de|al menos|menos de)\s+(\d+)\s+medallas", q)
+        if not range_match and not bound_match:
+            return None, None
+
+        if range_match:
+            low, high = sorted(int(g) for g in range_match.groups())
+            description = f"entre {low} y {high}"
+        else:
+            bound, value = bound_match.group(1), int(bound_match.group(2))
+            low, high = {
+                "más de": (value + 1, float("inf")),
+                "al menos": (value, float("inf")),
+                "menos de": (0, value - 1),
+            }[bound]
+            description = f"{bound} {value}"
+
+        metric = self._metric(q)
+        rows = self.leaderboard.between(year, metric, low, high)
+        if not rows:
+            return f"En {year}, ningún país ganó {description} medallas de {metric}.", []
+        lines = [f"{i}. **{r['country']}** — {r[metric]} medallas" for i, r in enumerate(rows, 1)]
+        return (
+            f"En {year}, {len(rows)} países ganaron {description} medallas de {metric}:\n" + "\n".join(lines),
+            [self._row_document(year, r) for r in rows]
+        )
+
     def detect_top_country_question(self, query: str):
         q = query.lower()
 
         # --- EXTRAER AÑO ---
         year_match = re.search(r"20\d{2}", q)
-        year = int(year_match.group()) if year_match else self.df["year"].max()
+        year = int(year_match.group()) if year_match else self.leaderboard.latest_year
 
-        subset = self.df[self.df["year"] == year]
-        if subset.empty:
+        if not self.leaderboard.has_year(year):
             return f"No hay datos disponibles del año {year}.", []
 
+        # --- TOP N ("top 5", "los 3 primeros", "10 mejores países") ---
+        n_match = re.search(r"\btop\s*(\d{1,2})\b|\b(\d{1,2})\s+(?:primeros|mejores|países)\b", q)
+        top_n = int(n_match.group(1) or n_match.group(2)) if n_match else 1
+
+        # --- RANGOS DE MEDALLAS ---
+        answer, documents = self._range_answer(q, year)
+        if answer:
+            return answer, documents
+
         # --- PREGUNTAS SOBRE MEDALLAS ---
         if "más medallas" in q:
-            if "oro" in q:
-                metric = "gold"
-            elif "plata" in q:
-                metric = "silver"
-            elif "bronce" in q:
-                metric = "bronze"
-            else:
-                metric = "total"
+            metric = self._metric(q)
 
-            top = subset.sort_values(by=metric, ascending=False).iloc[0]
+            if top_n > 1:
+                rows = self.leaderboard.top(year, metric, top_n)
+                lines = [f"{i}. **{r['country']}** — {r[metric]} medallas" for i, r in enumerate(rows, 1)]
+                return (
+                    f"En {year}, los {len(rows)} países con más medallas de {metric} fueron:\n" + "\n".join(lines),
+                    [self._row_document(year, r) for r in rows]
+                )
+
+            top = self.leaderboard.top(year, metric)[0]
             return (
                 f"En {year}, **{top['country']}** fue el país con más medallas de {metric}, con **{top[metric]} medallas**.",
-                [f"Year: {year} | Country: {top['country']} | Rank: {top['rank']} | Gold: {top['gold']}, Silver: {top['silver']}, Bronze: {top['bronze']}, Total: {top['total']}"]
+                [self._row_document(year, top)]
             )
 
         # --- PREGUNTAS SOBRE RANKING / POSICIÓN ---
         if any(x in q for x in ["ranking", "posición", "puesto", "quedó", "primer", "segundo", "tercer", "último", "peor"]):
+            if top_n > 1:
+                rows = self.leaderboard.top(year, "rank", top_n)
+                lines = [f"{r['rank']}. **{r['country']}**" for r in rows]
+                return (
+                    f"En {year}, los {len(rows)} primeros del ranking olímpico fueron:\n" + "\n".join(lines),
+                    [self._row_document(year, r) for r in rows]
+                )
+
             # Determinar posición buscada
             if "primer" in q or "primero" in q:
                 pos = 1
@@ -189,15 +196,14 @@ class RAG:
             elif "tercer" in q or "tercero" in q:
                 pos = 3
             elif "último" in q or "peor" in q:
-                pos = len(subset)
+                pos = self.leaderboard.size(year)
             else:
                 pos = 1  # por defecto, el primero
 
-            subset_sorted = subset.sort_values(by="rank", ascending=True)
-            if pos > len(subset_sorted):
+            country = self.leaderboard.at_position(year, pos)
+            if country is None:
                 return f"No hay suficientes países registrados para mostrar la posición {pos}.", []
 
-            country = subset_sorted.iloc[pos - 1]
             position_text = (
                 "primer" if pos == 1 else
                 "segundo" if pos == 2 else
@@ -207,7 +213,7 @@ class RAG:
 
             return (
                 f"En {year}, **{country['country']}** ocupó el {position_text} lugar en el ranking olímpico (posición {country['rank']}).",
-                [f"Year: {year} | Country: {country['country']} | Rank: {country['rank']} | Gold: {country['gold']}, Silver: {country['silver']}, Bronze: {country['bronze']}, Total: {country['total']}"]
+                [self._row_document(year, country)]
             )
 
         # --- Ningún patrón detectado ---
@@ -216,54 +222,231 @@ class RAG:
     # -------------------------
     # 🔎 Recuperación semántica
     # -------------------------
-    def retrieve_context(self, query: str, year_filter=None):
-        query_text = query
+    def detect_countries(self, query: str):
+        """Países del dataset mencionados (por nombre o alias) en la pregunta."""
+        known = set(self.countries)
+        return [c for c in self.country_matcher.countries(query) if c in known]
+
+    def _where_filter(self, year_filter=None, country_filter=None):
+        """Filtro `where` (sintaxis de Chroma, la misma en ambos backends) sobre los metadatos año/país."""
+        clauses = []
         if year_filter:
-            query_text += f" año {year_filter}"
+            clauses.append({"year": int(year_filter)})
+        if country_filter:
+            clauses.append({"country": {"$in": list(country_filter)}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _adaptive_n_results(self, year_filter=None, country_filter=None) -> int:
+        """Cuántos documentos pedir: con año y país basta una fila por país."""
+        if year_filter and country_filter:
+            return len(country_filter)
+        if country_filter:
+            return min(MAX_RESULTS, len(country_filter) * self.df["year"].nunique())
+        return MAX_RESULTS
+
+    def retrieve_context(self, query: str, year_filter=None, country_filter=None, n_results=None):
+        """
+        Recuperación híbrida sobre los documentos del medallero:
+        - Búsqueda exacta: si año/país identifican todos los documentos necesarios, se devuelven
+          desde el índice léxico sin calcular ningún embedding.
+        - Si no, se fusionan (Reciprocal Rank Fusion) el ranking BM25 y el del índice vectorial, ambos con
+          los filtros de metadatos año / país. Si el índice vectorial no devuelve nada con el filtro
+          (p. ej. índice antiguo sin metadatos), repite sin filtrar.
+        """
+        n_results = n_results or self._adaptive_n_results(year_filter, country_filter)
+
+        if country_filter:
+            exact = self.lexical_index.filter(year_filter, country_filter)
+            if exact and len(exact) <= n_results:
+                return self.lexical_index.get(exact)
+
+        lexical = self.lexical_index.search(query, n_results, year_filter, country_filter)
+        where = self._where_filter(year_filter, country_filter)
+
+        ids, documents = self.backend.query(query, n_results=n_results, where=where)
+        if not ids and where is not None:
+            ids, documents = self.backend.query(query, n_results=MAX_RESULTS)
+        vector_docs = dict(zip(ids, documents))
 
-        results = self.collection.query(query_texts=[query_text], n_results=10)
-        documents = results.get("documents", [[]])[0]
-        return documents
+        fused = reciprocal_rank_fusion(lexical, list(vector_docs), n_results=n_results)
+        # Texto del índice léxico (mismo dataset); el del índice vectorial solo si el ID ya no está en el dataset
+        return [self.lexical_index.document(doc_id) or vector_docs[doc_id] for doc_id in fused]
 
     # -------------------------
     # 💬 Generación con Gemini
     # -------------------------
+    def _get_model(self):
+        """Modelo de Gemini reutilizado entre llamadas (se crea en el primer uso)."""
+        if self._genai_model is None:
+            if not GOOGLE_API_KEY:
+                raise ValueError("❌ Falta la variable de entorno GOOGLE_API_KEY.")
+            with self._lazy_lock:
+                if self._genai_model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=GOOGLE_API_KEY)
+                    self._genai_model = genai.GenerativeModel(self.model)
+        return self._genai_model
+
+    @staticmethod
+    def _build_prompt(query: str, context: str) -> str:
+        return (
+            f"Usa la siguiente información del medallero olímpico para responder de forma breve y precisa.\n\n"
+            f"Contexto:\n{context}\n\n"
+            f"Pregunta: {query}"
+        )
+
     def generate_answer(self, query: str, context: str):
+        cached = self.response_cache.get(self.model, query, context)
+        if cached is not None:
+            return cached
+
         try:
-            model = genai.GenerativeModel(self.model)
-            prompt = (
-                f"Usa la siguiente información del medallero olímpico para responder de forma breve y precisa.\n\n"
-                f"Contexto:\n{context}\n\n"
-                f"Pregunta: {query}"
-            )
-            response = model.generate_content(prompt)
-            return response.text if hasattr(response, "text") else str(response)
+            self.rate_limiter.acquire()
+            response = self._get_model().generate_content(self._build_prompt(query, context))
+            answer = response.text if hasattr(response, "text") else str(response)
+            self.response_cache.put(self.model, query, context, answer)
+            return answer
+        except Exception as e:
+            return f"⚠️ Error al usar Google GenAI: {e}"
+
+    def generate_answer_stream(self, query: str, context: str):
+        """Como `generate_answer`, pero va devolviendo los fragmentos de texto según llegan."""
+        cached = self.response_cache.get(self.model, query, context)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            self.rate_limiter.acquire()
+            for chunk in self._get_model().generate_content(self._build_prompt(query, context), stream=True):
+                text = getattr(chunk, "text", "")
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            yield f"⚠️ Error al usar Google GenAI: {e}"
+            return
+        # Solo se llega aquí si el stream terminó entero (si el consumidor corta, el generador se cierra
+        # en el `yield`); una respuesta vacía no se guarda para no servirla después desde la caché
+        answer = "".join(parts)
+        if answer.strip():
+            self.response_cache.put(self.model, query, context, answer)
+
+    async def generate_answer_stream_async(self, query: str, context: str):
+        """Como `generate_answer_stream`, pero esperando a Gemini sin bloquear el bucle de eventos."""
+        cached = await asyncio.to_thread(self.response_cache.get, self.model, query, context)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            await self.rate_limiter.acquire_async()
+            response = await self._get_model().generate_content_async(self._build_prompt(query, context), stream=True)
+            async for chunk in response:
+                text = getattr(chunk, "text", "")
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            yield f"⚠️ Error al usar Google GenAI: {e}"
+            return
+        # Igual que en `generate_answer_stream`: solo respuestas completas y no vacías
+        answer = "".join(parts)
+        if answer.strip():
+            await asyncio.to_thread(self.response_cache.put, self.model, query, context, answer)
+
+    async def generate_answer_async(self, query: str, context: str):
+        """Como `generate_answer`, pero sin bloquear el bucle de eventos mientras responde Gemini."""
+        cached = await asyncio.to_thread(self.response_cache.get, self.model, query, context)
+        if cached is not None:
+            return cached
+
+        try:
+            await self.rate_limiter.acquire_async()
+            response = await self._get_model().generate_content_async(self._build_prompt(query, context))
+            answer = response.text if hasattr(response, "text") else str(response)
+            await asyncio.to_thread(self.response_cache.put, self.model, query, context, answer)
+            return answer
         except Exception as e:
             return f"⚠️ Error al usar Google GenAI: {e}"
 
     # -------------------------
     # 🧠 Lógica principal del RAG
     # -------------------------
-    def answer_question(self, query: str):
-        q_lower = query.lower()
-        for alias, real_name in self.country_aliases.items():
-            if alias in q_lower:
-                query = query.replace(alias, real_name)
-                break        
+    def query_filters(self, query: str):
+        """Año y países mencionados en la pregunta (filtros de la recuperación)."""
+        year_match = re.search(r"20\d{2}", query)
+        year_filter = int(year_match.group()) if year_match else None
+        return year_filter, self.detect_countries(query)
+
+    def _prepare(self, query: str):
+        """Pasos previos a Gemini: alias, respuesta estructurada y recuperación de contexto."""
+        query = self.country_matcher.replace(query)
         # Paso 1: respuesta estructurada
         direct_answer, direct_docs = self.detect_top_country_question(query)
         if direct_answer:
-            return direct_answer, direct_docs
+            return query, direct_answer, direct_docs
 
-        # Paso 2: detectar año
-        year_match = re.search(r"20\d{2}", query)
-        year_filter = int(year_match.group()) if year_match else None
+        # Paso 2: detectar año y países
+        year_filter, country_filter = self.query_filters(query)
 
         # Paso 3: recuperar contexto
-        documents = self.retrieve_context(query, year_filter)
-        context = "\n".join(documents[:10])
+        documents = self.retrieve_context(query, year_filter, country_filter)
+        return query, None, documents
+
+    def answer_question(self, query: str):
+        query, direct_answer, documents = self._prepare(query)
+        if direct_answer:
+            return direct_answer, documents
 
         # Paso 4: generar respuesta con modelo
-        answer = self.generate_answer(query, context)
+        answer = self.generate_answer(query, "\n".join(documents))
+
+        return answer, documents
+
+    def answer_question_stream(self, query: str):
+        """Generador de (respuesta parcial acumulada, documentos) para mostrar la respuesta mientras se genera."""
+        query, direct_answer, documents = self._prepare(query)
+        if direct_answer:
+            yield direct_answer, documents
+            return
+
+        answer = ""
+        for text in self.generate_answer_stream(query, "\n".join(documents)):
+            answer += text
+            yield answer, documents
+
+    async def answer_question_async(self, query: str):
+        """
+        Versión asíncrona de `answer_question` para atender muchas sesiones en un mismo bucle.
+        El detector estructurado (en memoria) va primero; solo si no responde se lanza la
+        recuperación (embeddings + índice vectorial) en un hilo y después Gemini sin bloquear el bucle.
+        """
+        query = self.country_matcher.replace(query)
+        direct_answer, direct_docs = self.detect_top_country_question(query)
+        if direct_answer:
+            return direct_answer, direct_docs
+
+        year_filter, country_filter = self.query_filters(query)
+        documents = await asyncio.to_thread(self.retrieve_context, query, year_filter, country_filter)
+        answer = await self.generate_answer_async(query, "\n".join(documents))
+        return answer, documents
+
+    async def answer_question_stream_async(self, query: str):
+        """Versión asíncrona de `answer_question_stream` (la usa el chat de Gradio)."""
+        query = self.country_matcher.replace(query)
+        direct_answer, direct_docs = self.detect_top_country_question(query)
+        if direct_answer:
+            yield direct_answer, direct_docs
+            return
 
-        return answer, documents[:10]
+        year_filter, country_filter = self.query_filters(query)
+        documents = await asyncio.to_thread(self.retrieve_context, query, year_filter, country_filter)
+        answer = ""
+        async for text in self.generate_answer_stream_async(query, "\n".join(documents)):
+            answer += text
+            yield answer, documents
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+# Peticiones por minuto permitidas a Gemini (0 = sin límite)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+WINDOW_SECONDS = 60.0
+
+
+class RateLimiter:
+    """
+    Limitador de ventana deslizante compartido entre hilos: nunca deja pasar más de
+    `max_calls` llamadas en `window` segundos; las que sobran esperan su turno.
+    """
+
+    def __init__(self, max_calls: int, window: float = WINDOW_SECONDS):
+        self.max_calls = max_calls
+        self.window = window
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _reserve(self) -> float:
+        """Registra la llamada si hay hueco (devuelve 0) o devuelve cuántos segundos esperar."""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= self.window:
+                self._calls.popleft()
+            if len(self._calls) < self.max_calls:
+                self._calls.append(now)
+                return 0.0
+            wait = self._calls[0] + self.window - now
+            self.waited += wait
+            return wait
+
+    def acquire(self):
+        """Bloquea hasta que haya hueco en la ventana y registra la llamada."""
+        if self.max_calls <= 0:
+            return
+        wait = self._reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._reserve()
+
+    async def acquire_async(self):
+        """Como `acquire`, pero espera sin bloquear el bucle de eventos."""
+        if self.max_calls <= 0:
+            return
+        wait = self._reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._reserve()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> RateLimiter:
+    """Límite de Gemini compartido por todo el proceso (chat, Gradio y modo batch)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(GEMINI_RPM)
+        return _limiter
@@ -0,0 +1,157 @@
+import re
+from typing import NamedTuple
+from country_aliases import fold, get_country_matcher
+
+# Confianza mínima para llamar a una Tool (una pista débil sola no basta); por debajo va al RAG
+MIN_CONFIDENCE = 0.6
+
+# Pistas por intención: frase (sin tildes) -> peso. Las pistas débiles solo deciden si no
+# hay otra intención con pistas fuertes ("qué clima hace hoy" es clima, no hora).
+INTENT_CUES = {
+    "time": {
+        "que hora": 1.0, "dime la hora": 1.0, "hora": 1.0, "fecha": 1.0, "que dia es": 1.0, "hoy": 0.5,
+    },
+    "fun_fact": {
+        "dato curioso": 1.0, "curiosidad": 1.0, "curiosidades": 1.0, "hecho interesante": 1.0, "sabias que": 1.0,
+    },
+    "weather": {
+        "clima": 1.0, "temperatura": 1.0, "hace calor": 1.0, "hace frio": 1.0, "llueve": 1.0,
+        "lloviendo": 1.0, "tiempo hace": 1.0, "tiempo": 0.5,
+    },
+    "compare": {
+        "vs": 1.0, "versus": 1.0, "frente a": 0.5, "entre": 0.25, "o": 0.25, "y": 0.25, "v": 0.25,
+    },
+}
+# Pistas de pregunta sobre el medallero (las responde el RAG): no compiten con las Tools,
+# solo dan la confianza de la ruta "rag"
+RAG_CUES = {
+    "medalla": 1.0, "medallas": 1.0, "medallero": 1.0, "oro": 1.0, "plata": 1.0, "bronce": 1.0,
+    "ranking": 1.0, "puesto": 1.0, "olimpiadas": 1.0, "juegos olimpicos": 1.0,
+    "gano": 0.5, "ganaron": 0.5, "cuantas": 0.5, "pais": 0.5, "paises": 0.5,
+}
+# Prefijos de palabra ("compara", "comparar", "comparación"...)
+PREFIX_CUES = {"compar": ("compare", 1.0)}
+# Peso mínimo de una pista de comparación explícita ("compara", "vs", "frente a"); " y " / " o " no lo son
+EXPLICIT_COMPARE = 0.5
+
+# Palabras que siguen a la ciudad y no forman parte de ella ("en Tokio ahora mismo")
+CITY_STOPWORDS = {"ahora", "mismo", "hoy", "manana", "actualmente", "por", "favor"}
+DEFAULT_CITY = "Madrid"
+
+
+def _compile_cues():
+    """Tabla única frase -> (intención, peso) y longitud máxima de frase en palabras."""
+    table = {phrase: ("rag", weight) for phrase, weight in RAG_CUES.items()}
+    for intent, cues in INTENT_CUES.items():
+        for phrase, weight in cues.items():
+            table[phrase] = (intent, weight)
+    return table, max(len(phrase.split()) for phrase in table)
+
+
+def _confidence(best: float, total: float) -> float:
+    return round(min(best, 1.0) * best / total, 3) if total else 0.0
+
+
+_CUE_TABLE, _MAX_CUE_WORDS = _compile_cues()
+_WORD_PATTERN = re.compile(r"\w+")
+_CITY_PATTERN = re.compile(r"(?<!\w)en\s+([^\W\d_][\w\s\-]*)", re.IGNORECASE)
+
+
+def _is_year(word: str) -> bool:
+    return len(word) == 4 and word.isdigit() and word[:2] in ("19", "20")
+
+
+class Route(NamedTuple):
+    intent: str
+    slots: dict
+    confidence: float
+
+
+class IntentRouter:
+    """
+    Clasificador de intención compilado: una pasada por las palabras de la pregunta sin
+    tildes buscando la frase más larga de la tabla de pistas (y los años), y el detector de
+    países solo si hay pistas de comparación. Devuelve la intención
+    ("time", "fun_fact", "weather", "compare" o "rag"), los slots extraídos (ciudad, año,
+    años, países) y una confianza entre 0 y 1.
+    """
+
+    def __init__(self, country_matcher=None, min_confidence: float = MIN_CONFIDENCE):
+        self.country_matcher = country_matcher or get_country_matcher()
+        self.min_confidence = min_confidence
+
+    @staticmethod
+    def _city(query: str):
+        match = _CITY_PATTERN.search(query)
+        if not match:
+            return None
+        words = []
+        for word in match.group(1).split():
+            if fold(word) in CITY_STOPWORDS:
+                break
+            words.append(word)
+        return " ".join(words) or None
+
+    def route(self, query: str) -> Route:
+        words = _WORD_PATTERN.findall(fold(query))
+        scores = dict.fromkeys(INTENT_CUES, 0.0)
+        rag_score = 0.0
+        years = []
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if _is_year(word) and int(word) not in years:
+                years.append(int(word))
+            for n in range(min(_MAX_CUE_WORDS, len(words) - i), 0, -1):
+                cue = _CUE_TABLE.get(word if n == 1 else " ".join(words[i:i + n]))
+                if cue:
+                    if cue[0] == "rag":
+                        rag_score += cue[1]
+                    else:
+                        scores[cue[0]] += cue[1]
+                    i += n
+                    break
+            else:
+                for prefix, (intent, weight) in PREFIX_CUES.items():
+                    if word.startswith(prefix):
+                        scores[intent] += weight
+                i += 1
+
+        # Sin dos países no hay comparación posible: " o " / " y " solos no la activan
+        explicit_compare = scores["compare"] >= EXPLICIT_COMPARE
+        countries = self.country_matcher.countries(query) if scores["compare"] else []
+        if len(countries) >= 2:
+            scores["compare"] += 0.5
+        else:
+            scores["compare"] = 0.0
+
+        year = years[0] if years else None
+        intent = max(scores, key=scores.get)
+        best = scores[intent]
+        total = sum(scores.values())
+        confidence = _confidence(best, total)
+        if confidence < self.min_confidence:
+            # Confianza propia del RAG: sus pistas frente a todas las de la pregunta (0 si no hay ninguna)
+            return Route("rag", {"year": year}, _confidence(rag_score, rag_score + total))
+
+        slots = {}
+        if intent == "weather":
+            slots["city"] = self._city(query) or DEFAULT_CITY
+        elif intent == "compare":
+            slots["countries"] = countries
+            slots["year"] = year
+            slots["years"] = years
+            # Sin pista explícita ni año ("medallas de Kenia y Brasil") no se supone una edición
+            slots["explicit"] = explicit_compare
+        return Route(intent, slots, confidence)
+
+
+_default_router = None
+
+
+def get_router() -> IntentRouter:
+    """Router con el detector de países por defecto (solo alias, sin nombres del dataset)."""
+    global _default_router
+    if _default_router is None:
+        _default_router = IntentRouter()
+    return _default_router
@@ -1,12 +1,41 @@
+import asyncio
 import re
+import time
+from contextlib import asynccontextmanager
+from io import BytesIO
+from urllib.parse import urlparse
 import pandas as pd
+import requests
+from lxml import etree
 from tqdm import tqdm
-from playwright.sync_api import sync_playwright
+from medal_data import DATA_DIR, write_partitions
+from snapshots import SnapshotStore
 from tools import setup_logging, clean_text
 
 YEARS = [2000, 2004, 2008, 2012, 2016, 2020, 2024]
 BASE_URL = "https://en.wikipedia.org/wiki/{}_Summer_Olympics_medal_table"
 
+# Cortesía con el servidor: máximo de navegaciones simultáneas por host
+# y separación mínima (segundos) entre el inicio de dos peticiones al mismo host.
+HOST_MAX_CONNECTIONS = 4
+HOST_MIN_INTERVAL = 0.5
+
+USER_AGENT = "OlympicMedalsScraper/1.0 (+https://github.com/Mariwela/ModeloIA_Entrenamiento)"
+HTTP_TIMEOUT = 30
+
+MEDAL_COLUMNS = ["rank", "country", "gold", "silver", "bronze", "total"]
+RENAME_MAP = {
+    "noc": "country",
+    "team/noc": "country",
+    "nation": "country",
+    "country": "country",
+    "rank": "rank",
+    "gold": "gold",
+    "silver": "silver",
+    "bronze": "bronze",
+    "total": "total",
+}
+
 
 def _clean_country(name: str) -> str:
     """Limpia texto de país (sin banderas, notas ni paréntesis)."""
@@ -18,78 +47,425 @@ def _clean_country(name: str) -> str:
     return name
 
 
-def scrape_medal_table_for_year(year: int, page) -> pd.DataFrame:
-    """Scrapea el medallero de un año específico usando Playwright."""
-    url = BASE_URL.format(year)
-    print(f"🌐 Scrapeando {year}: {url}")
-    page.goto(url, timeout=60000)
-    page.wait_for_selector("table.wikitable", timeout=30000)
+def _is_wikitable(table) -> bool:
+    return "wikitable" in (table.get("class") or "").split()
+
+
+def _cell_text(cell) -> str:
+    return " ".join("".join(cell.itertext()).split())
+
+
+def _header_texts(table):
+    """Textos de la primera fila si es de encabezado (solo <th>); si no, None."""
+    for row in table.iter("tr"):
+        cells = [c for c in row if c.tag in ("th", "td")]
+        if cells and all(c.tag == "th" for c in cells):
+            return [_cell_text(c) for c in cells]
+        return None
+    return None
+
 
-    # Obtén todas las tablas y elige la que contenga encabezados típicos
-    tables = page.query_selector_all("table.wikitable")
-    html_tables = [t.inner_html() for t in tables]
+def _is_medal_header(headers) -> bool:
+    """Encabezados típicos de medallero: Gold + Nation/NOC/Team/Country."""
+    if not headers:
+        return False
+    return (any(re.search(r"Gold", h, re.I) for h in headers)
+            and any(re.search(r"Nation|NOC|Team|Country", h, re.I) for h in headers))
 
-    target_html = None
-    for html in html_tables:
-        if re.search(r"Gold", html, re.I) and re.search(r"Nation|NOC|Team|Country", html, re.I):
-            target_html = html
-            break
 
-    if not target_html:
-        target_html = html_tables[0]
+def _iter_wikitables(page_html):
+    """Recorre en streaming las `table.wikitable` de la página, a medida que se cierran."""
+    data = page_html.encode("utf-8") if isinstance(page_html, str) else page_html
+    for _, table in etree.iterparse(BytesIO(data), events=("end",), tag="table", html=True, encoding="utf-8"):
+        if _is_wikitable(table):
+            yield table
+
+
+def _select_medal_table(page_html, fallback: bool = False):
+    """
+    Primera `wikitable` con encabezados de medallero; deja de leer la página al encontrarla.
+    Con `fallback=True` devuelve la primera `wikitable` si ninguna coincide.
+    """
+    first = None
+    for table in _iter_wikitables(page_html):
+        if _is_medal_header(_header_texts(table)):
+            return table
+        if first is None:
+            first = table
+        else:
+            table.clear()  # libera las tablas descartadas
+
+    if fallback and first is not None:
         print(f"⚠️ Usando primera tabla (no se detectó encabezado típico)")
+        return first
+    return None
+
+
+def find_medal_table(page_html):
+    """Elemento de la tabla del medallero dentro de una página completa, o None si no aparece."""
+    return _select_medal_table(page_html)
+
+
+def parse_medal_page(page_html, year: int) -> pd.DataFrame:
+    """Extrae el medallero de una página HTML completa (sin navegador ni red)."""
+    table = _select_medal_table(page_html, fallback=True)
+    if table is None:
+        raise ValueError(f"No se encontró ninguna tabla 'wikitable' para {year}")
+    return _parse_medal_table(table, year)
+
+
+def _cell_span(cell, attr: str) -> int:
+    try:
+        return max(1, int(cell.get(attr, 1)))
+    except ValueError:
+        return 1
+
 
-    # Parsea la tabla HTML con pandas
-    df = pd.read_html(f"<table>{target_html}</table>")[0]
-
-    # Normaliza columnas
-    df.columns = [str(c).strip().lower() for c in df.columns]
-    rename_map = {
-        "noc": "country",
-        "team/noc": "country",
-        "nation": "country",
-        "country": "country",
-        "rank": "rank",
-        "gold": "gold",
-        "silver": "silver",
-        "bronze": "bronze",
-        "total": "total",
-    }
-    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
+def _table_rows(table):
+    """Filas de la tabla como listas de texto, resolviendo rowspan/colspan (empates en el ranking)."""
+    pending = {}  # columna -> [filas restantes, texto]
+    for tr in table.iter("tr"):
+        cells = iter([c for c in tr if c.tag in ("th", "td")])
+        row = []
+        col = 0
+        while True:
+            if col in pending:
+                remaining, text = pending[col]
+                row.append(text)
+                if remaining > 1:
+                    pending[col][0] -= 1
+                else:
+                    del pending[col]
+                col += 1
+                continue
+            cell = next(cells, None)
+            if cell is None:
+                if any(c > col for c in pending):
+                    row.append("")
+                    col += 1
+                    continue
+                break
+            text = _cell_text(cell)
+            rowspan = _cell_span(cell, "rowspan")
+            for _ in range(_cell_span(cell, "colspan")):
+                row.append(text)
+                if rowspan > 1:
+                    pending[col] = [rowspan - 1, text]
+                col += 1
+        yield row
+
+
+def _to_number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return float("nan")
+
+
+def _parse_medal_table(table, year: int) -> pd.DataFrame:
+    """Convierte la tabla del medallero en DataFrame con columnas ya tipadas."""
+    rows = _table_rows(table)
+    headers = next(rows, [])
+
+    # Normaliza columnas: posición de cada columna esperada en la tabla
+    positions = {}
+    for i, header in enumerate(headers):
+        name = RENAME_MAP.get(re.sub(r"\[.*?\]", "", header).strip().lower())
+        if name and name not in positions:
+            positions[name] = i
+    if "country" not in positions:
+        raise ValueError(f"La tabla de {year} no tiene columna de país")
 
     # Filtra columnas esperadas
-    df = df[[c for c in ["rank", "country", "gold", "silver", "bronze", "total"] if c in df.columns]]
+    columns = {c: [] for c in MEDAL_COLUMNS if c in positions}
 
-    # Limpieza de filas
-    df["country"] = df["country"].apply(_clean_country)
-    df = df[df["country"].notna()]
-    df = df[~df["country"].str.contains("Totals|Total|Rank", case=False, na=False)]
-    df = df[~df["country"].str.match(r"^\d+$")]  # elimina filas numéricas
+    for row in rows:
+        row = row + [""] * (len(headers) - len(row))
 
-    # Convierte medallas a números
-    for col in ["gold", "silver", "bronze", "total", "rank"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+        # Limpieza de filas
+        country = _clean_country(row[positions["country"]])
+        if re.search(r"Totals|Total|Rank", country, re.I) or re.match(r"^\d+$", country):
+            continue
 
+        for col in columns:
+            value = row[positions[col]]
+            # Convierte medallas a números
+            columns[col].append(country if col == "country" else _to_number(value))
+
+    df = pd.DataFrame(columns)
     df["year"] = year
-    return df.reset_index(drop=True)
+    return df
 
 
-def scrape_all(years=YEARS) -> pd.DataFrame:
-    """Scrapea todos los años con una sola sesión de Playwright."""
-    all_dfs = []
+def _load_snapshot(url: str, store: SnapshotStore) -> str:
+    """HTML guardado para `url`; en modo offline no hay otra fuente posible."""
+    html = store.load(url) if store else None
+    if html is None:
+        raise FileNotFoundError(f"No hay snapshot para {url} (modo offline)")
+    return html
+
+
+# ---------------------------
+# Vía rápida: HTTP + lxml (sin navegador)
+# ---------------------------
+def new_http_session() -> requests.Session:
+    """Sesión HTTP reutilizable (keep-alive) para la vía sin navegador."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def fetch_static_medal_table(url: str, session: requests.Session, store: SnapshotStore = None):
+    """
+    Descarga `url` por HTTP y devuelve la tabla del medallero (elemento lxml), o None si el HTML
+    estático no la contiene (o la petición falla) y hay que recurrir a Playwright.
+    Revalida con ETag/Last-Modified y solo guarda el snapshot si la tabla aparece.
+    """
+    validators = store.validators(url) if store else {}
+    try:
+        r = session.get(url, headers=validators, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"⚠️ Falló la descarga HTTP de {url}: {e}")
+        return None
+
+    if r.status_code == 304 and validators:
+        print(f"♻️ Sin cambios (304), usando snapshot: {url}")
+        store.touch(url)
+        return find_medal_table(store.load(url))
+    if r.status_code != 200:
+        print(f"⚠️ HTTP {r.status_code} en {url}")
+        return None
+
+    table = find_medal_table(r.content)
+    if table is not None and store:
+        store.save(url, r.text, r.headers)
+    return table
+
+
+# ---------------------------
+# Respaldo: Playwright (página renderizada)
+# ---------------------------
+def fetch_page_html(url: str, page, store: SnapshotStore = None) -> str:
+    """Descarga el HTML renderizado de `url` con Playwright y lo guarda como snapshot."""
+    response = page.goto(url, timeout=60000)
+    page.wait_for_selector("table.wikitable", timeout=30000)
+    html = page.content()
+    if store:
+        store.save(url, html, response.headers if response else None)
+    return html
+
+
+def _scrape_with_browser(year: int, page=None, store: SnapshotStore = None) -> pd.DataFrame:
+    """Scrapea `year` con Playwright; si no se pasa `page` abre un navegador solo para esta página."""
+    url = BASE_URL.format(year)
+    print(f"🧭 Sin tabla en el HTML estático, usando Playwright: {url}")
+    if page is not None:
+        return parse_medal_page(fetch_page_html(url, page, store), year)
+
+    from playwright.sync_api import sync_playwright
 
     with sync_playwright() as p:
         browser = p.firefox.launch(headless=True)
-        page = browser.new_page()
-        for year in tqdm(years, desc="Scrapeando medalleros"):
+        try:
+            return parse_medal_page(fetch_page_html(url, browser.new_page(), store), year)
+        finally:
+            browser.close()
+
+
+def scrape_medal_table_for_year(year: int, page=None, store: SnapshotStore = None, offline: bool = False,
+                                session: requests.Session = None) -> pd.DataFrame:
+    """
+    Scrapea el medallero de un año específico.
+    Primero prueba HTTP + lxml; solo si el HTML estático no trae la tabla recurre a Playwright.
+    En modo offline parsea únicamente el snapshot guardado.
+    """
+    url = BASE_URL.format(year)
+    if offline:
+        print(f"📦 Leyendo snapshot {year}: {url}")
+        return parse_medal_page(_load_snapshot(url, store), year)
+
+    print(f"🌐 Scrapeando {year}: {url}")
+    table = fetch_static_medal_table(url, session or new_http_session(), store)
+    if table is not None:
+        return _parse_medal_table(table, year)
+    return _scrape_with_browser(year, page, store)
+
+
+# ---------------------------
+# Crawler asíncrono (varias páginas en paralelo)
+# ---------------------------
+class HostThrottle:
+    """Limita las navegaciones concurrentes y el ritmo de peticiones por host."""
+
+    def __init__(self, max_per_host: int = HOST_MAX_CONNECTIONS, min_interval: float = HOST_MIN_INTERVAL):
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Reserva un hueco para `url` respetando el límite y el intervalo de su host."""
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            async with lock:
+                wait = self._last_start.get(host, 0.0) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield
+
+
+async def _scrape_static_async(year: int, session: requests.Session, throttle: HostThrottle,
+                               limit: asyncio.Semaphore, store: SnapshotStore = None):
+    """Vía rápida en un hilo aparte; devuelve None si hace falta el navegador."""
+    url = BASE_URL.format(year)
+    async with limit:
+        async with throttle.slot(url):
+            print(f"🌐 Scrapeando {year}: {url}")
+            table = await asyncio.to_thread(fetch_static_medal_table, url, session, store)
+    return _parse_medal_table(table, year) if table is not None else None
+
+
+async def _fetch_page_html_async(url: str, page, throttle: HostThrottle, store: SnapshotStore = None) -> str:
+    """Versión asíncrona de `fetch_page_html`."""
+    async with throttle.slot(url):
+        response = await page.goto(url, timeout=60000)
+    await page.wait_for_selector("table.wikitable", timeout=30000)
+    html = await page.content()
+    if store:
+        store.save(url, html, response.headers if response else None)
+    return html
+
+
+async def _scrape_year_async(year: int, pages: asyncio.Queue, throttle: HostThrottle,
+                             store: SnapshotStore = None) -> pd.DataFrame:
+    """Respaldo con Playwright sobre una página del pool."""
+    url = BASE_URL.format(year)
+    page = await pages.get()
+    try:
+        print(f"🧭 Sin tabla en el HTML estático, usando Playwright: {url}")
+        html = await _fetch_page_html_async(url, page, throttle, store)
+    finally:
+        pages.put_nowait(page)
+    return parse_medal_page(html, year)
+
+
+async def _scrape_with_browser_async(years, concurrency: int, throttle: HostThrottle, store: SnapshotStore = None):
+    """Scrapea con un pool acotado de páginas de Playwright los años que no salieron por HTTP."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.firefox.launch(headless=True)
+        pages = asyncio.Queue()
+        for _ in range(max(1, min(concurrency, len(years)))):
+            pages.put_nowait(await browser.new_page())
+        results = await asyncio.gather(
+            *(_scrape_year_async(y, pages, throttle, store) for y in years), return_exceptions=True
+        )
+        await browser.close()
+    return results
+
+
+async def scrape_all_async(years=YEARS, concurrency: int = 4, throttle: HostThrottle = None,
+                           store: SnapshotStore = None) -> pd.DataFrame:
+    """
+    Scrapea varios años en paralelo: primero todos por HTTP + lxml y, solo para los que
+    no traen la tabla en el HTML estático, un pool acotado de páginas de Playwright.
+    """
+    years = list(years)
+    throttle = throttle or HostThrottle()
+    session = new_http_session()
+    limit = asyncio.Semaphore(max(1, concurrency))
+    results = {}
+
+    with tqdm(total=len(years), desc="Scrapeando medalleros") as progress:
+        async def run(year):
+            try:
+                return await _scrape_static_async(year, session, throttle, limit, store)
+            finally:
+                progress.update(1)
+
+        static_results = await asyncio.gather(*(run(y) for y in years), return_exceptions=True)
+
+    fallback_years = []
+    for year, result in zip(years, static_results):
+        if result is None:
+            fallback_years.append(year)
+        else:
+            results[year] = result
+
+    if fallback_years:
+        browser_results = await _scrape_with_browser_async(fallback_years, concurrency, throttle, store)
+        results.update(zip(fallback_years, browser_results))
+
+    # Mantiene el orden de `years`, igual que la versión secuencial
+    all_dfs = []
+    for year in years:
+        result = results[year]
+        if isinstance(result, Exception):
+            print(f"❌ Error con {year}: {result}")
+        else:
+            all_dfs.append(result)
+
+    return pd.concat(all_dfs, ignore_index=True)
+
+
+def scrape_all(years=YEARS, concurrency: int = 1, offline: bool = False, store: SnapshotStore = None) -> pd.DataFrame:
+    """Scrapea todos los años: HTTP + lxml primero y un único navegador solo si algún año lo necesita.
+
+    Con `concurrency > 1` usa el crawler asíncrono con varias peticiones en paralelo.
+    Con `offline=True` solo parsea los snapshots guardados: sin navegador ni red.
+    """
+    store = store or SnapshotStore()
+    all_dfs = []
+
+    if offline:
+        for year in tqdm(years, desc="Parseando snapshots"):
             try:
-                df_year = scrape_medal_table_for_year(year, page)
-                all_dfs.append(df_year)
+                all_dfs.append(scrape_medal_table_for_year(year, store=store, offline=True))
             except Exception as e:
                 print(f"❌ Error con {year}: {e}")
-        browser.close()
+        return pd.concat(all_dfs, ignore_index=True)
 
+    if concurrency > 1:
+        return asyncio.run(scrape_all_async(years, concurrency=concurrency, store=store))
+
+    session = new_http_session()
+    results = {}
+    fallback_years = []
+    for year in tqdm(years, desc="Scrapeando medalleros"):
+        url = BASE_URL.format(year)
+        print(f"🌐 Scrapeando {year}: {url}")
+        try:
+            table = fetch_static_medal_table(url, session, store)
+            if table is not None:
+                results[year] = _parse_medal_table(table, year)
+            else:
+                fallback_years.append(year)
+        except Exception as e:
+            print(f"❌ Error con {year}: {e}")
+
+    if fallback_years:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            browser = p.firefox.launch(headless=True)
+            page = browser.new_page()
+            for year in fallback_years:
+                try:
+                    results[year] = _scrape_with_browser(year, page, store)
+                except Exception as e:
+                    print(f"❌ Error con {year}: {e}")
+            browser.close()
+
+    all_dfs = [results[year] for year in years if year in results]
     return pd.concat(all_dfs, ignore_index=True)
 
 
@@ -97,6 +473,5 @@ if __name__ == "__main__":
     setup_logging()
     print("🏗️ Iniciando scraping (2000–2024)...")
     df = scrape_all()
-    df.to_csv("olympic_medals_2000_2024.csv", index=False)
-    print("✅ Archivo guardado: olympic_medals_2000_2024.csv")
-
+    changed = write_partitions(df)
+    print(f"✅ Particiones actualizadas en {DATA_DIR}: {', '.join(map(str, changed)) or 'ninguna'}")
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+SNAPSHOT_DIR = "./snapshots"
+
+
+class SnapshotStore:
+    """
+    Almacén de snapshots HTML direccionado por contenido.
+
+    Cada página se guarda una sola vez en `objects/<sha[:2]>/<sha>.html` y
+    `index.json` relaciona cada URL con su hash y con las cabeceras ETag /
+    Last-Modified necesarias para revalidar contra el servidor.
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+
+    def _read_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.html"
+
+    def has(self, url: str) -> bool:
+        entry = self._index.get(url)
+        return bool(entry) and self._object_path(entry["sha256"]).exists()
+
+    def load(self, url: str):
+        """Devuelve el HTML guardado para `url` o None si no hay snapshot."""
+        if not self.has(url):
+            return None
+        return self._object_path(self._index[url]["sha256"]).read_text(encoding="utf-8")
+
+    def validators(self, url: str) -> dict:
+        """Cabeceras condicionales (If-None-Match / If-Modified-Since) para revalidar `url`."""
+        if not self.has(url):
+            return {}
+        entry = self._index[url]
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def save(self, url: str, html: str, headers=None) -> str:
+        """Guarda el HTML de `url` (si no existía ese contenido) y actualiza el índice."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_text(html, encoding="utf-8")
+                os.replace(tmp_path, path)
+            now = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self._index[url] = {
+                "sha256": digest,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "fetched_at": now,
+                "checked_at": now,
+            }
+            self._write_index()
+        return digest
+
+    def touch(self, url: str):
+        """Marca `url` como revalidada (respuesta 304) sin cambiar su contenido."""
+        with self._lock:
+            if url in self._index:
+                self._index[url]["checked_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                self._write_index()
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import agente
+import medal_service
+from country_aliases import get_country_matcher
+from medal_service import MedalDataService
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Agente con el router y las Tools reales sobre un medallero pequeño (sin RAG ni Gemini)."""
+    df = pd.DataFrame({
+        "year": [2020, 2020, 2020, 2024, 2024, 2024],
+        "country": ["Spain", "Italy", "France", "Spain", "Italy", "France"],
+        "rank": [22, 10, 8, 15, 9, 5],
+        "gold": [3, 10, 10, 5, 12, 16],
+        "silver": [8, 10, 12, 4, 13, 26],
+        "bronze": [6, 20, 11, 9, 15, 22],
+        "total": [17, 40, 33, 18, 40, 64],
+    })
+    monkeypatch.setattr(medal_service, "_service", MedalDataService(df))
+    monkeypatch.setattr(agente, "RAG", lambda: SimpleNamespace(country_matcher=get_country_matcher()))
+    return agente.OlympicAgent()
+
+
+def test_two_countries_use_compare_countries(agent):
+    answer, source = agent.decide_and_call_tool("Compara España y Italia en 2020")
+    assert source == "📊 Tool: compare_countries(Spain, Italy, 2020)"
+    assert "Spain" in answer and "Italy" in answer
+
+
+def test_three_countries_use_compare_many_countries(agent):
+    answer, source = agent.decide_and_call_tool("Compara España, Italia y Francia en 2020")
+    assert source.startswith("📊 Tool: compare_many_countries(")
+    rows = {line.split(" | ")[1]: line.split(" | ") for line in answer.splitlines() if line.startswith("| 2020 |")}
+    assert set(rows) == {"Spain", "Italy", "France"}
+    # Puesto entre los tres comparados según el ranking olímpico
+    assert [rows[c][7] for c in ("France", "Italy", "Spain")] == ["1", "2", "3"]
+
+
+def test_several_years_use_compare_many_countries(agent):
+    answer, source = agent.decide_and_call_tool("España vs Italia en 2020 y 2024")
+    assert "compare_many_countries" in source
+    assert "| 2020 | Spain |" in answer and "| 2024 | Spain |" in answer
+
+
+def test_async_weather_uses_async_client(agent, monkeypatch):
+    import tools
+    import weather
+
+    calls = []
+
+    class Client:
+        async def get_async(self, city):
+            calls.append(city)
+            return {"cod": 200, "weather": [{"description": "cielo despejado"}], "main": {"temp": 20}}
+
+        def get(self, city):
+            raise AssertionError("el camino asíncrono no debe usar el cliente bloqueante")
+
+    monkeypatch.setattr(tools, "OPENWEATHER_API_KEY", "test")
+    monkeypatch.setattr(weather, "_client", Client())
+    answer, source = asyncio.run(agent.answer_async("¿Qué clima hace en Tokio?"))
+    assert calls == ["Tokio"]
+    assert source == "🌤️ Tool: get_weather('Tokio')"
+    assert "Clima en Tokio" in answer
+
+
+def test_weak_compare_without_year_covers_every_year(agent):
+    answer, source = agent.decide_and_call_tool("medallas de España y Italia")
+    assert source == "📊 Tool: compare_many_countries(Spain, Italy; todos los años)"
+    assert "| 2020 | Spain |" in answer and "| 2024 | Italy |" in answer
+
+
+def test_explicit_compare_without_year_uses_default_year(agent):
+    _, source = agent.decide_and_call_tool("Compara España y Italia")
+    assert source == f"📊 Tool: compare_countries(Spain, Italy, {agente.DEFAULT_COMPARE_YEAR})"
+
+
+def test_async_stream_uses_tools_then_rag(agent):
+    async def rag_stream(query):
+        yield "En 2024", ["doc"]
+        yield "En 2024 ganó", ["doc"]
+
+    agent.rag.answer_question_stream_async = rag_stream
+
+    async def collect(query):
+        return [step async for step in agent.answer_stream_async(query)]
+
+    assert asyncio.run(collect("Compara España y Italia en 2020"))[0][1] == \
+        "📊 Tool: compare_countries(Spain, Italy, 2020)"
+    steps = asyncio.run(collect("¿Quién ganó?"))
+    assert steps[:2] == [("En 2024", None), ("En 2024 ganó", None)]
+    assert steps[-1][0] == "En 2024 ganó" and steps[-1][1] is not None
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from batch import read_questions, run_batch
+
+
+class FakeAgent:
+    """Agente asíncrono que cuenta las preguntas y cuántas hay en curso a la vez."""
+
+    def __init__(self):
+        self.queries = []
+        self.running = self.peak = 0
+
+    async def answer_async(self, query):
+        self.queries.append(query)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if query == "falla":
+            raise RuntimeError("sin datos")
+        return f"respuesta a {query}", "fuente"
+
+
+def test_batch_answers_with_async_agent(tmp_path):
+    questions = ["¿Quién ganó en 2024?", "quien gano en 2024", "falla"] + [f"pregunta {i}" for i in range(6)]
+    input_path = tmp_path / "preguntas.jsonl"
+    input_path.write_text("\n".join(json.dumps(q, ensure_ascii=False) for q in questions), encoding="utf-8")
+    output_path = tmp_path / "resultados.jsonl"
+
+    agent = FakeAgent()
+    summary = run_batch(agent, str(input_path), str(output_path), concurrency=2)
+
+    records = {r["id"]: r for r in map(json.loads, output_path.read_text(encoding="utf-8").splitlines())}
+    assert summary["questions"] == 9 and summary["unique"] == 8 and summary["errors"] == 1
+    assert len(agent.queries) == 8 and agent.peak == 2
+    assert records[1]["answer"] == records[2]["answer"] == "respuesta a ¿Quién ganó en 2024?"
+    assert records[2]["deduplicated"] is True
+    assert records[3]["error"] == "sin datos"
+
+
+def test_malformed_lines_are_skipped_with_line_number(tmp_path, capsys):
+    input_path = tmp_path / "preguntas.jsonl"
+    input_path.write_text(
+        '{"id": "a", "query": "medallas de España"}\n'
+        '{"query": "sin cerrar"\n'
+        "\n"
+        "42\n"
+        '"¿Quién ganó en 2024?"\n',
+        encoding="utf-8",
+    )
+
+    items = read_questions(str(input_path))
+
+    assert items == [{"id": "a", "query": "medallas de España"}, {"id": 5, "query": "¿Quién ganó en 2024?"}]
+    err = capsys.readouterr().err
+    assert "Línea 2 no es JSON válido" in err and "Línea 4 sin pregunta" in err
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def df():
+    rows = []
+    for year in (2016, 2020, 2024):
+        for i, country in enumerate(["Spain", "France", "Kenya", "United States"]):
+            rows.append({"year": year, "country": country, "rank": i + 1, "gold": 10 - i,
+                         "silver": 5, "bronze": 3 + i, "total": 18 - i})
+    return pd.DataFrame(rows)
+
+
+def test_tokenize_folds_accents():
+    assert tokenize("¿Cuántas medallas ganó España en 2024?") == ["cuantas", "medallas", "gano", "espana", "en", "2024"]
+
+
+def test_exact_year_and_country_rank_first(df):
+    index = BM25Index.from_dataframe(df)
+    assert index.search("Kenya 2020", n_results=3)[0] == "2020|Kenya"
+    assert index.search("United States 2016")[0] == "2016|United States"
+    # Un término que no está en el índice no puntúa nada
+    assert index.search("Narnia") == []
+
+
+def test_filters_restrict_results(df):
+    index = BM25Index.from_dataframe(df)
+    assert set(index.search("medallas Spain", year_filter=2024)) <= {f"2024|{c}" for c in df["country"]}
+    assert index.filter(2020, ["Spain", "Kenya"]) == ["2020|Spain", "2020|Kenya"]
+    assert index.get(["2020|Kenya", "1900|Nowhere"]) == [index.document("2020|Kenya")]
+
+
+def test_rrf_rewards_agreement_and_is_order_stable():
+    lexical = ["a", "b", "c"]
+    vector = ["c", "d", "a"]
+    fused = reciprocal_rank_fusion(lexical, vector, n_results=4)
+    # a y c aparecen en ambas listas (1/61 + 1/63 cada una, empate): a va antes por aparecer antes
+    assert fused == ["a", "c", "b", "d"]
+    assert all(reciprocal_rank_fusion(lexical, vector, n_results=4) == fused for _ in range(5))
+    # Empates exactos: se respeta el orden de primera aparición
+    assert reciprocal_rank_fusion(["x"], ["y"]) == ["x", "y"]
+
+
+class RecordingBackend:
+    """Índice vectorial de prueba: cuenta las consultas y devuelve un ranking fijo."""
+
+    def __init__(self, ids, documents):
+        self.ids, self.documents = ids, documents
+        self.queries = []
+
+    def query(self, query, n_results=5, where=None):
+        self.queries.append((query, where))
+        return self.ids[:n_results], self.documents[:n_results]
+
+
+@pytest.fixture
+def rag(df):
+    from medal_service import MedalDataService
+    from rag import RAG
+    from vector_db import build_documents
+
+    docs, ids, _ = build_documents(df)
+    rag = RAG.__new__(RAG)
+    rag._load_data(MedalDataService(df))
+    rag._backend = RecordingBackend(ids[::-1], docs[::-1])
+    return rag
+
+
+def test_exact_lookup_skips_vector_index(rag):
+    documents = rag.retrieve_context("medallas de Kenya en 2020", year_filter=2020, country_filter=["Kenya"])
+    assert documents == [rag.lexical_index.document("2020|Kenya")]
+    assert rag.backend.queries == []
+
+
+def test_open_question_fuses_both_rankings(rag):
+    documents = rag.retrieve_context("¿Quién ganó más oro en 2024?", year_filter=2024, n_results=4)
+    assert len(rag.backend.queries) == 1
+    assert rag.backend.queries[0][1] == {"year": 2024}
+    assert len(documents) == 4 and all(doc.startswith("Year: ") for doc in documents)
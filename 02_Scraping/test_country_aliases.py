@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from country_aliases import CountryMatcher, fold, get_country_matcher
+
+
+@pytest.fixture
+def matcher():
+    return get_country_matcher()
+
+
+def test_aliases_need_word_boundaries(matcher):
+    assert matcher.countries("¿Por qué causa se suspendieron los Juegos?") == []
+    assert matcher.countries("Medallas de USA en 2024") == ["United States"]
+    assert matcher.countries("Perú y peruanos") == ["Peru"]
+
+
+def test_accented_and_unaccented_aliases(matcher):
+    for text in ["Japón", "japon", "JAPÓN", "Japan"]:
+        assert matcher.canonicalize(text) == "Japan"
+    assert matcher.countries("medallas de méxico y de MEXICO") == ["Mexico"]
+    assert fold("Ñandú Pérez") == "nandu perez"
+
+
+def test_every_mention_with_spans(matcher):
+    text = "Compara Estados  Unidos, Gran Bretaña y Corea del Sur"
+    found = matcher.find(text)
+    assert [country for *_, country in found] == ["United States", "Great Britain", "South Korea"]
+    for start, end, original, _ in found:
+        assert text[start:end] == original
+    # La frase más larga gana: "corea del sur" no se lee como "corea"
+    assert matcher.replace("Corea del Sur vs Corea") == "South Korea vs South Korea"
+
+
+def test_canonicalize_only_exact_names(matcher):
+    assert matcher.canonicalize("  estados   unidos ") == "United States"
+    assert matcher.canonicalize("Estados Unidos de América") is None
+    assert CountryMatcher(extra_names=["Refugee Olympic Team"]).canonicalize("refugee olympic team") == "Refugee Olympic Team"
+
+
+def test_rag_and_tools_resolve_the_same_countries():
+    from medal_service import MedalDataService
+    from rag import RAG
+    from tools import normalize_country
+
+    df = pd.DataFrame({"year": [2024] * 3, "country": ["United States", "Japan", "Peru"], "rank": [1, 2, 3],
+                       "gold": [3, 2, 1], "silver": [1, 1, 1], "bronze": [1, 1, 1], "total": [5, 4, 3]})
+    rag = RAG.__new__(RAG)
+    rag._load_data(MedalDataService(df))
+
+    query = "¿Ganó más EEUU, Japón o Perú en 2024?"
+    assert rag.detect_countries(query) == ["United States", "Japan", "Peru"]
+    assert [normalize_country(name) for name in ["EEUU", "Japón", "Perú"]] == rag.detect_countries(query)
@@ -0,0 +1,17 @@
+import pytest
+
+from embeddings import CachedEmbeddingFunction, create_embedding_function
+
+
+@pytest.mark.parametrize("provider", ["default", "onnx"])
+def test_build_from_config_keeps_provider(provider, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    function = create_embedding_function(provider, path=str(tmp_path / "cache.sqlite"))
+    rebuilt = CachedEmbeddingFunction.build_from_config(function.get_config())
+    assert (rebuilt.provider, rebuilt.model_id) == (function.provider, function.model_id)
+    assert type(rebuilt.base) is type(function.base)
+
+
+def test_build_from_config_without_provider_is_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert CachedEmbeddingFunction.build_from_config({}).provider == "default"
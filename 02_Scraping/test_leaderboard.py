@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from leaderboard import LeaderboardIndex
+from medal_data import normalize_medals
+
+
+@pytest.fixture
+def df():
+    """Dos años con empates en total y oro, y un país sin ranking ni medallas de plata."""
+    return normalize_medals(pd.DataFrame({
+        "year": [2020] * 6 + [2024] * 2,
+        "country": ["Spain", "Italy", "France", "Kenya", "Brazil", "Chile", "Spain", "Italy"],
+        "rank": [4, 2, 1, None, 3, 5, 2, 1],
+        "gold": [5, 10, 10, 4, 7, 0, 5, 12],
+        "silver": [4, 10, 12, None, 6, 1, 4, 13],
+        "bronze": [9, 20, 11, 5, 8, 0, 9, 15],
+        "total": [18, 40, 33, 9, 21, 1, 18, 40],
+    }))
+
+
+def _countries(rows):
+    return [r["country"] for r in rows]
+
+
+def _expected(df, year, sort_by, ascending=False):
+    """Referencia: orden estable de pandas (empates en el orden de la tabla, nulos al final)."""
+    part = df[df["year"] == year]
+    return part.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")["country"].tolist()
+
+
+@pytest.mark.parametrize("metric", ["gold", "silver", "bronze", "total"])
+def test_top_matches_pandas_sort(df, metric):
+    index = LeaderboardIndex(df)
+    for n in (1, 3, 10):
+        assert _countries(index.top(2020, metric, n)) == _expected(df, 2020, metric)[:n]
+
+
+def test_ties_keep_table_order(df):
+    # France e Italy empatan a 10 oros: va primero la que aparece antes en la tabla
+    assert _countries(LeaderboardIndex(df).top(2020, "gold", 2)) == ["Italy", "France"]
+
+
+def test_rank_order_puts_null_rank_last(df):
+    index = LeaderboardIndex(df)
+    assert _countries(index.top(2020, "rank", 6)) == _expected(df, 2020, "rank", ascending=True)
+    assert index.at_position(2020, 1)["country"] == "France"
+    assert index.at_position(2020, 6)["country"] == "Kenya"
+    assert index.at_position(2020, 7) is None and index.at_position(2020, 0) is None
+
+
+@pytest.mark.parametrize("metric,low,high", [
+    ("total", 10, 35), ("total", 18, 18), ("gold", 5, 10), ("silver", 0, 5), ("bronze", 100, 200),
+    ("total", 19, float("inf")), ("total", 0, 17),
+])
+def test_between_matches_pandas_filter(df, metric, low, high):
+    part = df[df["year"] == 2020]
+    mask = (part[metric] >= low) & (part[metric] <= high)
+    expected = part[mask.fillna(False)].sort_values(metric, ascending=False, kind="stable")["country"].tolist()
+    assert _countries(LeaderboardIndex(df).between(2020, metric, low, high)) == expected
+
+
+def test_unknown_year(df):
+    index = LeaderboardIndex(df)
+    assert index.years == [2020, 2024] and index.latest_year == 2024
+    assert not index.has_year(2016)
+    assert index.top(2016) == [] and index.between(2016, "total", 0, 10) == []
+
+
+def test_rag_answers_range_questions_with_between(df):
+    from medal_service import MedalDataService
+    from rag import RAG
+
+    rag = RAG.__new__(RAG)
+    rag._load_data(MedalDataService(df))
+    answer, docs = rag.detect_top_country_question("¿Qué países ganaron entre 10 y 35 medallas en 2020?")
+    assert answer.startswith("En 2020, 3 países ganaron entre 10 y 35 medallas de total")
+    assert len(docs) == 3
+    answer, _ = rag.detect_top_country_question("¿Quién ganó más de 35 medallas de oro en 2020?")
+    assert "ningún país" in answer
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+import pytest
+
+import llm_cache
+from llm_cache import ResponseCache, normalize_query
+
+MODEL = "models/test"
+CONTEXT = "Year: 2024 | Country: Spain | Gold: 5"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "llm.sqlite"), ttl=60)
+
+
+def test_normalized_query_hits(cache):
+    cache.put(MODEL, "¿Cuántas medallas ganó España?", CONTEXT, "5")
+    assert normalize_query("¿Cuántas medallas ganó España?") == "cuantas medallas gano espana"
+    assert cache.get(MODEL, "cuantas  MEDALLAS gano españa", CONTEXT) == "5"
+
+
+def test_context_and_model_are_part_of_the_key(cache):
+    cache.put(MODEL, "pregunta", CONTEXT, "5")
+    assert cache.get(MODEL, "pregunta", CONTEXT + " cambiado") is None
+    assert cache.get("models/otro", "pregunta", CONTEXT) is None
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    cache.put(MODEL, "pregunta", CONTEXT, "5")
+    now = time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 61)
+    assert cache.get(MODEL, "pregunta", CONTEXT) is None
+    assert cache.purge_expired() == 1
+
+
+def test_answers_survive_restart(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    ResponseCache(path=path).put(MODEL, "pregunta", CONTEXT, "5")
+    assert ResponseCache(path=path).get(MODEL, "pregunta", CONTEXT) == "5"
+
+
+def test_semantic_match_requires_same_context(tmp_path):
+    vectors = {"medallas de españa": [1.0, 0.0], "medallas españa": [0.99, 0.05], "tiempo en parís": [0.0, 1.0]}
+    cache = ResponseCache(path=str(tmp_path / "llm.sqlite"),
+                          embedding_function=lambda texts: [np.array(vectors[t]) for t in texts])
+    cache.put(MODEL, "medallas de españa", CONTEXT, "5")
+
+    assert cache.get(MODEL, "medallas españa", CONTEXT) == "5"
+    assert cache.get(MODEL, "medallas españa", "otro contexto") is None
+    assert cache.get(MODEL, "tiempo en parís", CONTEXT) is None
+
+
+def test_memory_is_bounded_but_sqlite_keeps_everything(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "llm.sqlite"), max_entries=2)
+    for i in range(3):
+        cache.put(MODEL, f"pregunta {i}", CONTEXT, str(i))
+    assert len(cache._memory) == 2
+    assert cache.get(MODEL, "pregunta 0", CONTEXT) == "0"
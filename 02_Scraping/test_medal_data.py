@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from medal_data import load_medals, partition_hash, read_manifest, write_partitions
+
+
+def _medals(years=(2016, 2020, 2024)):
+    rows = []
+    for year in years:
+        for rank, country in enumerate(["Spain", "France", "Kenya"], 1):
+            rows.append({"rank": rank, "country": country, "gold": 4 - rank, "silver": 2,
+                         "bronze": 1, "total": 7 - rank, "year": year})
+    return pd.DataFrame(rows)
+
+
+def test_write_partitions_is_idempotent(tmp_path):
+    df = _medals()
+    assert write_partitions(df, tmp_path) == [2016, 2020, 2024]
+    assert write_partitions(df, tmp_path) == []
+
+
+def test_only_changed_year_is_rewritten(tmp_path):
+    df = _medals()
+    write_partitions(df, tmp_path)
+    before = {year: (tmp_path / f"year={year}.csv").read_text() for year in (2016, 2020)}
+
+    df.loc[(df["year"] == 2024) & (df["country"] == "Kenya"), "rank"] = np.nan
+    assert write_partitions(df, tmp_path) == [2024]
+    for year, text in before.items():
+        assert (tmp_path / f"year={year}.csv").read_text() == text
+    assert ",1.0," not in (tmp_path / "year=2024.csv").read_text()
+
+
+def test_partition_hash_ignores_column_types():
+    part = _medals([2020])
+    assert partition_hash(part) == partition_hash(part.astype({"rank": "float64", "gold": "float64"}))
+
+
+def test_missing_years_are_kept(tmp_path):
+    write_partitions(_medals(), tmp_path)
+    write_partitions(_medals([2024]), tmp_path)
+    assert sorted(read_manifest(tmp_path)["partitions"]) == ["2016", "2020", "2024"]
+    assert sorted(load_medals(data_dir=tmp_path)["year"].unique()) == [2016, 2020, 2024]
+
+
+def test_manifest_records_rows_and_hash(tmp_path):
+    write_partitions(_medals(), tmp_path)
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    entry = manifest["partitions"]["2020"]
+    assert entry["rows"] == 3
+    assert entry["sha256"] == partition_hash(_medals([2020]))
+
+
+def test_arrow_and_csv_loaders_return_same_types(tmp_path, monkeypatch):
+    import medal_data
+    from vector_db import build_documents
+
+    df = _medals()
+    df.loc[0, "rank"] = np.nan
+    write_partitions(df, tmp_path)
+    assert medal_data.load_medal_table(data_dir=tmp_path) is not None
+    from_arrow = load_medals(data_dir=tmp_path)
+
+    monkeypatch.setattr(medal_data, "load_medal_table", lambda years=None, data_dir=None: None)
+    from_csv = load_medals(data_dir=tmp_path)
+
+    assert dict(from_arrow.dtypes) == dict(from_csv.dtypes)
+    assert from_arrow["year"].dtype == "int16" and from_arrow["gold"].dtype == "Int16"
+    assert isinstance(from_arrow["country"].dtype, pd.CategoricalDtype)
+    assert build_documents(from_arrow) == build_documents(from_csv)
+
+
+def test_year_subset_drops_unused_countries(tmp_path):
+    df = _medals()
+    df.loc[df["year"] == 2016, "country"] = ["Spain", "France", "Italy"]
+    write_partitions(df, tmp_path)
+    subset = load_medals(years=[2024], data_dir=tmp_path)
+    assert sorted(subset["country"].cat.categories) == ["France", "Kenya", "Spain"]
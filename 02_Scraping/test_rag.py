@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from llm_cache import ResponseCache
+from rag import RAG
+
+
+class FakeModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        return [SimpleNamespace(text=chunk) for chunk in self.chunks]
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+
+        async def chunks():
+            for chunk in self.chunks:
+                yield SimpleNamespace(text=chunk)
+        return chunks()
+
+
+async def _no_wait():
+    return None
+
+
+@pytest.fixture
+def make_rag(tmp_path):
+    """RAG sin dataset ni índice: solo lo que usa la generación de respuestas."""
+    def make(chunks):
+        rag = RAG.__new__(RAG)
+        rag.model = "models/test"
+        rag.response_cache = ResponseCache(path=str(tmp_path / "llm.sqlite"))
+        rag.rate_limiter = SimpleNamespace(acquire=lambda: None, acquire_async=_no_wait)
+        rag._genai_model = FakeModel(chunks)
+        return rag
+    return make
+
+
+def test_complete_stream_is_cached(make_rag):
+    rag = make_rag(["España ", "ganó ", "18 medallas"])
+    assert "".join(rag.generate_answer_stream("pregunta", "contexto")) == "España ganó 18 medallas"
+    assert list(rag.generate_answer_stream("pregunta", "contexto")) == ["España ganó 18 medallas"]
+    assert rag._genai_model.calls == 1
+
+
+def test_partial_stream_is_not_cached(make_rag):
+    rag = make_rag(["España ", "ganó ", "18 medallas"])
+    stream = rag.generate_answer_stream("pregunta", "contexto")
+    assert next(stream) == "España "
+    stream.close()
+    assert rag.response_cache.get(rag.model, "pregunta", "contexto") is None
+
+
+def test_empty_stream_is_not_cached(make_rag):
+    rag = make_rag([])
+    assert list(rag.generate_answer_stream("pregunta", "contexto")) == []
+    assert rag.response_cache.get(rag.model, "pregunta", "contexto") is None
+
+
+def test_async_answer_skips_retrieval_when_detector_answers(make_rag):
+    rag = make_rag([])
+    rag.country_matcher = SimpleNamespace(replace=lambda query: query)
+    rag.detect_top_country_question = lambda query: ("En 2024 Estados Unidos fue el país con más medallas", ["doc"])
+    rag.retrieve_context = lambda *args: pytest.fail("no debe recuperar contexto")
+
+    answer, docs = asyncio.run(rag.answer_question_async("¿Quién ganó más medallas en 2024?"))
+    assert answer.startswith("En 2024") and docs == ["doc"]
+
+
+def test_missing_api_key_only_fails_when_calling_gemini(make_rag, monkeypatch):
+    import threading
+
+    import rag as rag_module
+
+    monkeypatch.setattr(rag_module, "GOOGLE_API_KEY", None)
+    rag = make_rag([])
+    rag._genai_model = None
+    rag._lazy_lock = threading.Lock()
+    assert "GOOGLE_API_KEY" in rag.generate_answer("pregunta", "contexto")
+    assert "GOOGLE_API_KEY" in "".join(rag.generate_answer_stream("pregunta", "contexto"))
+
+
+async def _collect(stream, limit=None):
+    parts = []
+    async for text in stream:
+        parts.append(text)
+        if limit and len(parts) == limit:
+            await stream.aclose()
+            break
+    return parts
+
+
+def test_async_stream_caches_only_complete_answers(make_rag):
+    rag = make_rag(["España ", "ganó ", "18 medallas"])
+    assert asyncio.run(_collect(rag.generate_answer_stream_async("parcial", "contexto"), limit=1)) == ["España "]
+    assert rag.response_cache.get(rag.model, "parcial", "contexto") is None
+
+    assert "".join(asyncio.run(_collect(rag.generate_answer_stream_async("pregunta", "contexto")))) == \
+        "España ganó 18 medallas"
+    assert asyncio.run(_collect(rag.generate_answer_stream_async("pregunta", "contexto"))) == ["España ganó 18 medallas"]
+    assert rag._genai_model.calls == 2
+
+
+def test_async_question_stream_accumulates_text(make_rag):
+    rag = make_rag(["España ", "ganó"])
+    rag.country_matcher = SimpleNamespace(replace=lambda query: query)
+    rag.detect_top_country_question = lambda query: (None, None)
+    rag.query_filters = lambda query: (None, [])
+    rag.retrieve_context = lambda *args: ["Year: 2024 | Country: Spain"]
+
+    steps = asyncio.run(_collect(rag.answer_question_stream_async("¿Qué tal España?")))
+    assert [answer for answer, _ in steps] == ["España ", "España ganó"]
+    assert steps[-1][1] == ["Year: 2024 | Country: Spain"]
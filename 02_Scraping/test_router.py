@@ -0,0 +1,34 @@
+import pytest
+
+from bench_router import load_corpus
+from router import MIN_CONFIDENCE, get_router
+
+CORPUS = load_corpus()
+
+
+@pytest.mark.parametrize("item", CORPUS, ids=[item["query"] for item in CORPUS])
+def test_routing_corpus(item):
+    route = get_router().route(item["query"])
+    assert route.intent == item["intent"]
+    for slot, value in item.get("slots", {}).items():
+        assert route.slots.get(slot) == value
+
+
+def test_rag_confidence_comes_from_medal_cues():
+    router = get_router()
+    assert router.route("¿Quién ganó más medallas en 2024?").confidence == 1.0
+    # Sin pistas de ningún tipo el RAG es solo el recurso por defecto
+    assert router.route("Cuéntame algo").confidence == 0.0
+
+
+def test_tool_cues_lower_rag_confidence():
+    route = get_router().route("¿Cuántas medallas hoy?")
+    assert route.intent == "rag"
+    assert 0.0 < route.confidence < 1.0
+
+
+def test_weak_compare_cue_keeps_year_unset():
+    route = get_router().route("medallas de Kenia y Brasil")
+    assert route.intent == "compare" and route.confidence >= MIN_CONFIDENCE
+    assert route.slots["year"] is None and route.slots["explicit"] is False
+    assert get_router().route("Compara Kenia y Brasil").slots["explicit"] is True
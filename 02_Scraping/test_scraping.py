@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import requests
+
+import scraping
+from scraping import BASE_URL, parse_medal_page, scrape_all, scrape_medal_table_for_year
+from snapshots import SnapshotStore
+
+URL = BASE_URL.format(2024)
+
+# Página mínima al estilo de Wikipedia: una wikitable que no es el medallero, el medallero
+# (empate en el puesto 3 con rowspan, notas, fila de totales) y otra wikitable detrás
+PAGE = """<html><body>
+<table class="wikitable"><tr><th>Host city</th><th>Dates</th></tr><tr><td>Paris</td><td>26 July</td></tr></table>
+<table class="wikitable sortable">
+<tr><th>Rank</th><th>NOC</th><th>Gold</th><th>Silver</th><th>Bronze</th><th>Total</th></tr>
+<tr><td>1</td><th>United States (USA)</th><td>40</td><td>44</td><td>42</td><td>126</td></tr>
+<tr><td>2</td><th>China (CHN)[a]</th><td>40</td><td>27</td><td>24</td><td>91</td></tr>
+<tr><td rowspan="2">3</td><th>Japan (JPN)</th><td>20</td><td>12</td><td>13</td><td>45</td></tr>
+<tr><th>Australia (AUS)</th><td>18</td><td>19</td><td>16</td><td>53</td></tr>
+<tr><th colspan="2">Totals (4 entries)</th><td>118</td><td>102</td><td>95</td><td>315</td></tr>
+</table>
+<table class="wikitable"><tr><th>Nation</th><th>Gold</th></tr><tr><td>Nowhere</td><td>99</td></tr></table>
+</body></html>"""
+
+
+class FakeSession:
+    """Sesión HTTP que guarda las cabeceras enviadas y responde con `status` y `PAGE`."""
+
+    def __init__(self, status=200, headers=None):
+        self.status = status
+        self.response_headers = headers or {}
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        body = PAGE if self.status == 200 else ""
+        return SimpleNamespace(status_code=self.status, text=body, content=body.encode("utf-8"),
+                               headers=self.response_headers)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "snapshots")
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("el modo offline no debe usar la red")
+    monkeypatch.setattr(requests.Session, "get", fail)
+
+
+def test_offline_replay_matches_online_parse(store, no_network):
+    online = scrape_medal_table_for_year(2024, store=store, session=FakeSession())
+    offline = scrape_medal_table_for_year(2024, store=store, offline=True)
+    pd.testing.assert_frame_equal(offline, online)
+    pd.testing.assert_frame_equal(scrape_all([2024], offline=True, store=store), online)
+    pd.testing.assert_frame_equal(scrape_all([2024], offline=True, store=store), online)
+
+
+def test_offline_without_snapshot_fails(store, no_network):
+    with pytest.raises(FileNotFoundError):
+        scrape_medal_table_for_year(2024, store=store, offline=True)
+
+
+def test_validators_are_sent_back(store):
+    scrape_medal_table_for_year(2024, store=store, session=FakeSession(
+        headers={"ETag": '"v1"', "Last-Modified": "Fri, 09 Aug 2024 10:00:00 GMT"}))
+    # Las cabeceras se guardan en index.json: una tienda nueva (otro proceso) las reenvía
+    session = FakeSession()
+    scrape_medal_table_for_year(2024, store=SnapshotStore(store.root), session=session)
+    assert session.sent == [{"If-None-Match": '"v1"', "If-Modified-Since": "Fri, 09 Aug 2024 10:00:00 GMT"}]
+
+
+def test_not_modified_reuses_snapshot(store, monkeypatch):
+    store.save(URL, PAGE, {"ETag": '"v1"'})
+    monkeypatch.setattr(store, "save", lambda *args, **kwargs: pytest.fail("un 304 no reescribe el snapshot"))
+    df = scrape_medal_table_for_year(2024, store=store, session=FakeSession(status=304))
+    pd.testing.assert_frame_equal(df, parse_medal_page(PAGE, 2024))
+    assert store._index[URL]["sha256"] and store._index[URL]["checked_at"]
+
+
+def test_snapshot_objects_are_deduplicated(store):
+    store.save(URL, PAGE)
+    store.save(BASE_URL.format(2020), PAGE)
+    assert len(list((store.root / "objects").rglob("*.html"))) == 1
+
+
+def test_not_modified_without_snapshot_is_not_trusted(store):
+    # Sin validadores guardados un 304 no se acepta: hay que recurrir al navegador
+    assert scraping.fetch_static_medal_table(URL, FakeSession(status=304), store) is None
+
+
+def _read_html_reference(table_html: str, year: int) -> pd.DataFrame:
+    """El parser anterior (pd.read_html + limpieza), como referencia de paridad."""
+    from io import StringIO
+
+    df = pd.read_html(StringIO(table_html))[0]
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.rename(columns={k: v for k, v in scraping.RENAME_MAP.items() if k in df.columns})
+    df = df[[c for c in scraping.MEDAL_COLUMNS if c in df.columns]]
+    df["country"] = df["country"].apply(scraping._clean_country)
+    df = df[~df["country"].str.contains("Totals|Total|Rank", case=False, na=False)]
+    df = df[~df["country"].str.match(r"^\d+$")]
+    for col in ["gold", "silver", "bronze", "total", "rank"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["year"] = year
+    return df.reset_index(drop=True)
+
+
+def test_selects_medal_table_by_header():
+    from lxml import etree
+
+    table = scraping.find_medal_table(PAGE)
+    assert "United States (USA)" in etree.tostring(table, encoding="unicode")
+    assert scraping.find_medal_table(PAGE.replace("<th>NOC</th>", "<th>Team</th>")) is not None
+    # Sin encabezado de medallero, parse_medal_page recurre a la primera wikitable
+    with pytest.raises(ValueError, match="columna de país"):
+        parse_medal_page(PAGE.replace("<th>NOC</th>", "<th>Delegation</th>").replace("Nation", "Place"), 2024)
+
+
+def test_parser_handles_ties_notes_and_totals():
+    df = parse_medal_page(PAGE, 2024)
+    assert df["country"].tolist() == ["United States", "China", "Japan", "Australia"]
+    assert df["rank"].tolist() == [1, 2, 3, 3]
+    assert pd.api.types.is_string_dtype(df["country"])
+    assert df.drop(columns="country").dtypes.map(str).to_dict() == {
+        "rank": "int64", "gold": "int64", "silver": "int64", "bronze": "int64", "total": "int64", "year": "int64",
+    }
+
+
+def test_parser_matches_read_html():
+    from lxml import etree
+
+    table_html = etree.tostring(scraping.find_medal_table(PAGE), encoding="unicode")
+    expected = _read_html_reference(table_html, 2024)
+    pd.testing.assert_frame_equal(parse_medal_page(PAGE, 2024), expected, check_dtype=False)
+    assert parse_medal_page(PAGE, 2024).dtypes.map(str).tolist() == expected.dtypes.map(str).tolist()
+
+
+def test_missing_medal_count_becomes_nan():
+    df = parse_medal_page(PAGE.replace("<td>12</td>", "<td>—</td>"), 2024)
+    assert df["silver"].dtype == "float64" and df["silver"].isna().sum() == 1
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+import medal_service
+from medal_data import normalize_medals
+from medal_service import MedalDataService
+from tools import compare_countries, compare_many_countries
+
+
+@pytest.fixture(autouse=True)
+def service(monkeypatch):
+    """Medallero con un país sin ranking (rank nulo, permitido por el esquema Int64)."""
+    df = normalize_medals(pd.DataFrame({
+        "year": [2024, 2024, 2024],
+        "country": ["Spain", "Kenya", "Brazil"],
+        "rank": [15, None, 20],
+        "gold": [5, 4, 3],
+        "silver": [4, 2, 7],
+        "bronze": [9, 5, 10],
+        "total": [18, 11, 20],
+    }))
+    monkeypatch.setattr(medal_service, "_service", MedalDataService(df))
+
+
+def test_compare_countries_with_null_rank():
+    answer = compare_countries("España", "Kenia", 2024)
+    assert "**Kenya** — Oro: 4, Plata: 2, Bronce: 5, Total: 11 (Ranking: —)" in answer
+    assert "**Spain** obtuvo el mejor resultado" in answer
+
+
+def test_compare_many_countries_with_null_rank():
+    answer = compare_many_countries(["España", "Kenia", "Brasil"], [2024])
+    assert "| 2024 | Kenya | 4 | 2 | 5 | 11 | — |" in answer
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from vector_backends import ChromaBackend, NumpyFlatBackend
+
+COUNTRIES = ["Spain", "France", "Kenya", "Brazil", "Japan"]
+YEARS = [2016, 2020, 2024]
+
+WHERE_CLAUSES = [
+    None,
+    {"year": 2020},
+    {"country": {"$eq": "Kenya"}},
+    {"$and": [{"year": {"$gte": 2020}}, {"country": {"$in": ["Spain", "Japan"]}}]},
+    {"$or": [{"gold": {"$gt": 8}}, {"country": "Brazil"}]},
+    {"$and": [{"total": {"$lte": 12}}, {"year": {"$ne": 2016}}]},
+    {"country": {"$nin": ["Spain", "France"]}},
+]
+
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+@pytest.fixture
+def corpus():
+    """Índice pequeño con embeddings unitarios aleatorios (fijos) y metadatos filtrables."""
+    rng = np.random.default_rng(0)
+    ids, documents, metadatas = [], [], []
+    for year in YEARS:
+        for i, country in enumerate(COUNTRIES):
+            gold = int(rng.integers(0, 15))
+            ids.append(f"{year}|{country}")
+            documents.append(f"Year: {year} | Country: {country} | Gold: {gold}")
+            metadatas.append({"year": year, "country": country, "gold": gold, "total": gold + i})
+    embeddings = _unit(rng.normal(size=(len(ids), 16)))
+    queries = _unit(rng.normal(size=(5, 16)))
+    return ids, documents, metadatas, embeddings, queries
+
+
+def _no_embedding(texts):
+    raise AssertionError("los embeddings se pasan ya calculados")
+
+
+@pytest.fixture
+def chroma(tmp_path):
+    from chromadb.api.client import SharedSystemClient
+
+    SharedSystemClient.clear_system_cache()
+    return ChromaBackend(None, path=str(tmp_path / "chroma_db"))
+
+
+@pytest.mark.parametrize("where", WHERE_CLAUSES)
+def test_numpy_matches_chroma(corpus, chroma, tmp_path, where):
+    ids, documents, metadatas, embeddings, queries = corpus
+    flat = NumpyFlatBackend(_no_embedding, path=str(tmp_path / "vector_index"))
+    for backend in (flat, chroma):
+        backend.upsert(ids, documents, metadatas, embeddings=embeddings.tolist())
+    flat.flush()
+
+    for query in queries:
+        expected_ids, expected_docs = chroma.query(query_embedding=query.tolist(), n_results=4, where=where)
+        got_ids, got_docs = flat.query(query_embedding=query, n_results=4, where=where)
+        assert got_ids == expected_ids
+        assert got_docs == expected_docs
+
+
+def test_upsert_delete_flush_round_trip(corpus, tmp_path):
+    ids, documents, metadatas, embeddings, queries = corpus
+    path = str(tmp_path / "vector_index")
+    flat = NumpyFlatBackend(_no_embedding, path=path)
+    flat.upsert(ids, documents, metadatas, embeddings=embeddings)
+    flat.flush()
+
+    reopened = NumpyFlatBackend(_no_embedding, path=path, create=False)
+    assert isinstance(reopened.matrix, np.memmap)
+    assert reopened.count() == len(ids) and reopened.dimension() == 16
+    assert reopened.query(query_embedding=queries[0], n_results=3) == flat.query(query_embedding=queries[0], n_results=3)
+
+    # Actualizar un vector, borrar dos documentos y volver a abrir desde disco
+    reopened.upsert([ids[0]], ["nuevo"], [{"year": 2016, "country": "Spain"}], embeddings=[queries[1]])
+    reopened.delete([ids[1], ids[2], "no-existe"])
+    reopened.flush()
+    final = NumpyFlatBackend(_no_embedding, path=path, create=False)
+    assert final.count() == len(ids) - 2 and ids[1] not in final.stored_hashes()
+    assert final.query(query_embedding=queries[1], n_results=1) == ([ids[0]], ["nuevo"])
+    assert final.query(query_embedding=queries[1], n_results=5, where={"year": 2016})[0][0] == ids[0]
+
+
+def test_missing_index_is_not_created_when_reading(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        NumpyFlatBackend(_no_embedding, path=str(tmp_path / "nada"), create=False)
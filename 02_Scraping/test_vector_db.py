@@ -0,0 +1,94 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from chromadb.utils import embedding_functions
+
+import embeddings
+from vector_db import VectorDB, build_documents
+
+
+class FakeEmbeddingFunction(embedding_functions.EmbeddingFunction):
+    """Vectores deterministas a partir del hash del texto; cuenta los textos embebidos."""
+
+    model_id = embeddings.DEFAULT_MODEL_ID
+
+    def __init__(self):
+        self.embedded = []
+
+    @staticmethod
+    def name():
+        return "fake_test"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return FakeEmbeddingFunction()
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return [np.frombuffer(hashlib.sha256(text.encode()).digest()[:32], dtype=np.uint8).astype(np.float32)
+                for text in input]
+
+
+def _medals():
+    return pd.DataFrame([
+        {"rank": 1, "country": "Spain", "gold": 5, "silver": 3, "bronze": 2, "total": 10, "year": 2020},
+        {"rank": 2, "country": "Kenya", "gold": 4, "silver": 4, "bronze": 2, "total": 10, "year": 2020},
+        {"rank": 1, "country": "Spain", "gold": 6, "silver": 2, "bronze": 2, "total": 10, "year": 2024},
+    ])
+
+
+@pytest.fixture(params=["numpy", "chroma"])
+def db(request, tmp_path, monkeypatch):
+    from chromadb.api.client import SharedSystemClient
+
+    # Chroma reutiliza el cliente por ruta ("./chroma_db" es la misma en todos los tests)
+    SharedSystemClient.clear_system_cache()
+    monkeypatch.chdir(tmp_path)
+    function = FakeEmbeddingFunction()
+    monkeypatch.setattr(embeddings, "get_embedding_function", lambda: function)
+    return VectorDB(backend=request.param)
+
+
+def test_ids_are_stable_year_country():
+    _, ids, metadatas = build_documents(_medals())
+    assert ids == ["2020|Spain", "2020|Kenya", "2024|Spain"]
+    assert all("content_hash" in meta for meta in metadatas)
+
+
+def test_second_sync_embeds_nothing(db):
+    assert db.sync_from_dataframe(_medals())["added"] == 3
+    db.embedding_function.embedded.clear()
+
+    stats = db.sync_from_dataframe(_medals())
+    assert stats == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+    assert db.embedding_function.embedded == []
+
+
+def test_sync_updates_only_changed_rows_and_deletes_stale(db):
+    db.sync_from_dataframe(_medals())
+    db.embedding_function.embedded.clear()
+
+    df = _medals()
+    df.loc[2, "gold"] = 7
+    df = df[df["country"] != "Kenya"]
+    stats = db.sync_from_dataframe(df)
+
+    assert stats == {"added": 0, "updated": 1, "deleted": 1, "unchanged": 1}
+    assert len(db.embedding_function.embedded) == 1
+    assert set(db.backend.stored_hashes()) == {"2020|Spain", "2024|Spain"}
+
+
+def test_missing_medal_keeps_the_document():
+    from medal_data import normalize_medals
+
+    df = normalize_medals(_medals())
+    df.loc[0, "silver"] = None
+    docs, ids, metadatas = build_documents(df)
+    assert docs[0].endswith("Silver: N/A, Bronze: " + str(df.loc[0, "bronze"]) + ", Total: " + str(df.loc[0, "total"]))
+    assert "silver" not in metadatas[0]
+    assert all(isinstance(doc, str) for doc in docs)
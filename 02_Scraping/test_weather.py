@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from weather import WeatherClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """OpenWeather local: responde tras una pequeña espera y cuenta las peticiones por ciudad."""
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query)["q"][0]
+        self.server.requests.append(city)
+        time.sleep(0.05)
+        body = json.dumps({
+            "cod": 200, "weather": [{"description": "cielo despejado"}],
+            "main": {"temp": 21.5, "feels_like": 21.0, "humidity": 40},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/weather", server.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_upstream_call_per_city_within_ttl(stub_url):
+    url, requests = stub_url
+    client = WeatherClient(api_key="test", base_url=url, ttl=60)
+    for city in ["Tokio", "tokio", " Tokio ", "París", "Paris", "Madrid"]:
+        assert client.get(city)["main"]["temp"] == 21.5
+    assert client.upstream_calls == 3
+    assert sorted(requests) == ["Madrid", "París", "Tokio"]
+
+
+def test_expired_entry_is_fetched_again(stub_url):
+    url, requests = stub_url
+    client = WeatherClient(api_key="test", base_url=url, ttl=0)
+    client.get("Tokio")
+    client.get("Tokio")
+    assert client.upstream_calls == 2
+
+
+def test_cache_is_bounded_and_drops_expired_entries(stub_url):
+    url, requests = stub_url
+    client = WeatherClient(api_key="test", base_url=url, ttl=60, cache_size=2)
+    for city in ["Tokio", "París", "Tokio", "Madrid"]:
+        client.get(city)
+    # París fue la menos usada: sale de la caché al entrar Madrid
+    assert list(client._cache) == ["tokio", "madrid"]
+    client.get("París")
+    assert client.upstream_calls == 4
+
+    client.ttl = 0
+    client.get("Roma")
+    assert client._cached("roma") is None and "roma" not in client._cache
+
+
+def test_concurrent_async_requests_share_one_call(stub_url):
+    url, requests = stub_url
+    client = WeatherClient(api_key="test", base_url=url, ttl=60)
+
+    async def ask():
+        return await asyncio.gather(*(client.get_async(city) for city in ["Tokio"] * 5 + ["Roma"] * 5))
+
+    results = asyncio.run(ask())
+    assert all(r["cod"] == 200 for r in results)
+    assert client.upstream_calls == 2
+    assert sorted(requests) == ["Roma", "Tokio"]
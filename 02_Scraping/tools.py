@@ -1,11 +1,10 @@
 import logging
 import re
 import os
-import requests
 import random
 import datetime
-import pandas as pd
 from dotenv import load_dotenv
+from country_aliases import get_country_matcher
 
 load_dotenv()
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
@@ -39,52 +38,62 @@ def get_current_time() -> str:
 # ---------------------------
 # Tool: OpenWeather (clima real)
 # ---------------------------
+def _format_weather(city: str, data: dict) -> str:
+    """Texto de respuesta a partir del JSON de OpenWeather."""
+    if str(data.get("cod")) != "200":
+        return f"⚠️ No se pudo obtener el clima para '{city}': {data.get('message', 'Error desconocido')}."
+
+    weather = data["weather"][0]
+    main = data["main"]
+
+    description = weather["description"].capitalize()
+    temp = main["temp"]
+    feels_like = main.get("feels_like", temp)
+    humidity = main.get("humidity", "N/A")
+
+    # Emoji según el tipo de clima
+    desc_l = description.lower()
+    if "lluv" in desc_l:
+        emoji = "🌧️"
+    elif "nublado" in desc_l or "nubes" in desc_l:
+        emoji = "☁️"
+    elif "sol" in desc_l or "despejado" in desc_l:
+        emoji = "☀️"
+    elif "nieve" in desc_l:
+        emoji = "❄️"
+    elif "torment" in desc_l:
+        emoji = "⛈️"
+    else:
+        emoji = "🌤️"
+
+    return (
+        f"{emoji} Clima en {city}:\n"
+        f"- {description}\n"
+        f"- Temperatura: {temp}°C (sensación: {feels_like}°C)\n"
+        f"- Humedad: {humidity}%"
+    )
+
 def get_weather(city: str) -> str:
-    """Obtiene el clima actual de una ciudad usando OpenWeather API."""
+    """Obtiene el clima actual de una ciudad usando OpenWeather API (con caché por ciudad)."""
     if not OPENWEATHER_API_KEY:
         return "❌ Falta la variable de entorno OPENWEATHER_API_KEY."
 
     city = city.strip()
     try:
-        url = (
-            f"https://api.openweathermap.org/data/2.5/weather"
-            f"?q={city}&appid={OPENWEATHER_API_KEY}&lang=es&units=metric"
-        )
-        r = requests.get(url, timeout=8)
-        data = r.json()
-
-        if data.get("cod") != 200:
-            return f"⚠️ No se pudo obtener el clima para '{city}': {data.get('message', 'Error desconocido')}."
-
-        weather = data["weather"][0]
-        main = data["main"]
-
-        description = weather["description"].capitalize()
-        temp = main["temp"]
-        feels_like = main.get("feels_like", temp)
-        humidity = main.get("humidity", "N/A")
-
-        # Emoji según el tipo de clima
-        desc_l = description.lower()
-        if "lluv" in desc_l:
-            emoji = "🌧️"
-        elif "nublado" in desc_l or "nubes" in desc_l:
-            emoji = "☁️"
-        elif "sol" in desc_l or "despejado" in desc_l:
-            emoji = "☀️"
-        elif "nieve" in desc_l:
-            emoji = "❄️"
-        elif "torment" in desc_l:
-            emoji = "⛈️"
-        else:
-            emoji = "🌤️"
-
-        return (
-            f"{emoji} Clima en {city}:\n"
-            f"- {description}\n"
-            f"- Temperatura: {temp}°C (sensación: {feels_like}°C)\n"
-            f"- Humedad: {humidity}%"
-        )
+        from weather import get_weather_client  # requests solo se carga al consultar el clima
+        return _format_weather(city, get_weather_client().get(city))
+    except Exception as e:
+        return f"⚠️ Error al obtener datos del clima: {e}"
+
+async def get_weather_async(city: str) -> str:
+    """Variante asíncrona de `get_weather` (comparte caché y peticiones en curso)."""
+    if not OPENWEATHER_API_KEY:
+        return "❌ Falta la variable de entorno OPENWEATHER_API_KEY."
+
+    city = city.strip()
+    try:
+        from weather import get_weather_client
+        return _format_weather(city, await get_weather_client().get_async(city))
     except Exception as e:
         return f"⚠️ Error al obtener datos del clima: {e}"
 
@@ -113,124 +122,87 @@ def generate_fun_fact() -> str:
     return random.choice(facts)
 
 # ---------------------------
-# Helper: Alias de países
+# Helper: Alias de países (ver country_aliases.py)
 # ---------------------------
-COUNTRY_ALIASES = {
-    # 🌍 América
-    "eeuu": "United States", "ee. uu.": "United States", "estados unidos": "United States", "usa": "United States",
-    "canadá": "Canada", "canada": "Canada",
-    "méxico": "Mexico", "mexico": "Mexico",
-    "cuba": "Cuba", "puerto rico": "Puerto Rico",
-    "república dominicana": "Dominican Republic", "dominicana": "Dominican Republic",
-    "guatemala": "Guatemala", "honduras": "Honduras", "el salvador": "El Salvador", "nicaragua": "Nicaragua",
-    "costa rica": "Costa Rica", "panamá": "Panama", "panama": "Panama",
-    "colombia": "Colombia", "venezuela": "Venezuela", "ecuador": "Ecuador", "perú": "Peru", "peru": "Peru",
-    "bolivia": "Bolivia", "paraguay": "Paraguay", "uruguay": "Uruguay", "argentina": "Argentina", "chile": "Chile",
-    "brasil": "Brazil", "brasilia": "Brazil",
-
-    # 🌍 Europa Occidental
-    "españa": "Spain", "espana": "Spain",
-    "portugal": "Portugal", "francia": "France", "alemania": "Germany", "suiza": "Switzerland",
-    "bélgica": "Belgium", "belgica": "Belgium", "luxemburgo": "Luxembourg",
-    "reino unido": "Great Britain", "gran bretaña": "Great Britain", "inglaterra": "Great Britain", "uk": "Great Britain",
-    "irlanda": "Ireland", "italia": "Italy", "san marino": "San Marino", "mónaco": "Monaco", "monaco": "Monaco",
-
-    # 🌍 Europa del Este
-    "rusia": "ROC", "federación rusa": "ROC", "rusia olímpica": "ROC", "urss": "ROC", "roc": "ROC",
-    "ucrania": "Ukraine", "bielorrusia": "Belarus", "polonia": "Poland", "república checa": "Czech Republic",
-    "chequia": "Czech Republic", "eslovaquia": "Slovakia", "hungría": "Hungary", "hungria": "Hungary",
-    "rumanía": "Romania", "rumania": "Romania", "bulgaria": "Bulgaria", "serbia": "Serbia",
-    "croacia": "Croatia", "bosnia": "Bosnia and Herzegovina", "eslovenia": "Slovenia", "macedonia": "North Macedonia",
-    "kosovo": "Kosovo", "albania": "Albania", "moldavia": "Moldova", "georgia": "Georgia", "armenia": "Armenia",
-
-    # 🌍 Europa del Norte
-    "suecia": "Sweden", "noruega": "Norway", "dinamarca": "Denmark", "finlandia": "Finland", "islandia": "Iceland",
-    "letonia": "Latvia", "lituania": "Lithuania", "estonia": "Estonia",
-
-    # 🌍 África
-    "sudáfrica": "South Africa", "sudafrica": "South Africa",
-    "nigeria": "Nigeria", "kenia": "Kenya", "etiopía": "Ethiopia", "etiopia": "Ethiopia",
-    "egipto": "Egypt", "marruecos": "Morocco", "argelia": "Algeria", "túnez": "Tunisia", "tunez": "Tunisia",
-    "ghana": "Ghana", "camerún": "Cameroon", "camerun": "Cameroon", "senegal": "Senegal", "uganda": "Uganda",
-    "zimbabue": "Zimbabwe", "botsuana": "Botswana", "mozambique": "Mozambique",
-    "angola": "Angola", "zambia": "Zambia", "malí": "Mali", "mali": "Mali", "etiopia": "Ethiopia",
-
-    # 🌍 Asia Occidental y Central
-    "turquía": "Turkey", "turquia": "Turkey", "chipre": "Cyprus", "israel": "Israel", "jordania": "Jordan",
-    "líbanon": "Lebanon", "libano": "Lebanon", "siria": "Syria", "irak": "Iraq", "iraq": "Iraq",
-    "irán": "Iran", "iran": "Iran", "arabia saudita": "Saudi Arabia", "qatar": "Qatar",
-    "emiratos árabes unidos": "United Arab Emirates", "emiratos arabes unidos": "United Arab Emirates",
-    "kuwait": "Kuwait", "bahrein": "Bahrain", "oman": "Oman", "yemen": "Yemen",
-    "kazajistán": "Kazakhstan", "kazajistan": "Kazakhstan", "uzbekistán": "Uzbekistan", "uzbekistan": "Uzbekistan",
-    "kirguistán": "Kyrgyzstan", "kirguistan": "Kyrgyzstan", "tayikistán": "Tajikistan", "tayikistan": "Tajikistan",
-
-    # 🌍 Asia Oriental
-    "china": "China", "hong kong": "Hong Kong", "macao": "Macau", "taiwán": "Chinese Taipei", "taiwan": "Chinese Taipei",
-    "corea del sur": "South Korea", "corea del norte": "North Korea", "japón": "Japan", "japon": "Japan",
-    "mongolia": "Mongolia",
-
-    # 🌍 Asia Meridional y Sudeste Asiático
-    "india": "India", "pakistán": "Pakistan", "pakistan": "Pakistan",
-    "bangladés": "Bangladesh", "bangladesh": "Bangladesh", "nepal": "Nepal", "bután": "Bhutan", "maldivas": "Maldives",
-    "sri lanka": "Sri Lanka", "myanmar": "Myanmar", "birmania": "Myanmar",
-    "tailandia": "Thailand", "vietnam": "Vietnam", "laos": "Laos", "camboya": "Cambodia", "malasia": "Malaysia",
-    "singapur": "Singapore", "indonesia": "Indonesia", "filipinas": "Philippines", "timor oriental": "Timor-Leste",
-
-    # 🌍 Oceanía
-    "australia": "Australia", "nueva zelanda": "New Zealand", "nueva zelandia": "New Zealand",
-    "fiyi": "Fiji", "samoa": "Samoa", "tonga": "Tonga", "papúa nueva guinea": "Papua New Guinea",
-    "papua nueva guinea": "Papua New Guinea", "islas cook": "Cook Islands",
-    "islas salomón": "Solomon Islands", "micronesia": "Micronesia", "palau": "Palau",
-    "kiribati": "Kiribati", "vanuatu": "Vanuatu", "nauru": "Nauru", "tuvalu": "Tuvalu",
-
-    # 🌍 Otros / Territorios especiales
-    "palestina": "Palestine", "hong-kong": "Hong Kong", "china taipei": "Chinese Taipei",
-    "corea": "South Korea", "macedonia del norte": "North Macedonia",
-}
-
 def normalize_country(name: str) -> str:
     """Normaliza nombre de país usando aliases; si no hay alias devuelve title-case del original."""
     if not isinstance(name, str):
         return name
-    key = name.strip().lower()
-    return COUNTRY_ALIASES.get(key, name.strip().title())
+    return get_country_matcher().canonicalize(name) or name.strip().title()
+
+def _fmt_number(value, signed=False) -> str:
+    """Entero del medallero como texto ("—" si falta, p. ej. un país sin ranking)."""
+    if value != value:  # NaN
+        return "—"
+    return f"{int(value):+d}" if signed else str(int(value))
 
 # ---------------------------
-# Tool: Comparar dos países (usa CSV)
+# Tool: Comparar dos países (usa el dataset por años)
 # ---------------------------
 def compare_countries(country1: str, country2: str, year: int) -> str:
     """
     Compara el rendimiento de dos países en un año.
     Retorna resumen con medallas y ranking de ambos y resumen del ganador.
     """
-    csv_path = "./olympic_medals_2000_2024.csv"
-    try:
-        df = pd.read_csv(csv_path)
-    except Exception:
-        return "⚠️ No se encontró el archivo de datos olímpicos (olympic_medals_2000_2024.csv)."
-
     # Normalizar año y países
     try:
         year = int(year)
     except Exception:
         return "⚠️ Año inválido."
 
+    try:
+        from medal_service import get_medal_service  # pandas solo se carga al comparar países
+        service = get_medal_service()
+    except Exception:
+        return "⚠️ No se encontraron los datos olímpicos (data/medals u olympic_medals_2000_2024.csv)."
+
     c1 = normalize_country(country1)
     c2 = normalize_country(country2)
 
-    subset = df[(df["year"] == year) & (df["country"].isin([c1, c2]))]
+    rows = service.compare([c1, c2], [year]).dropna(subset=["total"])
 
-    if subset.empty or len(subset) < 2:
+    if len(rows) < 2:
         return f"⚠️ No se encontraron datos de ambos países ({c1}, {c2}) en {year}."
 
-    rows = subset.sort_values(by="rank", ascending=True)
+    # Los países sin ranking van detrás
+    rows = rows.sort_values(by="rank", ascending=True, na_position="last")
     lines = []
-    for _, row in rows.iterrows():
+    for (_, country), row in zip(rows.index, rows.itertuples(index=False)):
         lines.append(
-            f"🏳️ **{row['country']}** — Oro: {int(row['gold'])}, Plata: {int(row['silver'])}, "
-            f"Bronce: {int(row['bronze'])}, Total: {int(row['total'])} (Ranking: {int(row['rank'])})"
+            f"🏳️ **{country}** — Oro: {_fmt_number(row.gold)}, Plata: {_fmt_number(row.silver)}, "
+            f"Bronce: {_fmt_number(row.bronze)}, Total: {_fmt_number(row.total)} (Ranking: {_fmt_number(row.rank)})"
         )
 
-    top = rows.iloc[0]
-    summary = f"\n🏆 En {year}, **{top['country']}** obtuvo el mejor resultado."
+    top = rows.index[0][1]
+    summary = f"\n🏆 En {year}, **{top}** obtuvo el mejor resultado."
     return "\n".join(lines) + summary
+
+
+def compare_many_countries(countries, years=None) -> str:
+    """
+    Compara N países en uno o varios años con una sola consulta al servicio de datos.
+    Retorna una tabla con medallas, ranking, puesto entre los comparados y variación
+    de medallas respecto a la edición anterior.
+    """
+    try:
+        from medal_service import get_medal_service
+        service = get_medal_service()
+    except Exception:
+        return "⚠️ No se encontraron los datos olímpicos (data/medals u olympic_medals_2000_2024.csv)."
+
+    names = list(dict.fromkeys(normalize_country(c) for c in countries))
+    matrix = service.compare(names, years).dropna(subset=["total"])
+    if matrix.empty:
+        return f"⚠️ No se encontraron datos de {', '.join(names)}."
+
+    lines = [
+        "| Año | País | Oro | Plata | Bronce | Total | Ranking | Puesto | Δ Total |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for (year, country), row in zip(matrix.index, matrix.itertuples(index=False)):
+        lines.append(
+            f"| {year} | {country} | {_fmt_number(row.gold)} | {_fmt_number(row.silver)} | {_fmt_number(row.bronze)} | "
+            f"{_fmt_number(row.total)} | {_fmt_number(row.rank)} | {_fmt_number(row.position)} | "
+            f"{_fmt_number(row.delta_total, signed=True)} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,331 @@
+import json
+import os
+import threading
+import numpy as np
+
+CHROMA_PATH = "./chroma_db"
+COLLECTION_NAME = "olympic_medals"
+FLAT_INDEX_PATH = "./vector_index"
+# "chroma" (por defecto) o "numpy" (índice plano exacto en memoria mapeada)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+BACKENDS = ["chroma", "numpy"]
+
+
+class VectorBackend:
+    """
+    Interfaz común de los índices vectoriales que usan VectorDB (escritura) y RAG (búsqueda).
+    Los metadatos filtrables y el `content_hash` de cada documento viajan en `metadatas`.
+    """
+
+    name = None
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def max_batch_size(self):
+        """Máximo de documentos por escritura (None = sin límite)."""
+        return None
+
+    def stored_hashes(self) -> dict:
+        """`content_hash` guardado de cada ID (para sincronizar solo lo que cambió)."""
+        raise NotImplementedError
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def flush(self):
+        """Persiste los cambios pendientes (los backends que escriben al momento no hacen nada)."""
+
+    def query(self, query_text: str = None, n_results: int = 10, where=None, query_embedding=None):
+        """(ids, documentos) de los `n_results` más parecidos, opcionalmente filtrando por metadatos."""
+        raise NotImplementedError
+
+    def disk_size(self) -> int:
+        """Bytes que ocupa el índice en disco."""
+        raise NotImplementedError
+
+    def dimension(self):
+        """Dimensión de los embeddings guardados (None si el índice está vacío)."""
+        raise NotImplementedError
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+# ---------------------------
+# Chroma (PersistentClient)
+# ---------------------------
+class ChromaBackend(VectorBackend):
+    name = "chroma"
+
+    def __init__(self, embedding_function, path: str = CHROMA_PATH, collection_name: str = COLLECTION_NAME,
+                 create: bool = True):
+        import chromadb
+        self.path = path
+        self.collection_name = collection_name
+        self.embedding_function = embedding_function
+        self.client = chromadb.PersistentClient(path=path)
+        if create:
+            self.collection = self.client.get_or_create_collection(collection_name, embedding_function=embedding_function)
+        else:
+            self.collection = self.client.get_collection(collection_name, embedding_function=embedding_function)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def max_batch_size(self):
+        try:
+            return self.client.get_max_batch_size()
+        except Exception:
+            return None
+
+    def stored_hashes(self) -> dict:
+        existing = self.collection.get(include=["metadatas"])
+        return {
+            doc_id: (meta or {}).get("content_hash")
+            for doc_id, meta in zip(existing.get("ids", []), existing.get("metadatas") or [])
+        }
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def clear(self):
+        try:
+            self.client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+        self.collection = self.client.get_or_create_collection(
+            self.collection_name, embedding_function=self.embedding_function
+        )
+
+    def query(self, query_text: str = None, n_results: int = 10, where=None, query_embedding=None):
+        if query_embedding is not None:
+            results = self.collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+        else:
+            results = self.collection.query(query_texts=[query_text], n_results=n_results, where=where)
+        return results.get("ids", [[]])[0], results.get("documents", [[]])[0]
+
+    def disk_size(self) -> int:
+        return _dir_size(self.path)
+
+    def dimension(self):
+        embeddings = self.collection.get(limit=1, include=["embeddings"]).get("embeddings")
+        return None if embeddings is None or not len(embeddings) else len(embeddings[0])
+
+
+# ---------------------------
+# Índice plano NumPy (búsqueda exacta)
+# ---------------------------
+class NumpyFlatBackend(VectorBackend):
+    """
+    Índice exacto para colecciones pequeñas (cientos o pocos miles de documentos):
+    una matriz float32 de embeddings normalizados en `embeddings.npy`, abierta con mmap,
+    y los documentos/metadatos en `records.json`. Una búsqueda es un producto matriz-vector
+    (similitud coseno) sobre las filas que pasan el filtro y un top-k con argpartition.
+    """
+
+    name = "numpy"
+    MATRIX_FILE = "embeddings.npy"
+    RECORDS_FILE = "records.json"
+
+    def __init__(self, embedding_function, path: str = FLAT_INDEX_PATH, create: bool = True):
+        self.path = path
+        self.embedding_function = embedding_function
+        self._lock = threading.Lock()
+        self._dirty = False
+        if not os.path.exists(os.path.join(path, self.RECORDS_FILE)):
+            if not create:
+                raise FileNotFoundError(f"No existe el índice vectorial en {path} (ejecuta --build-db)")
+            self._set([], [], [], np.zeros((0, 0), dtype=np.float32))
+        else:
+            self._open()
+
+    # --- estado en memoria ---
+    def _set(self, ids, documents, metadatas, matrix):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.matrix = matrix
+        self._position = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        # Columnas de metadatos para filtrar con operaciones vectorizadas
+        fields = {field for meta in self.metadatas for field in meta}
+        self._columns = {
+            field: np.array([meta.get(field) for meta in self.metadatas], dtype=object) for field in fields
+        }
+
+    def _open(self):
+        with open(os.path.join(self.path, self.RECORDS_FILE), encoding="utf-8") as f:
+            records = json.load(f)
+        matrix = np.load(os.path.join(self.path, self.MATRIX_FILE), mmap_mode="r")
+        self._set(records["ids"], records["documents"], records["metadatas"], matrix)
+
+    def flush(self):
+        """Escribe matriz y registros a ficheros temporales y los sustituye de forma atómica."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.path, exist_ok=True)
+            matrix_path = os.path.join(self.path, self.MATRIX_FILE)
+            records_path = os.path.join(self.path, self.RECORDS_FILE)
+            with open(matrix_path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(self.matrix, dtype=np.float32))
+            with open(records_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas},
+                          f, ensure_ascii=False)
+            os.replace(matrix_path + ".tmp", matrix_path)
+            os.replace(records_path + ".tmp", records_path)
+            self._dirty = False
+        self._open()
+
+    # --- escritura ---
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def stored_hashes(self) -> dict:
+        return {doc_id: meta.get("content_hash") for doc_id, meta in zip(self.ids, self.metadatas)}
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        if embeddings is None:
+            embeddings = self.embedding_function(list(documents))
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            all_ids, all_docs, all_meta = list(self.ids), list(self.documents), list(self.metadatas)
+            position = dict(self._position)
+            new_rows, updates = [], []
+            for doc_id, doc, meta, vector in zip(ids, documents, metadatas, vectors):
+                i = position.get(doc_id)
+                if i is None:
+                    position[doc_id] = len(all_ids)
+                    all_ids.append(doc_id)
+                    all_docs.append(doc)
+                    all_meta.append(meta)
+                    new_rows.append(vector)
+                else:
+                    all_docs[i], all_meta[i] = doc, meta
+                    updates.append((i, vector))
+
+            matrix = np.array(self.matrix, dtype=np.float32) if len(self.ids) else np.zeros((0, vectors.shape[1]), np.float32)
+            if new_rows:
+                matrix = np.vstack([matrix, np.stack(new_rows)])
+            for i, vector in updates:
+                matrix[i] = vector
+            self._set(all_ids, all_docs, all_meta, matrix)
+            self._dirty = True
+
+    def delete(self, ids):
+        with self._lock:
+            drop = {self._position[doc_id] for doc_id in ids if doc_id in self._position}
+            if not drop:
+                return
+            keep = [i for i in range(len(self.ids)) if i not in drop]
+            self._set([self.ids[i] for i in keep], [self.documents[i] for i in keep],
+                      [self.metadatas[i] for i in keep], np.asarray(self.matrix)[keep])
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._set([], [], [], np.zeros((0, 0), dtype=np.float32))
+            self._dirty = True
+        self.flush()
+
+    # --- búsqueda ---
+    def _mask(self, where):
+        """Filtro con la misma sintaxis `where` que se usa con Chroma ($and, $in, $eq, $gte...)."""
+        n = len(self.ids)
+        if not where:
+            return None
+        if "$and" in where:
+            mask = np.ones(n, dtype=bool)
+            for clause in where["$and"]:
+                mask &= self._mask(clause)
+            return mask
+        if "$or" in where:
+            mask = np.zeros(n, dtype=bool)
+            for clause in where["$or"]:
+                mask |= self._mask(clause)
+            return mask
+
+        mask = np.ones(n, dtype=bool)
+        for field, condition in where.items():
+            column = self._columns.get(field)
+            if column is None:
+                return np.zeros(n, dtype=bool)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op == "$eq":
+                    mask &= column == value
+                elif op == "$ne":
+                    mask &= column != value
+                elif op == "$in":
+                    mask &= np.isin(column, list(value))
+                elif op == "$nin":
+                    mask &= ~np.isin(column, list(value))
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    present = np.array([v is not None for v in column])
+                    values = np.where(present, column, 0).astype(float)
+                    compare = {"$gt": np.greater, "$gte": np.greater_equal,
+                               "$lt": np.less, "$lte": np.less_equal}[op]
+                    mask &= present & compare(values, value)
+                else:
+                    raise ValueError(f"Operador no soportado en el índice plano: {op}")
+        return mask
+
+    def query(self, query_text: str = None, n_results: int = 10, where=None, query_embedding=None):
+        if not self.ids:
+            return [], []
+        if query_embedding is None:
+            query_embedding = self.embedding_function([query_text])[0]
+        vector = self._normalize(query_embedding)[0]
+
+        mask = self._mask(where)
+        rows = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        if not len(rows):
+            return [], []
+        scores = (self.matrix @ vector) if mask is None else (self.matrix[rows] @ vector)
+        k = min(n_results, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        hits = rows[top]
+        return [self.ids[i] for i in hits], [self.documents[i] for i in hits]
+
+    def disk_size(self) -> int:
+        return _dir_size(self.path) if os.path.isdir(self.path) else 0
+
+    def dimension(self):
+        return int(self.matrix.shape[1]) if len(self.ids) else None
+
+
+def create_backend(name: str = None, embedding_function=None, create: bool = True, path: str = None) -> VectorBackend:
+    """Backend vectorial configurado (`VECTOR_BACKEND` o `name`) con la función de embeddings compartida."""
+    name = name or VECTOR_BACKEND
+    if embedding_function is None:
+        from embeddings import get_embedding_function
+        embedding_function = get_embedding_function()
+    if name == "chroma":
+        return ChromaBackend(embedding_function, path=path or CHROMA_PATH, create=create)
+    if name == "numpy":
+        return NumpyFlatBackend(embedding_function, path=path or FLAT_INDEX_PATH, create=create)
+    raise ValueError(f"Backend vectorial desconocido: {name} (opciones: {', '.join(BACKENDS)})")
@@ -1,45 +1,182 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 256
+METADATA_FIELDS = ["year", "country", "rank", "gold", "silver", "bronze", "total"]
+MISSING_VALUE = "N/A"
+
+
+def document_id(year, country) -> str:
+    """ID estable de un documento: `año|país`."""
+    return f"{int(year)}|{country}"
+
+
+def content_hash(document: str, metadata: dict = None) -> str:
+    """Hash del documento y de sus metadatos filtrables (un cambio en cualquiera obliga a re-indexar)."""
+    payload = json.dumps([document, metadata or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _metadata_records(df):
+    """Metadatos filtrables por fila (año, país y medallas); se omiten los valores vacíos."""
+    records = []
+    for values in zip(*(df[field] if field in df.columns else [None] * len(df) for field in METADATA_FIELDS)):
+        meta = {}
+        for field, value in zip(METADATA_FIELDS, values):
+            if value is None or pd.isna(value):
+                continue
+            meta[field] = str(value) if field == "country" else int(value)
+        records.append(meta)
+    return records
+
+
+def build_documents(df):
+    """
+    Construye columna a columna (sin iterrows) los documentos, IDs `año|país` y
+    metadatos de cada fila. Las filas con `año|país` repetido se descartan.
+    """
+    duplicated = df.duplicated(subset=["year", "country"])
+    if duplicated.any():
+        print(f"⚠️ {int(duplicated.sum())} filas duplicadas ignoradas")
+        df = df[~duplicated]
+
+    year = df["year"].astype(str)
+    country = df["country"].astype(str)
+    # Una medalla vacía (Int16 nulo) no debe anular el documento entero al concatenar
+    medals = {col: df[col].astype("string").fillna(MISSING_VALUE) for col in ("gold", "silver", "bronze", "total")}
+    docs = (
+        "Year: " + year + " | Country: " + country + " | "
+        + "Gold: " + medals["gold"] + ", Silver: " + medals["silver"] + ", "
+        + "Bronze: " + medals["bronze"] + ", Total: " + medals["total"]
+    ).tolist()
+    ids = (year + "|" + country).tolist()
+    metadatas = _metadata_records(df)
+    for doc, meta in zip(docs, metadatas):
+        meta["content_hash"] = content_hash(doc, meta)
+    return docs, ids, metadatas
 
-CHROMA_PATH = "./chroma_db"
 
 class VectorDB:
-    def __init__(self):
-        # Inicializa cliente Chroma y colección
-        self.client = chromadb.PersistentClient(path=CHROMA_PATH)
-        self.collection = self.client.get_or_create_collection(
-            "olympic_medals",
-            embedding_function=embedding_functions.DefaultEmbeddingFunction()
-        )
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, embed_workers: int = 1, backend: str = None):
+        # El backend (Chroma o índice plano NumPy) y el modelo de embeddings solo se cargan
+        # al usar la base vectorial (build_documents lo usan también rag.py/bm25.py sin necesitarlos)
+        from embeddings import get_embedding_function
+        from vector_backends import create_backend
+
+        self.batch_size = batch_size
+        self.embed_workers = embed_workers
+        self.embedding_function = get_embedding_function()
+        self.backend = create_backend(backend, self.embedding_function)
+
+    def _documents(self, df):
+        """
+        Documentos de `build_documents`; con un modelo de embeddings distinto del de Chroma su ID
+        entra en los metadatos y en el hash, así que cambiar de proveedor re-embebe todo al sincronizar.
+        """
+        from embeddings import DEFAULT_MODEL_ID
+
+        docs, ids, metadatas = build_documents(df)
+        model_id = self.embedding_function.model_id
+        if model_id != DEFAULT_MODEL_ID:
+            for doc, meta in zip(docs, metadatas):
+                del meta["content_hash"]
+                meta["embedding_model"] = model_id
+                meta["content_hash"] = content_hash(doc, meta)
+        return docs, ids, metadatas
 
     def clear(self):
-        """Elimina la colección existente."""
-        try:
-            self.client.delete_collection("olympic_medals")
-        except Exception:
-            pass
-        self.collection = self.client.get_or_create_collection(
-            "olympic_medals",
-            embedding_function=embedding_functions.DefaultEmbeddingFunction()
-        )
+        """Elimina todos los documentos del índice."""
+        self.backend.clear()
+
+    def _effective_batch_size(self) -> int:
+        """Tamaño de lote configurado, acotado por el máximo que admite el backend."""
+        limit = self.backend.max_batch_size()
+        return max(1, min(self.batch_size, limit) if limit else self.batch_size)
+
+    def _upsert_in_batches(self, docs, ids, metadatas, desc="Indexando documentos"):
+        """
+        Envía los documentos al backend en lotes con barra de progreso.
+        Con `embed_workers > 1` los embeddings de los lotes siguientes se calculan
+        en un pool de hilos mientras se escribe el lote actual.
+        """
+        from tqdm import tqdm
+
+        size = self._effective_batch_size()
+        starts = range(0, len(docs), size)
+        if not starts:
+            return
+
+        with tqdm(total=len(docs), desc=desc, unit="doc") as progress:
+            if self.embed_workers <= 1:
+                for start in starts:
+                    end = start + size
+                    self.backend.upsert(ids[start:end], docs[start:end], metadatas[start:end])
+                    progress.update(len(docs[start:end]))
+                return
+
+            with ThreadPoolExecutor(max_workers=self.embed_workers) as pool:
+                def submit(start):
+                    return start, pool.submit(self.embedding_function, docs[start:start + size])
+
+                # Ventana acotada de lotes en vuelo para no acumular todos los embeddings en memoria
+                remaining = iter(starts)
+                pending = deque(submit(start) for start in islice(remaining, self.embed_workers * 2))
+                while pending:
+                    start, future = pending.popleft()
+                    end = start + size
+                    self.backend.upsert(ids[start:end], docs[start:end], metadatas[start:end], embeddings=future.result())
+                    progress.update(len(docs[start:end]))
+                    for next_start in islice(remaining, 1):
+                        pending.append(submit(next_start))
 
     def upsert_from_dataframe(self, df):
-        """Carga datos del CSV en Chroma."""
-        docs = []
-        ids = []
-        for i, row in df.iterrows():
-            doc = (
-                f"Year: {row['year']} | Country: {row['country']} | "
-                f"Gold: {row['gold']}, Silver: {row['silver']}, "
-                f"Bronze: {row['bronze']}, Total: {row['total']}"
+        """Carga (o actualiza) todas las filas del medallero en el índice vectorial, por lotes."""
+        docs, ids, metadatas = self._documents(df)
+        self._upsert_in_batches(docs, ids, metadatas)
+        self.backend.flush()
+        print(f"✅ {len(docs)} documentos añadidos a la colección.")
+
+    def sync_from_dataframe(self, df):
+        """
+        Sincroniza la colección con el medallero: solo embebe las filas nuevas o
+        modificadas (según el hash guardado en metadatos) y borra las que ya no existen.
+        """
+        docs, ids, metadatas = self._documents(df)
+
+        stored = self.backend.stored_hashes()
+
+        changed = [i for i, doc_id in enumerate(ids) if stored.get(doc_id) != metadatas[i]["content_hash"]]
+        wanted = set(ids)
+        stale = [doc_id for doc_id in stored if doc_id not in wanted]
+
+        if changed:
+            self._upsert_in_batches(
+                [docs[i] for i in changed],
+                [ids[i] for i in changed],
+                [metadatas[i] for i in changed],
             )
-            docs.append(doc)
-            ids.append(str(i))
+        if stale:
+            self.backend.delete(stale)
+        self.backend.flush()
 
-        self.collection.add(documents=docs, ids=ids)
-        print(f"✅ {len(docs)} documentos añadidos a la colección.")
+        added = sum(1 for i in changed if ids[i] not in stored)
+        stats = {
+            "added": added,
+            "updated": len(changed) - added,
+            "deleted": len(stale),
+            "unchanged": len(ids) - len(changed),
+        }
+        print(
+            f"✅ Sincronización: {stats['added']} nuevos, {stats['updated']} actualizados, "
+            f"{stats['deleted']} eliminados, {stats['unchanged']} sin cambios."
+        )
+        return stats
 
-    def query(self, query_text, n_results=5):
-        """Busca los documentos más similares."""
-        results = self.collection.query(query_texts=[query_text], n_results=n_results)
-        return results.get("documents", [[]])[0]
+    def query(self, query_text, n_results=5, where=None):
+        """Busca los documentos más similares (opcionalmente filtrando por metadatos)."""
+        _, documents = self.backend.query(query_text, n_results=n_results, where=where)
+        return documents
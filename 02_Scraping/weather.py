@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from country_aliases import fold
+
+# URL configurable para poder apuntar a un servidor local de pruebas en lugar de OpenWeather
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # el clima cambia cada pocos minutos
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "1024"))  # ciudades distintas en caché como máximo
+WEATHER_POOL_SIZE = 10
+HTTP_TIMEOUT = 8
+
+
+def city_key(city: str) -> str:
+    """Clave de caché de una ciudad: sin tildes, en minúsculas y sin espacios repetidos."""
+    return " ".join(fold(city).split())
+
+
+class WeatherClient:
+    """
+    Cliente de OpenWeather con conexiones keep-alive reutilizadas (pool de requests),
+    caché LRU por ciudad con TTL y agrupación de peticiones: si varias consultas piden
+    la misma ciudad a la vez, solo una llega a la API y las demás esperan su resultado.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = OPENWEATHER_URL, ttl: int = WEATHER_CACHE_TTL,
+                 pool_size: int = WEATHER_POOL_SIZE, timeout: float = HTTP_TIMEOUT, cache_size: int = WEATHER_CACHE_SIZE):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENWEATHER_API_KEY")
+        self.base_url = base_url
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+
+    def _fetch(self, city: str) -> dict:
+        params = {"q": city, "appid": self.api_key, "lang": "es", "units": "metric"}
+        with self._lock:
+            self.upstream_calls += 1
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        return response.json()
+
+    def _cached(self, key: str):
+        """Respuesta en caché de `key` si sigue vigente; las caducadas se eliminan al consultarlas."""
+        hit = self._cache.get(key)
+        if hit is None:
+            return None
+        if hit[0] <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return hit[1]
+
+    def _remember(self, key: str, data: dict):
+        self._cache[key] = (time.monotonic() + self.ttl, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, city: str) -> dict:
+        """Respuesta JSON de OpenWeather para `city` (caché, petición en curso o llamada nueva)."""
+        key = city_key(city)
+        with self._lock:
+            data = self._cached(key)
+            if data is not None:
+                return data
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            data = self._fetch(city.strip())
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # Solo se guardan las respuestas correctas; los errores se reintentan en la próxima consulta
+            if str(data.get("cod")) == "200":
+                self._remember(key, data)
+            self._inflight.pop(key, None)
+        future.set_result(data)
+        return data
+
+    async def get_async(self, city: str) -> dict:
+        """Variante asíncrona de `get`: las corrutinas que piden la misma ciudad comparten la petición."""
+        key = city_key(city)
+        with self._lock:
+            data = self._cached(key)
+        if data is not None:
+            return data
+
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        task = self._async_inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self.get, city))
+            self._async_inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._async_inflight.pop(inflight_key, None))
+        # shield: cancelar una consulta no cancela la petición compartida con las demás
+        return await asyncio.shield(task)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_weather_client() -> WeatherClient:
+    """Cliente de clima compartido por el proceso (mismo pool de conexiones y misma caché)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WeatherClient()
+    return _client